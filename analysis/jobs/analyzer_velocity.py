@@ -4,7 +4,7 @@ import logging
 import argparse
 import json
 from datetime import datetime, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import pandas as pd
 import numpy as np
 
@@ -16,11 +16,36 @@ sys.path.insert(0, ".")
 
 from core.db import SessionLocal
 from core.logging import setup_json_logging
+from analysis.velocity import (
+    ENGINES, DEFAULT_ENGINE, VelocityAccumulator, calculate_velocity, aggregate_buckets
+)
+from analysis.velocity_state import VelocityStateStore, align_cutoff
+from analysis.scoring import DEFAULT_SCORE, SCORES, score_snapshots
+from analysis.ranking import ClippedTopK, rank_top_k
+from analysis.velocity_ewma import top_ewma_velocity
+from analysis.leaderboard import ALL_REGIONS, publish_leaderboard
+from analysis.jobs.rollup_metrics import ROLLUP_TABLES, select_rollup_source
 
 logger = logging.getLogger(__name__)
 
+# DataFrame engines plus the in-database engine
+ANALYZER_ENGINES = ENGINES + ("sql", "incremental", "streaming", "ewma")
+# Engines that can read rollup tables instead of raw snapshots
+ROLLUP_ENGINES = ENGINES + ("streaming",)
+SNAPSHOT_SOURCES = ("raw", "auto") + tuple(ROLLUP_TABLES)
+# Rows kept per published leaderboard by the scheduled analysis
+LEADERBOARD_SIZE = 100
+
 class VelocityAnalyzer:
-    def __init__(self):
+    def __init__(self, engine: str = DEFAULT_ENGINE, state_retention_hours: int = 48,
+                 chunk_size: int = 50_000):
+        if engine not in ANALYZER_ENGINES:
+            raise ValueError(f"Unknown velocity engine: {engine}")
+        self.engine = engine
+        # Longest window the incremental engine can answer from stored buckets
+        self.state_retention_hours = state_retention_hours
+        # Rows per server-side cursor fetch for the streaming engine
+        self.chunk_size = chunk_size
         self.db = SessionLocal()
 
     def __enter__(self):
@@ -29,36 +54,74 @@ class VelocityAnalyzer:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.db.close()
 
-    def analyze_velocity(self, window_hours: int = 3, top_n: int = 10) -> List[Dict[str, Any]]:
-        """Calculate velocity (views per minute) for trending videos"""
+    def analyze_velocity(self, window_hours: int = 3, top_n: int = 10, source: str = "raw",
+                         score: str = DEFAULT_SCORE, region: Optional[str] = None,
+                         publish: bool = False) -> List[Dict[str, Any]]:
+        """Calculate velocity (views per minute) for trending videos.
+
+        `source` selects raw snapshots, a rollup table ('hourly'/'daily') or
+        'auto' for the coarsest rollup that still resolves the window.
+        `score` picks the ranking (see analysis.scoring); scores other than
+        velocity need the whole series and so a DataFrame engine.
+        `region` limits the ranking to videos of one country code. With
+        `publish`, the results replace the stored leaderboard for the
+        region, window and score (see analysis.leaderboard).
+        """
         trace_id = f"velocity_analysis_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}"
 
         try:
+            source = self._resolve_source(source, window_hours)
+            self._check_score(score)
+
             logger.info("Starting velocity analysis", extra={
                 "trace_id": trace_id,
                 "job": "analyzer_velocity",
                 "window_hours": window_hours,
-                "top_n": top_n
+                "top_n": top_n,
+                "engine": self.engine,
+                "source": source,
+                "score": score,
+                "region": region
             })
 
-            # Fetch metrics data
-            metrics_df = self._fetch_metrics_data(window_hours, trace_id)
-
-            if metrics_df.empty:
-                logger.warning("No metrics data found", extra={"trace_id": trace_id})
-                return []
-
-            # Calculate velocity
-            velocity_df = self._calculate_velocity(metrics_df, trace_id)
-
-            # Get top N results
-            top_results = self._get_top_results(velocity_df, top_n, trace_id)
+            if self.engine == "sql":
+                # Diff, aggregate, clip and rank inside PostgreSQL
+                top_results, total_videos = self._analyze_in_database(window_hours, top_n, trace_id, region)
+            elif self.engine == "ewma":
+                # Online estimates the collectors keep; the window bounds how stale one may be.
+                # Only the top N rows are read, so the total is not known.
+                top_results, total_videos = top_ewma_velocity(self.db, top_n, window_hours, region), None
+            elif self.engine == "incremental" and window_hours <= self.state_retention_hours:
+                # Fold only new snapshots into stored buckets, ranked chunk by chunk
+                top_results, total_videos = self._rank_incremental_velocity(window_hours, top_n, trace_id, region)
+            elif self.engine == "streaming":
+                # Bounded-memory chunked read, ranked as the chunks complete
+                top_results, total_videos = self._rank_streaming_velocity(window_hours, top_n, trace_id,
+                                                                          source, region)
+            else:
+                # Fetch metrics data
+                metrics_df = self._fetch_metrics_data(window_hours, trace_id, source, region)
+
+                if metrics_df.empty:
+                    # Still published, so an emptied window clears the stored leaderboard
+                    logger.warning("No metrics data found", extra={"trace_id": trace_id})
+                    velocity_df = metrics_df
+                else:
+                    # Calculate velocity
+                    velocity_df = self._calculate_velocity(metrics_df, trace_id, score)
+
+                # Get top N results
+                top_results = self._get_top_results(velocity_df, top_n, trace_id, score)
+                total_videos = len(velocity_df)
+
+            if publish:
+                self._publish_leaderboard(top_results, window_hours, score, region, trace_id)
 
             logger.info(f"Velocity analysis completed", extra={
                 "trace_id": trace_id,
                 "job": "analyzer_velocity",
                 "window_hours": window_hours,
-                "total_videos": len(velocity_df),
+                "total_videos": total_videos,
                 "top_results": len(top_results)
             })
 
@@ -71,21 +134,80 @@ class VelocityAnalyzer:
             })
             raise
 
-    def _fetch_metrics_data(self, window_hours: int, trace_id: str) -> pd.DataFrame:
-        """Fetch metrics snapshots within time window"""
+    def _publish_leaderboard(self, results: List[Dict[str, Any]], window_hours: int, score: str,
+                             region: Optional[str], trace_id: str) -> None:
+        """Swap the results in as the current leaderboard and commit"""
         try:
-            query = text("""
+            generation = publish_leaderboard(self.db, results, window_hours, score, region)
+            self.db.commit()
+
+            logger.info("Leaderboard published", extra={
+                "trace_id": trace_id,
+                "generation": generation,
+                "region": region or ALL_REGIONS,
+                "window_hours": window_hours,
+                "ranked_by": score,
+                "entries": len(results)
+            })
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to publish leaderboard: {e}", extra={"trace_id": trace_id})
+            raise
+
+    def _resolve_source(self, source: str, window_hours: int) -> str:
+        """Map the requested snapshot source onto one this engine can read"""
+        if source not in SNAPSHOT_SOURCES:
+            raise ValueError(f"Unknown snapshot source: {source}")
+        if source == "auto":
+            return select_rollup_source(window_hours) if self.engine in ROLLUP_ENGINES else "raw"
+        if source != "raw" and self.engine not in ROLLUP_ENGINES:
+            raise ValueError(f"Engine '{self.engine}' only reads raw snapshots")
+        return source
+
+    def _check_score(self, score: str) -> None:
+        if score not in SCORES:
+            raise ValueError(f"Unknown score: {score}")
+        if score != DEFAULT_SCORE and self.engine not in ENGINES:
+            raise ValueError(f"Score '{score}' needs the full snapshot series; use engine {' or '.join(ENGINES)}")
+
+    def _metrics_query(self, window_hours: int, source: str = "raw", region: Optional[str] = None):
+        """Snapshots within the window ordered by (video_id, captured_at)"""
+        if source in ROLLUP_TABLES:
+            # Each bucket's last snapshot stands in for the raw series
+            return text("""
                 SELECT
-                    vms.video_id,
-                    vms.captured_at,
-                    vms.view_count,
+                    r.video_id,
+                    r.last_captured_at AS captured_at,
+                    r.view_last AS view_count,
                     v.title,
                     v.channel
-                FROM video_metrics_snapshot vms
-                JOIN videos v ON vms.video_id = v.video_id
-                WHERE vms.captured_at >= NOW() - INTERVAL '%s hours'
-                ORDER BY vms.video_id, vms.captured_at
-            """ % window_hours)
+                FROM %s r
+                JOIN videos v ON r.video_id = v.video_id
+                WHERE r.bucket_start >= NOW() - INTERVAL '%s hours'
+                  AND (CAST(:region AS text) IS NULL OR v.country_code = :region)
+                ORDER BY r.video_id, r.last_captured_at
+            """ % (ROLLUP_TABLES[source], window_hours)).bindparams(region=region)
+
+        return text("""
+            SELECT
+                vms.video_id,
+                vms.captured_at,
+                vms.view_count,
+                v.title,
+                v.channel
+            FROM video_metrics_snapshot vms
+            JOIN videos v ON vms.video_id = v.video_id
+            WHERE vms.captured_at >= NOW() - INTERVAL '%s hours'
+              AND (CAST(:region AS text) IS NULL OR v.country_code = :region)
+            ORDER BY vms.video_id, vms.captured_at
+        """ % window_hours).bindparams(region=region)
+
+    def _fetch_metrics_data(self, window_hours: int, trace_id: str, source: str = "raw",
+                            region: Optional[str] = None) -> pd.DataFrame:
+        """Fetch metrics snapshots within time window"""
+        try:
+            query = self._metrics_query(window_hours, source, region)
 
             result = self.db.execute(query)
             data = result.fetchall()
@@ -108,52 +230,200 @@ class VelocityAnalyzer:
             logger.error(f"Failed to fetch metrics data: {e}", extra={"trace_id": trace_id})
             raise
 
-    def _calculate_velocity(self, df: pd.DataFrame, trace_id: str) -> pd.DataFrame:
-        """Calculate views per minute for each video"""
+    def _analyze_in_database(self, window_hours: int, top_n: int, trace_id: str,
+                             region: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """Compute velocity with window functions and return only the top N rows"""
         try:
-            velocity_results = []
+            # Mirrors the pandas path: LAG() per video, invalid intervals
+            # filtered out, max per video, 99th percentile clip, then rank.
+            # Only the top N rows are joined to videos and sent back.
+            query = text("""
+                WITH deltas AS (
+                    SELECT
+                        video_id,
+                        view_count - LAG(view_count) OVER w AS view_diff,
+                        EXTRACT(EPOCH FROM captured_at - LAG(captured_at) OVER w) / 60.0 AS minutes_diff
+                    FROM video_metrics_snapshot
+                    WHERE captured_at >= NOW() - make_interval(hours => :window_hours)
+                      AND (CAST(:region AS text) IS NULL
+                           OR video_id IN (SELECT video_id FROM videos WHERE country_code = :region))
+                    WINDOW w AS (PARTITION BY video_id ORDER BY captured_at)
+                ),
+                per_video AS (
+                    SELECT
+                        video_id,
+                        COUNT(*) AS data_points,
+                        MAX((view_diff / minutes_diff)::double precision)
+                            FILTER (WHERE minutes_diff > 0 AND view_diff >= 0) AS max_velocity,
+                        COUNT(*) FILTER (WHERE minutes_diff > 0 AND view_diff >= 0) AS valid_intervals
+                    FROM deltas
+                    GROUP BY video_id
+                    HAVING COUNT(*) FILTER (WHERE minutes_diff > 0 AND view_diff >= 0) > 0
+                ),
+                threshold AS (
+                    SELECT
+                        percentile_cont(0.99) WITHIN GROUP (ORDER BY max_velocity) AS percentile_99,
+                        COUNT(*) AS total_videos
+                    FROM per_video
+                ),
+                top_videos AS (
+                    SELECT
+                        p.video_id,
+                        LEAST(p.max_velocity, t.percentile_99) AS views_per_min,
+                        p.data_points,
+                        p.valid_intervals,
+                        t.total_videos
+                    FROM per_video p
+                    CROSS JOIN threshold t
+                    ORDER BY views_per_min DESC, p.video_id
+                    LIMIT :top_n
+                )
+                SELECT
+                    tv.video_id,
+                    v.title,
+                    v.channel,
+                    tv.views_per_min,
+                    tv.data_points,
+                    tv.valid_intervals,
+                    tv.total_videos
+                FROM top_videos tv
+                JOIN videos v ON tv.video_id = v.video_id
+                ORDER BY tv.views_per_min DESC, tv.video_id
+            """)
+
+            rows = self.db.execute(query, {"window_hours": window_hours, "top_n": top_n,
+                                           "region": region}).fetchall()
+
+            if not rows:
+                logger.warning("No metrics data found", extra={"trace_id": trace_id})
+                return [], 0
+
+            results = [{
+                "video_id": row.video_id,
+                "title": row.title,
+                "channel": row.channel,
+                "views_per_min": float(row.views_per_min),
+                "data_points": int(row.data_points),
+                "valid_intervals": int(row.valid_intervals)
+            } for row in rows]
+
+            logger.info(f"Computed velocity in database", extra={
+                "trace_id": trace_id,
+                "rows_returned": len(results),
+                "total_videos": int(rows[0].total_videos)
+            })
 
-            for video_id, group in df.groupby('video_id'):
-                if len(group) < 2:
-                    continue  # Need at least 2 data points
+            return results, int(rows[0].total_videos)
 
-                # Sort by time and calculate differences
-                group_sorted = group.sort_values('captured_at')
+        except Exception as e:
+            logger.error(f"Failed to compute velocity in database: {e}", extra={"trace_id": trace_id})
+            raise
 
-                # Calculate time differences in minutes
-                time_diffs = group_sorted['captured_at'].diff()
-                time_diffs_minutes = time_diffs.dt.total_seconds() / 60
+    def _iter_metrics_chunks(self, window_hours: int, trace_id: str, source: str = "raw",
+                             region: Optional[str] = None) -> Iterator[pd.DataFrame]:
+        """Stream metrics snapshots in fixed-size chunks via a server-side cursor"""
+        result = self.db.execute(
+            self._metrics_query(window_hours, source, region),
+            execution_options={"yield_per": self.chunk_size}
+        )
+        try:
+            for partition in result.partitions():
+                chunk = pd.DataFrame(partition, columns=['video_id', 'captured_at', 'view_count', 'title', 'channel'])
+                chunk['captured_at'] = pd.to_datetime(chunk['captured_at'])
+                yield chunk
+        finally:
+            result.close()
+
+    def _rank_streaming_velocity(self, window_hours: int, top_n: int, trace_id: str, source: str = "raw",
+                                 region: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """Feed streamed chunks through a per-video accumulator into the ranker.
+
+        Only each chunk's completed videos, the ranking candidates and one
+        float per video (for the clip threshold) are held, never the whole
+        per-video frame.
+        """
+        try:
+            accumulator = VelocityAccumulator(keep=False)
+            ranker = ClippedTopK(top_n)
+            chunks = 0
+            for chunk in self._iter_metrics_chunks(window_hours, trace_id, source, region):
+                ranker.add_chunk(accumulator.add_chunk(chunk))
+                chunks += 1
+            ranker.add_chunk(accumulator.flush())
+
+            logger.info(f"Streamed metrics data", extra={
+                "trace_id": trace_id,
+                "rows": accumulator.rows,
+                "chunks": chunks,
+                "chunk_size": self.chunk_size,
+                "unique_videos": ranker.rows
+            })
 
-                # Calculate view differences
-                view_diffs = group_sorted['view_count'].diff()
+            return self._rank_candidates(ranker, top_n, trace_id)
 
-                # Calculate velocity (views per minute)
-                valid_mask = (time_diffs_minutes > 0) & (view_diffs >= 0)
+        except Exception as e:
+            logger.error(f"Failed to calculate streaming velocity: {e}", extra={"trace_id": trace_id})
+            raise
 
-                if not valid_mask.any():
-                    continue
+    def _rank_incremental_velocity(self, window_hours: int, top_n: int, trace_id: str,
+                                   region: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """Update persisted velocity state, aggregate the window from buckets and rank it.
 
-                velocities = view_diffs[valid_mask] / time_diffs_minutes[valid_mask]
+        Titles and channels are fetched one chunk of videos at a time, so
+        they are only held for that chunk and the ranking candidates.
+        """
+        try:
+            store = VelocityStateStore(self.db, retention_hours=self.state_retention_hours)
+            store.refresh(trace_id)
+
+            cutoff = align_cutoff(window_hours)
+            velocity_df = aggregate_buckets(store.load_window(cutoff))
+
+            ranker = ClippedTopK(top_n)
+            for start in range(0, len(velocity_df), self.chunk_size):
+                chunk = velocity_df.iloc[start:start + self.chunk_size]
+                metadata = self.db.execute(text("""
+                    SELECT video_id, title, channel
+                    FROM videos
+                    WHERE video_id = ANY(:video_ids)
+                      AND (CAST(:region AS text) IS NULL OR country_code = :region)
+                """), {"video_ids": chunk['video_id'].tolist(), "region": region}).fetchall()
+                metadata_df = pd.DataFrame(metadata, columns=['video_id', 'title', 'channel'])
+
+                ranker.add_chunk(chunk.merge(metadata_df, on='video_id', how='inner')[
+                    ['video_id', 'title', 'channel', 'views_per_min', 'data_points', 'valid_intervals']
+                ])
+
+            logger.info(f"Aggregated velocity from state buckets", extra={
+                "trace_id": trace_id,
+                "cutoff": cutoff.isoformat(),
+                "unique_videos": ranker.rows
+            })
 
-                # Remove infinite and NaN values
-                velocities = velocities[np.isfinite(velocities)]
+            return self._rank_candidates(ranker, top_n, trace_id)
 
-                if len(velocities) == 0:
-                    continue
+        except Exception as e:
+            logger.error(f"Failed to calculate incremental velocity: {e}", extra={"trace_id": trace_id})
+            raise
 
-                # Use maximum velocity for this video
-                max_velocity = velocities.max()
+    def _rank_candidates(self, ranker: ClippedTopK, top_n: int,
+                         trace_id: str) -> Tuple[List[Dict[str, Any]], int]:
+        """Clip the ranker's candidates at every video's 99th percentile and take the top N"""
+        candidates = ranker.candidates()
+        if candidates.empty:
+            return [], ranker.rows
 
-                velocity_results.append({
-                    'video_id': video_id,
-                    'title': group['title'].iloc[0],
-                    'channel': group['channel'].iloc[0],
-                    'views_per_min': float(max_velocity),
-                    'data_points': len(group),
-                    'valid_intervals': len(velocities)
-                })
+        candidates = self._clip_outliers(candidates, trace_id, ranker.values())
+        return self._get_top_results(candidates, top_n, trace_id), ranker.rows
 
-            velocity_df = pd.DataFrame(velocity_results)
+    def _calculate_velocity(self, df: pd.DataFrame, trace_id: str, score: str = DEFAULT_SCORE) -> pd.DataFrame:
+        """Calculate views per minute for each video, plus `score` unless ranking by velocity"""
+        try:
+            if score != DEFAULT_SCORE:
+                velocity_df = score_snapshots(df, score)
+            else:
+                engine = self.engine if self.engine in ENGINES else DEFAULT_ENGINE
+                velocity_df = calculate_velocity(df, engine)
 
             if not velocity_df.empty:
                 # Clip outliers (top 1%)
@@ -165,71 +435,87 @@ class VelocityAnalyzer:
             logger.error(f"Failed to calculate velocity: {e}", extra={"trace_id": trace_id})
             raise
 
-    def _clip_outliers(self, df: pd.DataFrame, trace_id: str) -> pd.DataFrame:
-        """Clip top 1% outliers by capping values at 99th percentile"""
+    def _clip_outliers(self, df: pd.DataFrame, trace_id: str,
+                       values: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Clip top 1% outliers by capping values at 99th percentile, in place.
+
+        `values` are every video's velocities when `df` holds only the
+        ranking candidates; the percentile is taken over them.
+        """
         try:
-            original_count = len(df)
-            percentile_99 = df['views_per_min'].quantile(0.99)
+            column = df['views_per_min'].to_numpy(dtype=np.float64, na_value=np.nan)
+            if values is None:
+                values = column
+            original_count = len(values)
+            percentile_99 = np.nanquantile(values, 0.99)
+            values_clipped = int(np.count_nonzero(values > percentile_99))
 
-            df_clipped = df.copy()
-            df_clipped['views_per_min'] = df_clipped['views_per_min'].clip(upper=percentile_99)
+            # Replaces only this column; the frame is the analyzer's own, so no copy is needed
+            df['views_per_min'] = np.minimum(column, percentile_99)
 
             logger.info(f"Outlier clipping applied", extra={
                 "trace_id": trace_id,
                 "original_count": original_count,
-                "values_clipped": (df['views_per_min'] > percentile_99).sum(),
+                "values_clipped": values_clipped,
                 "percentile_99_threshold": float(percentile_99)
             })
 
-            return df_clipped
+            return df
 
         except Exception as e:
             logger.error(f"Failed to clip outliers: {e}", extra={"trace_id": trace_id})
             return df
 
-    def _get_top_results(self, df: pd.DataFrame, top_n: int, trace_id: str) -> List[Dict[str, Any]]:
-        """Get top N results sorted by velocity"""
+    def _get_top_results(self, df: pd.DataFrame, top_n: int, trace_id: str,
+                         score: str = DEFAULT_SCORE) -> List[Dict[str, Any]]:
+        """Get top N results sorted by velocity or by `score`, selected without sorting the frame"""
         try:
             if df.empty:
                 return []
 
-            top_df = df.nlargest(top_n, 'views_per_min')
-
-            results = []
-            for _, row in top_df.iterrows():
-                results.append({
-                    "video_id": row['video_id'],
-                    "title": row['title'],
-                    "channel": row['channel'],
-                    "views_per_min": row['views_per_min'],
-                    "data_points": row['data_points'],
-                    "valid_intervals": row['valid_intervals']
-                })
-
-            return results
+            ranked_by = 'views_per_min' if score == DEFAULT_SCORE else 'score'
+            return [record.to_dict() for record in rank_top_k(df, top_n, ranked_by)]
 
         except Exception as e:
             logger.error(f"Failed to get top results: {e}", extra={"trace_id": trace_id})
             raise
 
-def main():
+def main(argv: Optional[List[str]] = None):
     parser = argparse.ArgumentParser(description="Analyze velocity of trending videos")
     parser.add_argument("--window", type=int, default=3, help="Time window in hours (default: 3)")
     parser.add_argument("--top-n", type=int, default=10, help="Top N results (default: 10)")
     parser.add_argument("--out-file", help="Output file path (optional)")
-
-    args = parser.parse_args()
+    parser.add_argument("--engine", choices=ANALYZER_ENGINES, default=DEFAULT_ENGINE,
+                        help=f"Velocity engine (default: {DEFAULT_ENGINE}); "
+                             "'incremental' aligns the window start to whole hours; "
+                             "'ewma' reads the collectors' online estimates updated within the window")
+    parser.add_argument("--chunk-size", type=int, default=50_000,
+                        help="Rows per fetch for the streaming engine (default: 50000)")
+    parser.add_argument("--source", choices=SNAPSHOT_SOURCES, default="raw",
+                        help="Snapshot source: raw, hourly, daily or auto (coarsest rollup for the window)")
+    parser.add_argument("--score", choices=SCORES, default=DEFAULT_SCORE,
+                        help=f"Ranking score (default: {DEFAULT_SCORE}); others need a DataFrame engine")
+    parser.add_argument("--region", help="Only rank videos of this country code (default: all regions)")
+    parser.add_argument("--publish", action="store_true",
+                        help="Replace the stored leaderboard for this region, window and score")
+
+    args = parser.parse_args(argv)
 
     setup_json_logging()
 
-    with VelocityAnalyzer() as analyzer:
-        results = analyzer.analyze_velocity(args.window, args.top_n)
+    with VelocityAnalyzer(engine=args.engine, chunk_size=args.chunk_size) as analyzer:
+        results = analyzer.analyze_velocity(args.window, args.top_n, args.source, args.score,
+                                            args.region, args.publish)
 
         output_data = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "analysis_params": {
                 "window_hours": args.window,
-                "top_n": args.top_n
+                "top_n": args.top_n,
+                "engine": args.engine,
+                "source": args.source,
+                "score": args.score,
+                "region": args.region
             },
             "results": results
         }
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+import sys
+import logging
+import argparse
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+from core.db import SessionLocal
+from core.logging import setup_json_logging
+from core.partitions import (
+    RAW_RETENTION_DAYS, drop_snapshot_partitions, expired_partitions, list_snapshot_partitions
+)
+from core.watermarks import LATE_ARRIVAL_MINUTES, lock_watermark, set_watermark
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = "rollup_metrics"
+
+# Snapshot sources readable by the analyzer, coarsest last
+ROLLUP_TABLES = {"hourly": "video_metrics_hourly", "daily": "video_metrics_daily"}
+ROLLUP_BUCKET_HOURS = {"hourly": 1, "daily": 24}
+# A source is only coarse enough if the window still holds this many buckets
+MIN_BUCKETS_PER_WINDOW = 7
+
+
+def select_rollup_source(window_hours: int) -> str:
+    """Coarsest snapshot source that still resolves the window"""
+    for source in ("daily", "hourly"):
+        if window_hours >= ROLLUP_BUCKET_HOURS[source] * MIN_BUCKETS_PER_WINDOW:
+            return source
+    return "raw"
+
+
+def _utc_datetime(value: str) -> datetime:
+    """argparse type: ISO datetime, naive values taken as UTC"""
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def uncovered_buckets(db: Session, partition: str) -> int:
+    """Hourly buckets of a raw snapshot partition missing from, or miscounted in, the hourly rollup"""
+    return db.execute(text(f"""
+        SELECT COUNT(*)
+        FROM (
+            SELECT video_id, date_trunc('hour', captured_at, 'UTC') AS bucket_start, COUNT(*) AS snapshots
+            FROM {partition}
+            GROUP BY video_id, date_trunc('hour', captured_at, 'UTC')
+        ) raw
+        LEFT JOIN video_metrics_hourly h USING (video_id, bucket_start)
+        WHERE h.snapshots IS DISTINCT FROM raw.snapshots
+    """)).scalar_one()
+
+
+def compactable_partitions(db: Session, retention_days: int = RAW_RETENTION_DAYS,
+                           today: Optional[date] = None) -> Tuple[List[str], List[str]]:
+    """Raw partitions past retention, split into (rolled up in full, not yet rolled up).
+
+    Only the hourly rows prove a day was rolled up: the watermark is the
+    latest snapshot ever rolled up, so a backfilled or late day below it
+    may never have been.
+    """
+    covered, uncovered = [], []
+    for name in expired_partitions(list_snapshot_partitions(db), retention_days, today):
+        (uncovered if uncovered_buckets(db, name) else covered).append(name)
+    return covered, uncovered
+
+
+def _rollup_aggregates(from_rollup: bool) -> str:
+    """min/max/last select list for view, like and comment counters"""
+    columns = []
+    for metric, raw_column in (("view", "view_count"), ("like", "like_count"), ("comment", "comment_count")):
+        if from_rollup:
+            low, high, last, order = f"{metric}_min", f"{metric}_max", f"{metric}_last", "bucket_start"
+        else:
+            low = high = last = raw_column
+            order = "captured_at"
+        columns += [
+            f"MIN({low}) AS {metric}_min",
+            f"MAX({high}) AS {metric}_max",
+            f"(ARRAY_AGG({last} ORDER BY {order} DESC))[1] AS {metric}_last",
+        ]
+    return ",\n                    ".join(columns)
+
+
+_ROLLUP_COLUMNS = ("snapshots", "last_captured_at",
+                   "view_min", "view_max", "view_last",
+                   "like_min", "like_max", "like_last",
+                   "comment_min", "comment_max", "comment_last")
+
+_ON_CONFLICT_REPLACE = "ON CONFLICT (video_id, bucket_start) DO UPDATE SET " + ", ".join(
+    f"{column} = EXCLUDED.{column}" for column in _ROLLUP_COLUMNS
+)
+
+
+class MetricsRollup:
+    def __init__(self):
+        self.db = SessionLocal()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.db.close()
+
+    def rollup(self, since: Optional[datetime] = None, initial_lookback_days: int = 30) -> Dict[str, int]:
+        """Rebuild hourly and daily buckets touched by snapshots newer than the watermark.
+
+        Resumes LATE_ARRIVAL_MINUTES before the watermark, so snapshots
+        committed after a later one was rolled up are still counted.
+        """
+        trace_id = f"rollup_metrics_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}"
+
+        try:
+            watermark = lock_watermark(self.db, WATERMARK_NAME)
+            if since is not None:
+                start = since
+            elif watermark is not None:
+                start = watermark - timedelta(minutes=LATE_ARRIVAL_MINUTES)
+            else:
+                start = datetime.now(timezone.utc) - timedelta(days=initial_lookback_days)
+
+            logger.info("Starting metrics rollup", extra={
+                "trace_id": trace_id,
+                "job": "rollup_metrics",
+                "since": start.isoformat()
+            })
+
+            # Whole buckets are recomputed from their first hour/day, so
+            # re-running over the same range is idempotent
+            hourly = self.db.execute(text(f"""
+                INSERT INTO video_metrics_hourly (video_id, bucket_start, {", ".join(_ROLLUP_COLUMNS)})
+                SELECT
+                    video_id,
+                    date_trunc('hour', captured_at, 'UTC') AS bucket_start,
+                    COUNT(*) AS snapshots,
+                    MAX(captured_at) AS last_captured_at,
+                    {_rollup_aggregates(from_rollup=False)}
+                FROM video_metrics_snapshot
+                WHERE captured_at >= date_trunc('hour', CAST(:since AS timestamptz), 'UTC')
+                GROUP BY video_id, date_trunc('hour', captured_at, 'UTC')
+                {_ON_CONFLICT_REPLACE}
+            """), {"since": start}).rowcount
+
+            daily = self.db.execute(text(f"""
+                INSERT INTO video_metrics_daily (video_id, bucket_start, {", ".join(_ROLLUP_COLUMNS)})
+                SELECT
+                    video_id,
+                    date_trunc('day', bucket_start, 'UTC') AS bucket_start,
+                    SUM(snapshots) AS snapshots,
+                    MAX(last_captured_at) AS last_captured_at,
+                    {_rollup_aggregates(from_rollup=True)}
+                FROM video_metrics_hourly
+                WHERE bucket_start >= date_trunc('day', CAST(:since AS timestamptz), 'UTC')
+                GROUP BY video_id, date_trunc('day', bucket_start, 'UTC')
+                {_ON_CONFLICT_REPLACE}
+            """), {"since": start}).rowcount
+
+            latest = self.db.execute(text("""
+                SELECT MAX(captured_at) FROM video_metrics_snapshot WHERE captured_at >= :since
+            """), {"since": start}).scalar()
+            if latest is not None and (watermark is None or latest > watermark):
+                set_watermark(self.db, WATERMARK_NAME, latest)
+
+            self.db.commit()
+
+            logger.info("Metrics rollup completed", extra={
+                "trace_id": trace_id,
+                "job": "rollup_metrics",
+                "hourly_buckets": hourly,
+                "daily_buckets": daily,
+                "watermark": (latest or start).isoformat()
+            })
+
+            return {"hourly_buckets": hourly, "daily_buckets": daily}
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Metrics rollup failed: {e}", extra={
+                "trace_id": trace_id,
+                "job": "rollup_metrics"
+            })
+            raise
+
+    def compact(self, raw_retention_days: int = RAW_RETENTION_DAYS) -> List[str]:
+        """Drop raw snapshot partitions past retention whose every hour is already rolled up"""
+        trace_id = f"compact_snapshots_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}"
+
+        try:
+            covered, uncovered = compactable_partitions(self.db, raw_retention_days)
+            dropped = drop_snapshot_partitions(self.db, covered)
+            self.db.commit()
+
+            if uncovered:
+                logger.warning("Kept expired partitions that are not rolled up", extra={
+                    "trace_id": trace_id,
+                    "partitions": uncovered
+                })
+
+            logger.info("Raw snapshot compaction completed", extra={
+                "trace_id": trace_id,
+                "job": "rollup_metrics",
+                "raw_retention_days": raw_retention_days,
+                "dropped": dropped
+            })
+
+            return dropped
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Raw snapshot compaction failed: {e}", extra={"trace_id": trace_id})
+            raise
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Roll up snapshots into hourly and daily tables")
+    parser.add_argument("--since", type=_utc_datetime,
+                        help="Re-roll from this UTC time instead of the stored watermark")
+    parser.add_argument("--raw-retention-days", type=int,
+                        help=f"Drop raw snapshot partitions older than this once rolled up "
+                             f"(optional; the worker uses {RAW_RETENTION_DAYS})")
+
+    args = parser.parse_args(argv)
+
+    setup_json_logging()
+
+    with MetricsRollup() as rollup:
+        rollup.rollup(since=args.since)
+        if args.raw_retention_days is not None:
+            rollup.compact(args.raw_retention_days)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Persisted trending leaderboards, one per region, window and ranking score.
+
+The analyzer publishes each ranking as a new generation of rows in
+`trending_leaderboard`, repoints `trending_leaderboard_current` at it and
+deletes the generation it replaces, all in one transaction. Readers
+resolve the pointer and read the entries in a single statement, so they
+see the old ranking or the new one in full, never a partial one. Entries
+are keyed (generation, rank), so a top-N read is a primary-key range scan
+of N rows plus N video lookups.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from analysis.scoring import DEFAULT_SCORE
+
+# Region key of leaderboards ranked over every region
+ALL_REGIONS = "ALL"
+# First key of the two-key advisory locks taken per leaderboard ("lbrd")
+LEADERBOARD_LOCK_NAMESPACE = 0x6C627264
+
+
+def publish_leaderboard(db: Session, results: Sequence[Dict[str, Any]], window_hours: int,
+                        ranked_by: str = DEFAULT_SCORE, region: Optional[str] = None,
+                        computed_at: Optional[datetime] = None) -> int:
+    """Write analyzer results (best first) as the current generation of their leaderboard.
+
+    Runs in the caller's transaction; readers switch over when it commits.
+    Results without a `score` are ranked by velocity, which is their score.
+    Returns the new generation.
+    """
+    key = {"region": region or ALL_REGIONS, "window_hours": window_hours, "ranked_by": ranked_by}
+    computed_at = computed_at or datetime.now(timezone.utc)
+
+    # Concurrent publishes of one leaderboard queue here until the holder
+    # commits, including the first, before any pointer row exists to lock
+    db.execute(text("SELECT pg_advisory_xact_lock(:namespace, hashtext(:lock_key))"), {
+        "namespace": LEADERBOARD_LOCK_NAMESPACE,
+        "lock_key": f"{key['region']}:{window_hours}:{ranked_by}",
+    })
+    previous = db.execute(text("""
+        SELECT generation FROM trending_leaderboard_current
+        WHERE region = :region AND window_hours = :window_hours AND ranked_by = :ranked_by
+    """), key).scalar_one_or_none()
+    generation = db.execute(text("SELECT nextval('trending_leaderboard_generation_seq')")).scalar_one()
+
+    if results:
+        db.execute(text("""
+            INSERT INTO trending_leaderboard (generation, rank, video_id, score, views_per_min, computed_at)
+            SELECT :generation, rank, video_id, score, views_per_min, :computed_at
+            FROM UNNEST(CAST(:video_ids AS text[]), CAST(:scores AS float8[]), CAST(:views_per_min AS float8[]))
+                WITH ORDINALITY AS t(video_id, score, views_per_min, rank)
+        """), {
+            "generation": generation,
+            "computed_at": computed_at,
+            "video_ids": [result["video_id"] for result in results],
+            "scores": [float(result.get("score", result["views_per_min"])) for result in results],
+            "views_per_min": [float(result["views_per_min"]) for result in results],
+        })
+
+    db.execute(text("""
+        INSERT INTO trending_leaderboard_current (region, window_hours, ranked_by, generation, entries, computed_at)
+        VALUES (:region, :window_hours, :ranked_by, :generation, :entries, :computed_at)
+        ON CONFLICT (region, window_hours, ranked_by) DO UPDATE SET
+            generation = EXCLUDED.generation,
+            entries = EXCLUDED.entries,
+            computed_at = EXCLUDED.computed_at
+    """), {**key, "generation": generation, "entries": len(results), "computed_at": computed_at})
+
+    if previous is not None:
+        db.execute(text("DELETE FROM trending_leaderboard WHERE generation = :generation"),
+                   {"generation": previous})
+    return generation
+
+
+def read_leaderboard(db: Session, region: Optional[str] = None, window_hours: int = 3,
+                     ranked_by: str = DEFAULT_SCORE, top_n: int = 10) -> List[Dict[str, Any]]:
+    """Top N entries of the current generation; empty if none was published"""
+    rows = db.execute(text("""
+        SELECT l.rank, l.video_id, v.title, v.channel, l.score, l.views_per_min, l.computed_at
+        FROM trending_leaderboard_current c
+        JOIN trending_leaderboard l ON l.generation = c.generation AND l.rank <= :top_n
+        LEFT JOIN videos v ON v.video_id = l.video_id
+        WHERE c.region = :region AND c.window_hours = :window_hours AND c.ranked_by = :ranked_by
+        ORDER BY l.rank
+    """), {"region": region or ALL_REGIONS, "window_hours": window_hours, "ranked_by": ranked_by,
+           "top_n": top_n}).fetchall()
+
+    return [{
+        "rank": row.rank,
+        "video_id": row.video_id,
+        "title": row.title,
+        "channel": row.channel,
+        "score": row.score,
+        "views_per_min": row.views_per_min,
+        "computed_at": row.computed_at
+    } for row in rows]
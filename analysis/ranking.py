@@ -0,0 +1,182 @@
+"""Top-K selection and result records for the analyzer output path.
+
+TopK keeps only the k best values seen so far and is fed in chunks: each
+chunk is merged with the current candidates and cut back to k with
+np.partition, so ranking n values costs O(n + (n / chunk) * k) and never
+holds more than a chunk plus k candidates. Ties rank by position, the same
+order as DataFrame.nlargest(keep='first') and the SQL engine's video_id
+tie-break on frames sorted by video_id. NaN values are never ranked.
+
+ClippedTopK ranks a per-video frame fed in chunks when the ranking column
+is clipped at a quantile only known after the last chunk. Clipping ties
+every value above the cap, and ties rank by position, so the final top k
+can be the earliest clipped rows rather than the k largest. A row can only
+make the cut if fewer than k earlier rows are at least as large, so only
+those rows are kept: about k * (1 + ln(n / k)) of them when ids are in no
+particular order by value, all n in the worst case of values rising with
+position. Every value is still kept as float64, 8 bytes per row, for the
+exact quantile.
+
+Only the k selected rows become RankedVideo records; the full per-video
+frame is never copied, sorted or iterated row by row.
+"""
+import heapq
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Values fed to TopK per merge by top_k_positions
+RANK_CHUNK_SIZE = 65_536
+
+
+def _select(values: np.ndarray, positions: np.ndarray, k: int):
+    """The k largest values (earliest positions first on ties at the cut), unordered"""
+    if len(values) <= k:
+        return values, positions
+
+    cut = len(values) - k
+    kth = np.partition(values, cut)[cut]
+    above = np.flatnonzero(values > kth)
+    tied = np.flatnonzero(values == kth)
+    tied = tied[np.argsort(positions[tied], kind='stable')[:k - len(above)]]
+    keep = np.concatenate([above, tied])
+    return values[keep], positions[keep]
+
+
+class TopK:
+    """The k largest of all values added so far, with their positions"""
+
+    def __init__(self, k: int):
+        self.k = max(int(k), 0)
+        self._values = np.empty(0, dtype=np.float64)
+        self._positions = np.empty(0, dtype=np.int64)
+        self.rows = 0
+
+    def add_chunk(self, values: np.ndarray) -> None:
+        """Add the next chunk; positions continue from the previous chunk's end"""
+        values = np.asarray(values, dtype=np.float64)
+        positions = np.arange(self.rows, self.rows + len(values), dtype=np.int64)
+        self.rows += len(values)
+        if self.k == 0 or len(values) == 0:
+            return
+
+        ranked = ~np.isnan(values)
+        self._values, self._positions = _select(
+            np.concatenate([self._values, values[ranked]]),
+            np.concatenate([self._positions, positions[ranked]]),
+            self.k,
+        )
+
+    def result(self) -> np.ndarray:
+        """Positions of the selected values, best first"""
+        order = np.lexsort((self._positions, -self._values))
+        return self._positions[order]
+
+
+def top_k_positions(values: np.ndarray, k: int, chunk_size: int = RANK_CHUNK_SIZE) -> np.ndarray:
+    """Positions of the k largest values, best first, streamed through TopK"""
+    selector = TopK(k)
+    for start in range(0, len(values), chunk_size):
+        selector.add_chunk(values[start:start + chunk_size])
+    return selector.result()
+
+
+class ClippedTopK:
+    """Ranking candidates of a per-video frame fed in position order, for a cap set afterwards"""
+
+    def __init__(self, k: int, by: str = "views_per_min"):
+        self.k = max(int(k), 0)
+        self.by = by
+        self._values: List[np.ndarray] = []
+        self._candidates: List[pd.DataFrame] = []
+        # The k largest values so far; its root is the bar a later row must beat
+        self._largest: List[float] = []
+        self.rows = 0
+
+    def add_chunk(self, chunk: pd.DataFrame) -> None:
+        """Add the next rows; only those fewer than k earlier rows match or beat are kept"""
+        if chunk.empty:
+            return
+
+        values = chunk[self.by].to_numpy(dtype=np.float64, na_value=np.nan)
+        self._values.append(values)
+        self.rows += len(values)
+        if self.k == 0:
+            return
+
+        # The bar only rises, so rows at or below it now can never be kept (NaN never is)
+        bar = self._largest[0] if len(self._largest) == self.k else -np.inf
+        keep = []
+        for position in np.flatnonzero(values > bar):
+            value = float(values[position])
+            if len(self._largest) < self.k:
+                heapq.heappush(self._largest, value)
+            elif value > self._largest[0]:
+                heapq.heapreplace(self._largest, value)
+            else:
+                continue
+            keep.append(position)
+
+        if keep:
+            self._candidates.append(chunk.iloc[keep])
+
+    def values(self) -> np.ndarray:
+        """Every value added, in position order"""
+        if not self._values:
+            return np.empty(0, dtype=np.float64)
+        return np.concatenate(self._values)
+
+    def candidates(self) -> pd.DataFrame:
+        """Kept rows in position order; ranking them after any cap matches ranking every row"""
+        if not self._candidates:
+            return pd.DataFrame()
+        return pd.concat(self._candidates, ignore_index=True)
+
+
+class RankedVideo:
+    """One ranked video; slots keep each of the k records to its fields"""
+
+    __slots__ = ("video_id", "title", "channel", "views_per_min", "data_points", "valid_intervals", "score")
+
+    def __init__(self, video_id: str, title: Optional[str], channel: Optional[str], views_per_min: float,
+                 data_points: int, valid_intervals: int, score: Optional[float] = None):
+        self.video_id = video_id
+        self.title = title
+        self.channel = channel
+        self.views_per_min = views_per_min
+        self.data_points = data_points
+        self.valid_intervals = valid_intervals
+        self.score = score
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Analyzer result dict; `score` only when ranking by a score other than velocity"""
+        result = {
+            "video_id": self.video_id,
+            "title": self.title,
+            "channel": self.channel,
+            "views_per_min": self.views_per_min,
+            "data_points": self.data_points,
+            "valid_intervals": self.valid_intervals
+        }
+        if self.score is not None:
+            result["score"] = self.score
+        return result
+
+
+def rank_top_k(df: pd.DataFrame, k: int, by: str = "views_per_min") -> List[RankedVideo]:
+    """Top k rows of a per-video result frame by `by`, as records.
+
+    The frame has the velocity engines' columns, plus `score` when ranking
+    by a score; only the selected rows' values are pulled out, as Python
+    scalars.
+    """
+    if df.empty:
+        return []
+
+    positions = top_k_positions(df[by].to_numpy(dtype=np.float64, na_value=np.nan), k)
+    columns = ["video_id", "title", "channel", "views_per_min", "data_points", "valid_intervals"]
+    if "score" in df.columns:
+        columns.append("score")
+    values = [df[column].to_numpy()[positions].tolist() for column in columns]
+    return [RankedVideo(*row) for row in zip(*values)]
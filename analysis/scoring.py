@@ -0,0 +1,159 @@
+"""Trend scores over snapshot series, computed in batched NumPy.
+
+Every score starts from the same interval velocities as the velocity
+engines (analysis.velocity.compute_intervals) and reduces to one value per
+video by taking the maximum over the window:
+
+  velocity          peak views per minute (the analyzer's original ranking)
+  acceleration      peak change in views per minute per minute (second difference)
+  channel_relative  peak velocity over the channel's median interval velocity,
+                    so a fast video on a small channel beats a routine one on a huge channel
+  anomaly           peak rolling z-score of an interval against the video's own
+                    preceding intervals, so spikes stand out whatever the size
+"""
+import numpy as np
+import pandas as pd
+
+from analysis.velocity import compute_intervals
+
+SCORES = ("velocity", "acceleration", "channel_relative", "anomaly")
+DEFAULT_SCORE = "velocity"
+
+# Preceding intervals the anomaly z-score compares against, and the fewest it needs
+ANOMALY_WINDOW = 6
+ANOMALY_MIN_PERIODS = 3
+# Floor on the rolling standard deviation (views per minute) so flat series
+# don't turn a small wobble into a huge z-score
+ANOMALY_MIN_STD = 1.0
+
+
+def _group_starts(codes: np.ndarray) -> np.ndarray:
+    """Positions where a new video begins in rows sorted by video"""
+    return np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+
+
+def _reduce_max(values: np.ndarray, valid: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Per-video max over valid rows; -inf for videos without one"""
+    return np.maximum.reduceat(np.where(valid, values, -np.inf), starts)
+
+
+def interval_acceleration(df: pd.DataFrame, velocities: np.ndarray, valid: np.ndarray):
+    """Change in velocity between consecutive valid intervals of the same video.
+
+    Divided by the minutes between the two intervals' midpoints, so the
+    unit is views per minute per minute. Returns (acceleration, valid mask)
+    aligned with the sorted rows; the value sits on the later interval.
+    """
+    captured_ns = df['captured_at'].values.astype('datetime64[ns]').astype(np.int64)
+    acceleration = np.full(len(df), np.nan)
+    accelerated = np.zeros(len(df), dtype=bool)
+    if len(df) < 3:
+        return acceleration, accelerated
+
+    # valid[i] means rows i-1 and i belong to one video, so valid[i] & valid[i-1]
+    # means rows i-2..i do and both intervals are usable
+    accelerated[2:] = valid[2:] & valid[1:-1]
+    midpoint_minutes = (captured_ns[2:] - captured_ns[:-2]) / 2 / 60e9
+    with np.errstate(divide='ignore', invalid='ignore'):
+        acceleration[2:] = (velocities[2:] - velocities[1:-1]) / midpoint_minutes
+    accelerated &= np.isfinite(acceleration)
+    return acceleration, accelerated
+
+
+def rolling_zscores(velocities: np.ndarray, valid: np.ndarray, codes: np.ndarray,
+                    window: int = ANOMALY_WINDOW, min_periods: int = ANOMALY_MIN_PERIODS):
+    """Z-score of each valid interval against the video's preceding `window` valid intervals.
+
+    Prefix sums over the valid intervals give every window's mean and
+    variance without a Python loop. Values are centered on their video's
+    mean and the sums restart at every video, so they stay at the scale of
+    one video's spread; sums across the whole frame would reach ~1e16 and
+    leave nothing of a small video's variance. Returns (zscores, valid
+    mask) aligned with the sorted rows.
+    """
+    zscores = np.full(len(velocities), np.nan)
+    scored = np.zeros(len(velocities), dtype=bool)
+    positions = np.flatnonzero(valid)
+    if len(positions) == 0:
+        return zscores, scored
+
+    values = velocities[positions]
+    video = codes[positions]
+    # Index of each interval within its video's valid intervals
+    starts = _group_starts(video)
+    lengths = np.diff(np.r_[starts, len(values)])
+    rank = np.arange(len(values)) - np.repeat(starts, lengths)
+
+    centered = values - np.repeat(np.add.reduceat(values, starts) / lengths, lengths)
+    squared = centered * centered
+    # Sums of the video's intervals before each one
+    sums = pd.Series(centered).groupby(video, sort=False).cumsum().to_numpy() - centered
+    squares = pd.Series(squared).groupby(video, sort=False).cumsum().to_numpy() - squared
+    index = np.arange(len(values))
+    count = np.minimum(rank, window)
+    lo = index - count
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = (sums - sums[lo]) / count
+        variance = (squares - squares[lo]) / count - mean * mean
+        std = np.maximum(np.sqrt(np.clip(variance, 0.0, None)), ANOMALY_MIN_STD)
+        z = (centered - mean) / std
+
+    enough = count >= min_periods
+    zscores[positions[enough]] = z[enough]
+    scored[positions[enough]] = True
+    return zscores, scored
+
+
+def score_snapshots(df: pd.DataFrame, score: str = DEFAULT_SCORE) -> pd.DataFrame:
+    """Per-video velocity columns plus a `score` column for the chosen score.
+
+    Takes the analyzer's snapshot frame (video_id, captured_at, view_count,
+    title, channel). Videos the score cannot be computed for (e.g. too few
+    intervals for acceleration) are left out.
+    """
+    if score not in SCORES:
+        raise ValueError(f"Unknown score: {score}")
+    if df.empty:
+        return pd.DataFrame()
+
+    df, velocities, valid = compute_intervals(df)
+    codes, _ = pd.factorize(df['video_id'], sort=False)
+    starts = _group_starts(codes)
+
+    data_points = np.diff(np.r_[starts, len(df)])
+    valid_intervals = np.add.reduceat(valid.astype(np.int64), starts)
+    max_velocity = _reduce_max(velocities, valid, starts)
+
+    if score == "acceleration":
+        values, scored = interval_acceleration(df, velocities, valid)
+        scores = _reduce_max(values, scored, starts)
+    elif score == "anomaly":
+        values, scored = rolling_zscores(velocities, valid, codes)
+        scores = _reduce_max(values, scored, starts)
+    else:
+        scores = max_velocity
+
+    keep = (data_points >= 2) & (valid_intervals > 0) & np.isfinite(scores)
+    first_rows = starts[keep]
+    result = pd.DataFrame({
+        'video_id': df['video_id'].to_numpy()[first_rows],
+        'title': df['title'].to_numpy()[first_rows],
+        'channel': df['channel'].to_numpy()[first_rows],
+        'views_per_min': max_velocity[keep].astype(np.float64),
+        'data_points': data_points[keep],
+        'valid_intervals': valid_intervals[keep],
+        'score': scores[keep].astype(np.float64),
+    })
+
+    if score == "channel_relative" and not result.empty:
+        # Channel baseline: median interval velocity over all its videos' intervals,
+        # plus the global median so a channel seen once cannot divide by ~0
+        channels = df['channel'].to_numpy()[valid]
+        interval_velocity = pd.Series(velocities[valid])
+        baseline = interval_velocity.groupby(channels).median()
+        prior = float(interval_velocity.median())
+        channel_baseline = result['channel'].map(baseline).fillna(0.0).to_numpy()
+        result['score'] = result['views_per_min'].to_numpy() / (channel_baseline + prior + 1e-9)
+
+    return result
@@ -0,0 +1,255 @@
+"""Velocity calculation engines (views per minute per video)"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+ENGINES = ("loop", "vectorized")
+DEFAULT_ENGINE = "vectorized"
+
+# Granularity of incremental velocity state
+BUCKET_SIZE = pd.Timedelta(hours=1)
+
+
+def calculate_velocity_loop(df: pd.DataFrame) -> pd.DataFrame:
+    """Reference per-video implementation (one groupby iteration per video)"""
+    velocity_results = []
+
+    for video_id, group in df.groupby('video_id'):
+        if len(group) < 2:
+            continue  # Need at least 2 data points
+
+        # Sort by time and calculate differences
+        group_sorted = group.sort_values('captured_at')
+
+        # Calculate time differences in minutes
+        time_diffs = group_sorted['captured_at'].diff()
+        time_diffs_minutes = time_diffs.dt.total_seconds() / 60
+
+        # Calculate view differences
+        view_diffs = group_sorted['view_count'].diff()
+
+        # Calculate velocity (views per minute)
+        valid_mask = (time_diffs_minutes > 0) & (view_diffs >= 0)
+
+        if not valid_mask.any():
+            continue
+
+        velocities = view_diffs[valid_mask] / time_diffs_minutes[valid_mask]
+
+        # Remove infinite and NaN values
+        velocities = velocities[np.isfinite(velocities)]
+
+        if len(velocities) == 0:
+            continue
+
+        # Use maximum velocity for this video
+        max_velocity = velocities.max()
+
+        velocity_results.append({
+            'video_id': video_id,
+            'title': group['title'].iloc[0],
+            'channel': group['channel'].iloc[0],
+            'views_per_min': float(max_velocity),
+            'data_points': len(group),
+            'valid_intervals': len(velocities)
+        })
+
+    return pd.DataFrame(velocity_results)
+
+
+def compute_intervals(df: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """Sort snapshots once and compute per-row interval velocities.
+
+    Returns the sorted frame, the velocity of the interval ending at each row
+    and a boolean mask of rows whose interval is valid (same video, Δt > 0,
+    Δviews >= 0 and a finite result).
+    """
+    df = df.sort_values(['video_id', 'captured_at'], kind='mergesort')
+
+    video_ids = df['video_id'].to_numpy()
+    captured_ns = df['captured_at'].values.astype('datetime64[ns]').astype(np.int64)
+    views = df['view_count'].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    same_video = np.zeros(len(df), dtype=bool)
+    same_video[1:] = video_ids[1:] == video_ids[:-1]
+
+    minutes_diff = np.diff(captured_ns, prepend=captured_ns[:1]) / 60e9
+    views_diff = np.diff(views, prepend=views[:1])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        valid = same_video & (minutes_diff > 0) & (views_diff >= 0)
+        velocities = np.where(valid, views_diff / np.where(valid, minutes_diff, 1.0), np.nan)
+    valid &= np.isfinite(velocities)
+
+    return df, velocities, valid
+
+
+def calculate_velocity_vectorized(df: pd.DataFrame) -> pd.DataFrame:
+    """Columnar implementation: one sort, one diff pass and one reduction"""
+    if df.empty:
+        return pd.DataFrame()
+
+    df, velocities, valid = compute_intervals(df)
+
+    # Rows are contiguous per video after the sort, so group starts are
+    # simply the positions where video_id changes
+    codes, _ = pd.factorize(df['video_id'], sort=False)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+
+    data_points = np.diff(np.r_[starts, len(df)])
+    valid_intervals = np.add.reduceat(valid.astype(np.int64), starts)
+    max_velocity = np.maximum.reduceat(np.where(valid, velocities, -np.inf), starts)
+
+    keep = (data_points >= 2) & (valid_intervals > 0)
+    first_rows = starts[keep]
+
+    return pd.DataFrame({
+        'video_id': df['video_id'].to_numpy()[first_rows],
+        'title': df['title'].to_numpy()[first_rows],
+        'channel': df['channel'].to_numpy()[first_rows],
+        'views_per_min': max_velocity[keep].astype(np.float64),
+        'data_points': data_points[keep],
+        'valid_intervals': valid_intervals[keep],
+    })
+
+
+def calculate_velocity(df: pd.DataFrame, engine: str = DEFAULT_ENGINE) -> pd.DataFrame:
+    """Dispatch to the selected velocity engine"""
+    if engine == "loop":
+        return calculate_velocity_loop(df)
+    if engine == "vectorized":
+        return calculate_velocity_vectorized(df)
+    raise ValueError(f"Unknown velocity engine: {engine}")
+
+
+class VelocityAccumulator:
+    """Per-video velocity reduction fed by chunks ordered by (video_id, captured_at).
+
+    Rows of the last video in a chunk are held back until the next chunk
+    proves the video complete, so peak memory is one chunk plus one video's
+    history plus the per-video results. With `keep=False` the results are
+    not held: add_chunk and flush hand back each batch of completed videos
+    for the caller to reduce further, and result() stays empty.
+    """
+
+    def __init__(self, keep: bool = True):
+        self.keep = keep
+        self._partials: List[pd.DataFrame] = []
+        self._carry: Optional[pd.DataFrame] = None
+        self.rows = 0
+
+    def add_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Add the next chunk; returns the velocity of the videos it completed"""
+        if chunk.empty:
+            return pd.DataFrame()
+
+        self.rows += len(chunk)
+        if self._carry is not None:
+            chunk = pd.concat([self._carry, chunk], ignore_index=True)
+
+        video_ids = chunk['video_id'].to_numpy()
+        tail = video_ids == video_ids[-1]
+
+        self._carry = chunk[tail]
+        complete = chunk[~tail]
+        if complete.empty:
+            return pd.DataFrame()
+        return self._append(calculate_velocity_vectorized(complete))
+
+    def flush(self) -> pd.DataFrame:
+        """Complete the held-back video; returns its velocity"""
+        if self._carry is None:
+            return pd.DataFrame()
+
+        carry, self._carry = self._carry, None
+        return self._append(calculate_velocity_vectorized(carry))
+
+    def result(self) -> pd.DataFrame:
+        self.flush()
+        if not self._partials:
+            return pd.DataFrame()
+        return pd.concat(self._partials, ignore_index=True)
+
+    def _append(self, partial: pd.DataFrame) -> pd.DataFrame:
+        if self.keep and not partial.empty:
+            self._partials.append(partial)
+        return partial
+
+
+def bucket_velocity(snapshots: pd.DataFrame, state: pd.DataFrame,
+                    bucket: pd.Timedelta = BUCKET_SIZE) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Fold a batch of new snapshots into per-video time buckets.
+
+    `state` holds the last processed snapshot per video (video_id,
+    last_captured_at, last_view_count) so the first interval of the batch is
+    computed without re-reading history. Snapshots are counted in the bucket
+    of their capture time and intervals in the bucket of their start time, so
+    any bucket-aligned window aggregates to the same result as a full
+    recompute over that window.
+
+    Returns (buckets, new_state).
+    """
+    bucket_columns = ['video_id', 'bucket_start', 'snapshots', 'valid_intervals', 'max_views_per_min']
+    state_columns = ['video_id', 'last_captured_at', 'last_view_count']
+
+    if snapshots.empty:
+        return pd.DataFrame(columns=bucket_columns), pd.DataFrame(columns=state_columns)
+
+    current = snapshots[['video_id', 'captured_at', 'view_count']].assign(is_new=True)
+    prior = state[state['video_id'].isin(current['video_id'])]
+    prior = pd.DataFrame({
+        'video_id': prior['video_id'],
+        'captured_at': prior['last_captured_at'],
+        'view_count': prior['last_view_count'],
+        'is_new': False,
+    })
+
+    combined = pd.concat([prior, current] if not prior.empty else [current], ignore_index=True)
+    combined['captured_at'] = pd.to_datetime(combined['captured_at'], utc=True)
+
+    df, velocities, valid = compute_intervals(combined)
+
+    # Interval start is the previous row's capture time (same video when valid)
+    interval_start = df['captured_at'].shift(1)
+    intervals = pd.DataFrame({
+        'video_id': df['video_id'][valid],
+        'bucket_start': interval_start.dt.floor(bucket)[valid],
+        'views_per_min': velocities[valid],
+    })
+    interval_agg = intervals.groupby(['video_id', 'bucket_start']).agg(
+        valid_intervals=('views_per_min', 'size'),
+        max_views_per_min=('views_per_min', 'max'),
+    )
+
+    new_rows = df[df['is_new']]
+    snapshot_agg = new_rows.groupby(
+        [new_rows['video_id'], new_rows['captured_at'].dt.floor(bucket).rename('bucket_start')]
+    ).size().rename('snapshots')
+
+    buckets = pd.concat([snapshot_agg, interval_agg], axis=1).reset_index()
+    buckets['snapshots'] = buckets['snapshots'].fillna(0).astype(np.int64)
+    buckets['valid_intervals'] = buckets['valid_intervals'].fillna(0).astype(np.int64)
+
+    last_rows = df.groupby('video_id', sort=False).tail(1)
+    new_state = pd.DataFrame({
+        'video_id': last_rows['video_id'],
+        'last_captured_at': last_rows['captured_at'],
+        'last_view_count': last_rows['view_count'],
+    }).reset_index(drop=True)
+
+    return buckets[bucket_columns], new_state
+
+
+def aggregate_buckets(buckets: pd.DataFrame) -> pd.DataFrame:
+    """Reduce bucket rows to per-video velocity (same columns as the engines minus metadata)"""
+    if buckets.empty:
+        return pd.DataFrame()
+
+    per_video = buckets.groupby('video_id', sort=True).agg(
+        views_per_min=('max_views_per_min', 'max'),
+        data_points=('snapshots', 'sum'),
+        valid_intervals=('valid_intervals', 'sum'),
+    ).reset_index()
+
+    return per_video[per_video['valid_intervals'] > 0].reset_index(drop=True)
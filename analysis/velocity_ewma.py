@@ -0,0 +1,176 @@
+"""Online velocity estimate per video: an EWMA of views per minute and its variance.
+
+Each snapshot write folds the new interval into the video's row of
+`video_velocity_ewma` in constant time, so the estimate never re-reads
+snapshot history. Weights decay with elapsed time rather than sample
+count (alpha = 1 - 2^(-Δt / half-life)), so irregular polling from the
+adaptive schedule weighs intervals fairly. The variance uses the
+incremental exponentially weighted form:
+
+    diff = v - mean;  mean += alpha * diff;  var = (1 - alpha) * (var + alpha * diff²)
+
+Snapshots at or before a video's last folded-in capture time are ignored,
+so replays are idempotent; a view count lower than the last one moves the
+reference point without touching the estimate.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+EWMA_HALF_LIFE_MINUTES = 60.0
+# Estimates not refreshed for longer than this are left out of top-N reads
+DEFAULT_MAX_AGE_HOURS = 3
+
+
+def ewma_step(last_micros: np.ndarray, last_views: np.ndarray, mean: np.ndarray, variance: np.ndarray,
+              samples: np.ndarray, micros: np.ndarray, views: np.ndarray,
+              half_life_minutes: float = EWMA_HALF_LIFE_MINUTES) -> Dict[str, np.ndarray]:
+    """Fold one new snapshot per video into its state, vectorized over videos.
+
+    Times are whole epoch microseconds (exact in float64, unlike fractional
+    seconds, so a replayed snapshot never looks newer); videos without
+    state have NaN `last_micros` and `mean`. Returns the new state arrays
+    under the same names.
+    """
+    mean = mean.astype(np.float64).copy()
+    variance = variance.astype(np.float64).copy()
+    samples = samples.astype(np.int64).copy()
+
+    has_state = ~np.isnan(last_micros)
+    newer = ~has_state | (micros > np.where(has_state, last_micros, -np.inf))
+    minutes = (micros - last_micros) / 60e6
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = (views - last_views) / minutes
+        valid = has_state & newer & (views >= last_views) & np.isfinite(rate)
+
+    first = valid & np.isnan(mean)
+    mean[first] = rate[first]
+    variance[first] = 0.0
+
+    later = valid & ~first
+    alpha = 1.0 - np.exp2(-minutes[later] / half_life_minutes)
+    diff = rate[later] - mean[later]
+    mean[later] += alpha * diff
+    variance[later] = (1.0 - alpha) * (variance[later] + alpha * diff * diff)
+    samples[valid] += 1
+
+    return {
+        "last_micros": np.where(newer, micros, last_micros),
+        "last_views": np.where(newer, views, last_views),
+        "mean": mean,
+        "variance": variance,
+        "samples": samples,
+        "changed": newer,
+    }
+
+
+def update_velocity_ewma(db: Session, rows: Sequence[Dict[str, Any]],
+                         half_life_minutes: float = EWMA_HALF_LIFE_MINUTES) -> int:
+    """Fold snapshot rows (video_id, captured_at, view_count) into the estimates.
+
+    Runs in the caller's transaction, locking the affected estimate rows so
+    concurrent collectors never lose an update. A video with several rows
+    is folded in capture order. Returns estimate rows written.
+    """
+    if not rows:
+        return 0
+
+    snapshots = pd.DataFrame(list(rows), columns=["video_id", "captured_at", "view_count"]).dropna()
+    if snapshots.empty:
+        return 0
+    snapshots["captured_at"] = pd.to_datetime(snapshots["captured_at"], utc=True)
+    snapshots = snapshots.sort_values(["video_id", "captured_at"], kind="mergesort")
+    # One statement per round touches each video at most once
+    rounds = snapshots.groupby("video_id", sort=False).cumcount().to_numpy()
+
+    written = 0
+    for round_index in range(int(rounds.max()) + 1):
+        batch = snapshots[rounds == round_index]
+        written += _fold_batch(db, batch, half_life_minutes)
+    return written
+
+
+def _fold_batch(db: Session, batch: pd.DataFrame, half_life_minutes: float) -> int:
+    ids = batch["video_id"].tolist()
+    state = pd.DataFrame(db.execute(text("""
+        SELECT video_id, (EXTRACT(EPOCH FROM last_captured_at) * 1000000)::bigint AS last_micros,
+               last_view_count, views_per_min, variance, samples
+        FROM video_velocity_ewma
+        WHERE video_id = ANY(:ids)
+        FOR UPDATE
+    """), {"ids": ids}).fetchall(), columns=["video_id", "last_micros", "last_view_count",
+                                             "views_per_min", "variance", "samples"])
+    state = batch[["video_id"]].merge(state, on="video_id", how="left")
+
+    step = ewma_step(
+        state["last_micros"].to_numpy(dtype=np.float64, na_value=np.nan),
+        state["last_view_count"].to_numpy(dtype=np.float64, na_value=np.nan),
+        state["views_per_min"].to_numpy(dtype=np.float64, na_value=np.nan),
+        state["variance"].to_numpy(dtype=np.float64, na_value=np.nan),
+        state["samples"].fillna(0).to_numpy(dtype=np.int64),
+        (batch["captured_at"].to_numpy(dtype="datetime64[ns]").astype(np.int64) // 1000).astype(np.float64),
+        batch["view_count"].to_numpy(dtype=np.float64),
+        half_life_minutes,
+    )
+    changed = step["changed"]
+    if not changed.any():
+        return 0
+
+    def column(values: np.ndarray) -> List[Optional[float]]:
+        return [None if np.isnan(value) else float(value) for value in values[changed]]
+
+    db.execute(text("""
+        INSERT INTO video_velocity_ewma
+            (video_id, last_captured_at, last_view_count, views_per_min, variance, samples, updated_at)
+        SELECT video_id, TIMESTAMPTZ 'epoch' + last_micros * INTERVAL '1 microsecond', last_view_count,
+               views_per_min, variance, samples, NOW()
+        FROM UNNEST(CAST(:ids AS text[]), CAST(:last_micros AS bigint[]), CAST(:last_views AS bigint[]),
+                    CAST(:means AS float8[]), CAST(:variances AS float8[]), CAST(:samples AS int[]))
+            AS t(video_id, last_micros, last_view_count, views_per_min, variance, samples)
+        ON CONFLICT (video_id) DO UPDATE SET
+            last_captured_at = EXCLUDED.last_captured_at,
+            last_view_count = EXCLUDED.last_view_count,
+            views_per_min = EXCLUDED.views_per_min,
+            variance = EXCLUDED.variance,
+            samples = EXCLUDED.samples,
+            updated_at = EXCLUDED.updated_at
+    """), {
+        "ids": [video_id for video_id, keep in zip(ids, changed) if keep],
+        "last_micros": step["last_micros"][changed].astype(np.int64).tolist(),
+        "last_views": step["last_views"][changed].astype(np.int64).tolist(),
+        "means": column(step["mean"]),
+        "variances": column(step["variance"]),
+        "samples": step["samples"][changed].tolist(),
+    })
+    return int(changed.sum())
+
+
+def top_ewma_velocity(db: Session, top_n: int = 10, max_age_hours: int = DEFAULT_MAX_AGE_HOURS,
+                      region: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Fastest videos by current estimate, read from the rate index without touching snapshots"""
+    rows = db.execute(text("""
+        SELECT e.video_id, v.title, v.channel, e.views_per_min, e.variance, e.samples
+        FROM video_velocity_ewma e
+        JOIN videos v ON v.video_id = e.video_id
+        WHERE e.views_per_min IS NOT NULL
+          AND e.last_captured_at >= NOW() - make_interval(hours => :hours)
+          AND (CAST(:region AS text) IS NULL OR v.country_code = :region)
+        ORDER BY e.views_per_min DESC
+        LIMIT :top_n
+    """), {"hours": max_age_hours, "top_n": top_n, "region": region}).fetchall()
+
+    return [{
+        "video_id": row.video_id,
+        "title": row.title,
+        "channel": row.channel,
+        "views_per_min": float(row.views_per_min),
+        "views_per_min_std": float(np.sqrt(max(row.variance or 0.0, 0.0))),
+        "data_points": int(row.samples) + 1,
+        "valid_intervals": int(row.samples)
+    } for row in rows]
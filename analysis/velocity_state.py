@@ -0,0 +1,187 @@
+"""Persisted incremental velocity state"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from core.models import VideoVelocityState, VideoVelocityBucket
+from core.watermarks import LATE_ARRIVAL_MINUTES, lock_watermark, set_watermark
+from analysis.velocity import BUCKET_SIZE, bucket_velocity
+
+logger = logging.getLogger(__name__)
+
+# Watermark of the buckets kept by the incremental analyzer
+VELOCITY_WATERMARK = "analyzer_velocity"
+
+
+def _none_if_missing(value: Any) -> Any:
+    """Convert pandas/NumPy scalars into DB-friendly Python values"""
+    if value is None or (isinstance(value, float) and np.isnan(value)) or value is pd.NaT:
+        return None
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    return value
+
+
+def align_cutoff(window_hours: int, now: Optional[datetime] = None,
+                 bucket: pd.Timedelta = BUCKET_SIZE) -> pd.Timestamp:
+    """Window start rounded up to the next bucket boundary"""
+    now = pd.Timestamp(now or datetime.now(timezone.utc))
+    return (now - pd.Timedelta(hours=window_hours)).ceil(bucket)
+
+
+class VelocityStateStore:
+    """Per-video velocity buckets updated from snapshots newer than a watermark.
+
+    The watermark lives in `analyzer_watermark`, so a restarted process picks
+    up exactly where the previous run stopped. Each refresh re-reads
+    `lookback_minutes` before the watermark so snapshots that became visible
+    late are still folded in; rows at or before a video's stored state were
+    processed already and are skipped. A late row older than a snapshot of
+    the same video that was already processed cannot be folded in anymore.
+    """
+
+    def __init__(self, db: Session, name: str = VELOCITY_WATERMARK, retention_hours: int = 48,
+                 lookback_minutes: int = LATE_ARRIVAL_MINUTES):
+        self.db = db
+        self.name = name
+        self.retention_hours = retention_hours
+        self.lookback_minutes = lookback_minutes
+
+    def refresh(self, trace_id: str) -> int:
+        """Fold snapshots not yet in state into buckets; returns rows processed"""
+        try:
+            watermark = lock_watermark(self.db, self.name)
+            since = watermark or datetime.now(timezone.utc) - timedelta(hours=self.retention_hours)
+
+            snapshots = self._fetch_new_snapshots(since)
+            if snapshots.empty:
+                self.db.commit()
+                logger.info("No new snapshots for velocity state", extra={
+                    "trace_id": trace_id,
+                    "watermark": since.isoformat()
+                })
+                return 0
+
+            state = self._fetch_state(snapshots['video_id'].unique().tolist())
+            buckets, new_state = bucket_velocity(snapshots, state)
+
+            self._upsert_buckets(buckets)
+            self._upsert_state(new_state)
+            # Late rows below the watermark must not move it back
+            new_watermark = max(since, snapshots['captured_at'].max().to_pydatetime())
+            set_watermark(self.db, self.name, new_watermark)
+            self._prune()
+            self.db.commit()
+
+            logger.info("Velocity state refreshed", extra={
+                "trace_id": trace_id,
+                "rows": len(snapshots),
+                "videos": len(new_state),
+                "buckets": len(buckets),
+                "watermark": new_watermark.isoformat()
+            })
+
+            return len(snapshots)
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to refresh velocity state: {e}", extra={"trace_id": trace_id})
+            raise
+
+    def load_window(self, cutoff: datetime) -> pd.DataFrame:
+        """Fetch bucket rows at or after a bucket-aligned cutoff"""
+        rows = self.db.execute(text("""
+            SELECT video_id, bucket_start, snapshots, valid_intervals, max_views_per_min
+            FROM video_velocity_bucket
+            WHERE bucket_start >= :cutoff
+        """), {"cutoff": cutoff}).fetchall()
+
+        return pd.DataFrame(rows, columns=['video_id', 'bucket_start', 'snapshots',
+                                           'valid_intervals', 'max_views_per_min'])
+
+    def _fetch_new_snapshots(self, since: datetime) -> pd.DataFrame:
+        rows = self.db.execute(text("""
+            SELECT vms.video_id, vms.captured_at, vms.view_count
+            FROM video_metrics_snapshot vms
+            LEFT JOIN video_velocity_state s ON s.video_id = vms.video_id
+            WHERE vms.captured_at > :since - make_interval(mins => :lookback)
+              AND (s.last_captured_at IS NULL OR vms.captured_at > s.last_captured_at)
+            ORDER BY vms.video_id, vms.captured_at
+        """), {"since": since, "lookback": self.lookback_minutes}).fetchall()
+
+        df = pd.DataFrame(rows, columns=['video_id', 'captured_at', 'view_count'])
+        df['captured_at'] = pd.to_datetime(df['captured_at'], utc=True)
+        return df
+
+    def _fetch_state(self, video_ids: List[str]) -> pd.DataFrame:
+        rows = self.db.execute(text("""
+            SELECT video_id, last_captured_at, last_view_count
+            FROM video_velocity_state
+            WHERE video_id = ANY(:video_ids)
+        """), {"video_ids": video_ids}).fetchall()
+
+        return pd.DataFrame(rows, columns=['video_id', 'last_captured_at', 'last_view_count'])
+
+    def _upsert_buckets(self, buckets: pd.DataFrame) -> None:
+        if buckets.empty:
+            return
+
+        records: List[Dict[str, Any]] = [
+            {key: _none_if_missing(value) for key, value in row.items()}
+            for row in buckets.to_dict(orient="records")
+        ]
+
+        stmt = insert(VideoVelocityBucket)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["video_id", "bucket_start"],
+            set_={
+                "snapshots": VideoVelocityBucket.snapshots + stmt.excluded.snapshots,
+                "valid_intervals": VideoVelocityBucket.valid_intervals + stmt.excluded.valid_intervals,
+                "max_views_per_min": text(
+                    "GREATEST(video_velocity_bucket.max_views_per_min, excluded.max_views_per_min)"
+                )
+            }
+        )
+        self.db.execute(stmt, records)
+
+    def _upsert_state(self, state: pd.DataFrame) -> None:
+        records = [
+            {key: _none_if_missing(value) for key, value in row.items()}
+            for row in state.to_dict(orient="records")
+        ]
+
+        stmt = insert(VideoVelocityState)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["video_id"],
+            set_={
+                "last_captured_at": stmt.excluded.last_captured_at,
+                "last_view_count": stmt.excluded.last_view_count,
+                "updated_at": text("NOW()")
+            }
+        )
+        self.db.execute(stmt, records)
+
+    def _prune(self) -> None:
+        """Drop buckets and state that fall outside the retention horizon"""
+        params = {"hours": self.retention_hours}
+        self.db.execute(text("""
+            DELETE FROM video_velocity_bucket
+            WHERE bucket_start < NOW() - make_interval(hours => :hours)
+        """), params)
+        self.db.execute(text("""
+            DELETE FROM video_velocity_state
+            WHERE last_captured_at < NOW() - make_interval(hours => :hours)
+        """), params)
+        # Online estimates of videos no collector has seen since (see analysis.velocity_ewma)
+        self.db.execute(text("""
+            DELETE FROM video_velocity_ewma
+            WHERE last_captured_at < NOW() - make_interval(hours => :hours)
+        """), params)
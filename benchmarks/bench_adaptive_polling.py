@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Simulated accuracy vs quota of adaptive polling (collection/polling.py).
+
+Ground truth is one synthetic view curve per video at one-minute resolution
+(benchmarks/synthetic.py). Each strategy polls videos on 10-minute collector
+ticks and estimates velocity from its two latest samples, the way the
+analyzer would; at every tick after warm-up the estimate is compared with
+the true views per minute over the last tick.
+
+Strategies:
+  fixed_60      every video every hour, like the trending pull
+  fixed_<n>     every video every n minutes, n picked to spend about what adaptive spends
+  adaptive      poll_interval() of the max measured velocity over the analyzer
+                window, reassigned hourly; videos below the tracking threshold
+                fall back to the idle interval instead of the trending pull
+
+Quota is counted per tick as ceil(polls / 50) statistics calls. No database
+is needed. Prints one JSON line per strategy.
+"""
+import sys
+import math
+import argparse
+import json
+from typing import Any, Dict
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+from collection.clients.youtube import DETAIL_BATCH_SIZE
+from collection.polling import IDLE_INTERVAL_MINUTES, POLL_TICK_MINUTES, poll_interval
+from benchmarks.synthetic import generate_snapshots, generate_videos
+
+WARMUP_MINUTES = 120
+# Share of videos, by true velocity at each tick, counted as top movers
+TOP_MOVER_SHARE = 0.1
+
+
+def true_views(videos: int, hours: int, seed: int) -> np.ndarray:
+    """(videos, minutes) cumulative views; dropped-out minutes carry the last count"""
+    frame = generate_snapshots(generate_videos(videos, seed), hours, interval_minutes=1, seed=seed)
+    matrix = frame.pivot(index="video_id", columns="captured_at", values="view_count")
+    return matrix.ffill(axis=1).fillna(0).to_numpy(dtype=np.float64)
+
+
+def simulate(views: np.ndarray, strategy: str, interval: int = 60, window_hours: int = 6) -> Dict[str, Any]:
+    videos, minutes = views.shape
+    ticks = range(0, minutes, POLL_TICK_MINUTES)
+
+    next_due = np.zeros(videos)
+    intervals = np.full(videos, float(interval))
+    last_t = np.full(videos, np.nan)
+    last_v = np.full(videos, np.nan)
+    estimate = np.full(videos, np.nan)
+    # Velocity measured at each tick, for the analyzer's max over its window
+    measured = np.full((videos, len(ticks)), np.nan)
+
+    polls = units = 0
+    errors, top_errors = [], []
+    for index, t in enumerate(ticks):
+        if strategy == "adaptive" and t % 60 == 50 and t >= WARMUP_MINUTES:
+            start = max(0, index - window_hours * 60 // POLL_TICK_MINUTES)
+            with np.errstate(all="ignore"):
+                velocity = np.nanmax(measured[:, start:index], axis=1)
+            assigned = np.array([poll_interval(v) or IDLE_INTERVAL_MINUTES for v in velocity], dtype=float)
+            known = ~np.isnan(velocity)
+            intervals[known] = assigned[known]
+            # Same rule as update_poll_schedule: speeding up pulls the next poll forward
+            next_due = np.minimum(next_due, t + intervals)
+
+        due = next_due <= t
+        count = int(due.sum())
+        polls += count
+        units += math.ceil(count / DETAIL_BATCH_SIZE)
+
+        current = views[due, t]
+        has_previous = due & ~np.isnan(last_t)
+        estimate[has_previous] = ((views[has_previous, t] - last_v[has_previous])
+                                  / (t - last_t[has_previous]))
+        measured[has_previous, index] = estimate[has_previous]
+        last_t[due], last_v[due] = t, current
+        next_due[due] = t + intervals[due]
+
+        if t >= WARMUP_MINUTES:
+            truth = (views[:, t] - views[:, t - POLL_TICK_MINUTES]) / POLL_TICK_MINUTES
+            error = np.abs(np.nan_to_num(estimate) - truth)
+            errors.append(error.mean())
+            top_errors.append(error[truth >= np.quantile(truth, 1 - TOP_MOVER_SHARE)].mean())
+
+    return {
+        "polls": polls,
+        "quota_units": units,
+        "mae_views_per_min": round(float(np.mean(errors)), 3),
+        "top_mover_mae_views_per_min": round(float(np.mean(top_errors)), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate adaptive vs fixed-interval polling")
+    parser.add_argument("--videos", type=int, default=2_000)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--window-hours", type=int, default=6, help="Analyzer window for reassignment")
+    parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+
+    views = true_views(args.videos, args.hours, args.seed)
+    results = {"fixed_60": simulate(views, "fixed", 60)}
+    results["adaptive"] = simulate(views, "adaptive", 60, args.window_hours)
+
+    # Fixed interval that spends about the adaptive quota, on tick boundaries
+    ratio = results["adaptive"]["quota_units"] / results["fixed_60"]["quota_units"]
+    matched = max(POLL_TICK_MINUTES, round(60 / ratio / POLL_TICK_MINUTES) * POLL_TICK_MINUTES)
+    if matched != 60:
+        results[f"fixed_{matched}"] = simulate(views, "fixed", matched)
+
+    reference = results["fixed_60"]
+    for name, result in results.items():
+        print(json.dumps({
+            "benchmark": "adaptive_polling",
+            "case": f"strategy={name},videos={args.videos},hours={args.hours}",
+            **result,
+            "quota_vs_fixed_60": round(result["quota_units"] / reference["quota_units"], 3),
+            "mae_vs_fixed_60": round(result["mae_views_per_min"] / reference["mae_views_per_min"], 3),
+            # Lower is better: error left after spending the run's quota
+            "mae_x_quota_vs_fixed_60": round(
+                result["mae_views_per_min"] * result["quota_units"]
+                / (reference["mae_views_per_min"] * reference["quota_units"]), 3),
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Benchmark snapshot backfill throughput against worker count.
+
+Generates a synthetic dump (one file per simulated day and region) in a
+temp directory and loads it once per worker count, reporting rows/s and
+the speedup over one worker. Needs DATABASE_URL; rows belong to throwaway
+videos prefixed `bench_backfill_` and are deleted after every run.
+
+Workers parallelize over files, so scaling tops out at the file count and
+at the CPU cores available to both the loader and PostgreSQL.
+"""
+import os
+import sys
+import time
+import argparse
+import json
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+from core.db import SessionLocal
+from collection.jobs.backfill_snapshots import backfill
+
+VIDEO_PREFIX = "bench_backfill_"
+REGIONS = ["KR", "US", "JP", "GB"]
+
+
+def generate(directory: str, days: int, videos: int, snapshots_per_day: int, fmt: str) -> int:
+    """Write one dump per day and region; returns total rows"""
+    start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days + 1)
+    step = timedelta(minutes=24 * 60 // snapshots_per_day)
+    rows = 0
+    for day in range(days):
+        for region in REGIONS:
+            path = os.path.join(directory, f"{region}_{day:03d}.{fmt}")
+            with open(path, "w") as f:
+                if fmt == "csv":
+                    f.write("video_id,captured_at,view_count,like_count,comment_count,country_code\n")
+                for s in range(snapshots_per_day):
+                    captured_at = (start + timedelta(days=day) + s * step).isoformat()
+                    for v in range(videos):
+                        views = (day * snapshots_per_day + s) * (v + 1)
+                        video_id = f"{VIDEO_PREFIX}{region}_{v}"
+                        if fmt == "csv":
+                            f.write(f"{video_id},{captured_at},{views},{views // 50},{views // 500},{region}\n")
+                        else:
+                            f.write(json.dumps({
+                                "video_id": video_id, "captured_at": captured_at, "view_count": views,
+                                "like_count": views // 50, "comment_count": views // 500, "country_code": region
+                            }) + "\n")
+                        rows += 1
+    return rows
+
+
+def cleanup(directory: str) -> None:
+    with SessionLocal() as session:
+        session.execute(text("DELETE FROM video_metrics_snapshot WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{VIDEO_PREFIX}%"})
+        session.execute(text("DELETE FROM videos WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{VIDEO_PREFIX}%"})
+        session.execute(text("DELETE FROM backfill_checkpoint WHERE source LIKE :prefix"),
+                        {"prefix": f"{directory}%"})
+        session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backfill scaling with worker count")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--days", type=int, default=4)
+    parser.add_argument("--videos", type=int, default=200, help="Videos per region")
+    parser.add_argument("--snapshots-per-day", type=int, default=96)
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="csv")
+    parser.add_argument("--method", choices=["values", "copy"], default="copy")
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_backfill_") as directory:
+        rows = generate(directory, args.days, args.videos, args.snapshots_per_day, args.format)
+        baseline = None
+        try:
+            for workers in args.workers:
+                cleanup(directory)
+                start = time.perf_counter()
+                summary = backfill([directory], workers=workers, method=args.method)
+                seconds = time.perf_counter() - start
+                baseline = baseline or seconds
+                print(json.dumps({
+                    "workers": workers,
+                    "files": summary["files"],
+                    "rows": rows,
+                    "seconds": round(seconds, 3),
+                    "rows_per_sec": int(rows / seconds) if seconds > 0 else None,
+                    "speedup": round(baseline / seconds, 2) if seconds > 0 else None,
+                    "cpus": os.cpu_count()
+                }))
+        finally:
+            cleanup(directory)
+
+
+if __name__ == "__main__":
+    main()
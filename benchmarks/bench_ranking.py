@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Micro-benchmark of the analyzer output path: outlier clipping plus top-N.
+
+  previous  copy the frame to clip views_per_min, nlargest, build dicts with iterrows
+  topk      clip the column in place, TopK selection, RankedVideo records
+
+Inputs are per-video velocity frames shaped like the engines' output with
+lognormal velocities (many near-ties, as with real view counts). DATABASE_URL
+must be set to import the analyzer, but no connection is made. Prints one JSON line per (videos, top_n, path).
+"""
+import sys
+import time
+import argparse
+import json
+import logging
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+from analysis.jobs.analyzer_velocity import VelocityAnalyzer
+
+PATHS = ("previous", "topk")
+
+
+def velocity_frame(videos: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "video_id": [f"video_{i:07d}" for i in range(videos)],
+        "title": [f"title {i}" for i in range(videos)],
+        "channel": [f"channel_{i % 5_000}" for i in range(videos)],
+        "views_per_min": np.round(rng.lognormal(3.0, 1.5, videos), 1),
+        "data_points": rng.integers(2, 25, videos),
+        "valid_intervals": rng.integers(1, 24, videos),
+    })
+
+
+def previous_path(df: pd.DataFrame, top_n: int) -> List[Dict[str, Any]]:
+    """The analyzer's output path before TopK, kept here as the baseline"""
+    percentile_99 = df['views_per_min'].quantile(0.99)
+    df_clipped = df.copy()
+    df_clipped['views_per_min'] = df_clipped['views_per_min'].clip(upper=percentile_99)
+
+    results = []
+    for _, row in df_clipped.nlargest(top_n, 'views_per_min').iterrows():
+        results.append({
+            "video_id": row['video_id'],
+            "title": row['title'],
+            "channel": row['channel'],
+            "views_per_min": row['views_per_min'],
+            "data_points": row['data_points'],
+            "valid_intervals": row['valid_intervals']
+        })
+    return results
+
+
+def topk_path(analyzer: VelocityAnalyzer) -> Callable[[pd.DataFrame, int], List[Dict[str, Any]]]:
+    def run(df: pd.DataFrame, top_n: int) -> List[Dict[str, Any]]:
+        return analyzer._get_top_results(analyzer._clip_outliers(df, "bench"), top_n, "bench")
+    return run
+
+
+def time_path(run: Callable, source: pd.DataFrame, top_n: int, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        # Both paths get a fresh frame, as the engines hand the analyzer one per run
+        df = source.copy()
+        start = time.perf_counter()
+        run(df, top_n)
+        samples.append(time.perf_counter() - start)
+    return min(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark clipping and top-N selection")
+    parser.add_argument("--videos", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--top-n", type=int, nargs="+", default=[10, 1_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+
+    # The analyzer logs each clip; keep that out of the timings
+    logging.disable(logging.INFO)
+    with VelocityAnalyzer() as analyzer:
+        for videos in args.videos:
+            source = velocity_frame(videos, args.seed)
+            for top_n in args.top_n:
+                expected = [r["video_id"] for r in previous_path(source.copy(), top_n)]
+                actual = [r["video_id"] for r in topk_path(analyzer)(source.copy(), top_n)]
+                if actual != expected:
+                    raise AssertionError(f"Rankings differ for videos={videos}, top_n={top_n}")
+
+                seconds = {"previous": time_path(previous_path, source, top_n, args.repeat),
+                           "topk": time_path(topk_path(analyzer), source, top_n, args.repeat)}
+                for path in PATHS:
+                    print(json.dumps({
+                        "benchmark": "ranking",
+                        "case": f"path={path},videos={videos},top_n={top_n}",
+                        "seconds": round(seconds[path], 5),
+                        "videos_per_sec": int(videos / seconds[path]),
+                        "speedup_vs_previous": round(seconds["previous"] / seconds[path], 2),
+                    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Benchmark trend scores (analysis/scoring.py) against plain velocity on up to 1M snapshot rows"""
+import sys
+import time
+import argparse
+import json
+
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+from analysis.scoring import SCORES, score_snapshots
+from analysis.velocity import calculate_velocity
+from benchmarks.bench_velocity import make_snapshot_frame
+
+
+def time_score(df: pd.DataFrame, score: str, repeat: int) -> float:
+    """Return best-of-N wall time in seconds; score 'engine' is the vectorized velocity engine"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if score == "engine":
+            calculate_velocity(df, "vectorized")
+        else:
+            score_snapshots(df, score)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark trend scores")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--scores", nargs="+", choices=("engine",) + SCORES, default=["engine", *SCORES])
+    parser.add_argument("--repeat", type=int, default=3)
+
+    args = parser.parse_args()
+
+    for rows in args.sizes:
+        df = make_snapshot_frame(rows)
+        baseline = None
+        for score in args.scores:
+            seconds = time_score(df, score, args.repeat)
+            if score == "engine":
+                baseline = seconds
+            print(json.dumps({
+                "score": score,
+                "rows": rows,
+                "seconds": round(seconds, 4),
+                "rows_per_sec": int(rows / seconds) if seconds > 0 else None,
+                "vs_engine": round(seconds / baseline, 2) if baseline else None
+            }))
+
+
+if __name__ == "__main__":
+    main()
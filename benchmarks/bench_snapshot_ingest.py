@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Benchmark snapshot ingest throughput: INSERT ... VALUES vs COPY + merge.
+
+Needs DATABASE_URL. Rows are written for throwaway videos prefixed
+`bench_ingest_` and deleted again after every run.
+"""
+import sys
+import time
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+from core.db import SessionLocal
+from core.partitions import ensure_snapshot_partitions
+from collection.ingest import copy_snapshots, insert_snapshots_values
+
+VIDEO_PREFIX = "bench_ingest_"
+VIDEOS = 1_000
+METHODS = {"values": insert_snapshots_values, "copy": copy_snapshots}
+
+
+def make_rows(rows: int, start: datetime) -> list:
+    """One snapshot per minute per video, videos interleaved like a collector run"""
+    return [
+        {
+            "video_id": f"{VIDEO_PREFIX}{i % VIDEOS}",
+            "captured_at": start + timedelta(minutes=i // VIDEOS),
+            "view_count": i * 7,
+            "like_count": i % 1000,
+            "comment_count": i % 100,
+        }
+        for i in range(rows)
+    ]
+
+
+def setup(start: datetime, rows: int) -> None:
+    with SessionLocal() as session:
+        session.execute(text("""
+            INSERT INTO videos (video_id, title, country_code)
+            SELECT :prefix || i, 'bench', 'KR' FROM generate_series(0, :videos - 1) i
+            ON CONFLICT (video_id) DO NOTHING
+        """), {"prefix": VIDEO_PREFIX, "videos": VIDEOS})
+        end = start + timedelta(minutes=rows // VIDEOS + 1)
+        ensure_snapshot_partitions(session, start.date(), end.date())
+        session.commit()
+
+
+def cleanup(videos: bool = False) -> None:
+    with SessionLocal() as session:
+        session.execute(text("DELETE FROM video_metrics_snapshot WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{VIDEO_PREFIX}%"})
+        if videos:
+            session.execute(text("DELETE FROM videos WHERE video_id LIKE :prefix"),
+                            {"prefix": f"{VIDEO_PREFIX}%"})
+        session.commit()
+
+
+def time_method(method: str, rows: list) -> float:
+    """Wall time of one ingest including commit"""
+    with SessionLocal() as session:
+        start = time.perf_counter()
+        METHODS[method](session, rows)
+        session.commit()
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark snapshot ingest paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--methods", nargs="+", choices=list(METHODS), default=list(METHODS))
+    parser.add_argument("--repeat", type=int, default=3)
+
+    args = parser.parse_args()
+
+    start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=2)
+    setup(start, max(args.sizes))
+    try:
+        for size in args.sizes:
+            rows = make_rows(size, start)
+            for method in args.methods:
+                best = float("inf")
+                for _ in range(args.repeat):
+                    cleanup()
+                    best = min(best, time_method(method, rows))
+                print(json.dumps({
+                    "method": method,
+                    "rows": size,
+                    "seconds": round(best, 4),
+                    "rows_per_sec": int(size / best) if best > 0 else None
+                }))
+    finally:
+        cleanup(videos=True)
+
+
+if __name__ == "__main__":
+    main()
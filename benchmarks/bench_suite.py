@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark suite on synthetic data (see benchmarks/synthetic.py).
+
+Benchmarks:
+  collector_writes  TrendingCollector videos + snapshots write, one batch per capture
+  analyze_velocity  VelocityAnalyzer.analyze_velocity per engine (ewma: top-N read of online estimates)
+  leaderboard       publish of the sql engine's top results as a leaderboard, and top-N reads of it
+  ideas_api         POST /api/v1/ideas through the ASGI app
+
+Every result is printed as one JSON line. --output writes the whole run
+with environment metadata, and --baseline compares against such a file so
+regressions show up as ratios between runs.
+
+Needs DATABASE_URL. Synthetic rows use the `bench_suite_` video prefix and
+are deleted afterwards; the analyzer reads every video in its window, so run
+against a database without live collector data for comparable numbers.
+"""
+import os
+import sys
+import time
+import argparse
+import contextlib
+import json
+import logging
+import platform
+import subprocess
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import text
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+from core.db import SessionLocal
+from core.partitions import ensure_snapshot_partitions
+from collection.ingest import copy_snapshots
+from collection.jobs.collector_trending import TrendingCollector
+from analysis.jobs.analyzer_velocity import ANALYZER_ENGINES, LEADERBOARD_SIZE, VelocityAnalyzer
+from analysis.leaderboard import publish_leaderboard, read_leaderboard
+from analysis.velocity_ewma import update_velocity_ewma
+from benchmarks.synthetic import generate_snapshots, generate_videos, to_youtube_videos
+
+VIDEO_PREFIX = "bench_suite_"
+BENCHMARKS = ("collector_writes", "analyze_velocity", "leaderboard", "ideas_api")
+# Leaderboard region key no country code can collide with
+LEADERBOARD_REGION = "bench"
+# Metrics where a higher value is better; everything else is a duration
+THROUGHPUT_METRICS = ("rows_per_sec", "requests_per_sec")
+
+
+def _latencies(samples: List[float]) -> Dict[str, float]:
+    values = np.array(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def cleanup() -> None:
+    with SessionLocal() as session:
+        for table in ("video_velocity_bucket", "video_velocity_state", "video_velocity_ewma",
+                      "video_metrics_snapshot", "videos"):
+            session.execute(text(f"DELETE FROM {table} WHERE video_id LIKE :prefix"),
+                            {"prefix": f"{VIDEO_PREFIX}%"})
+        session.execute(text("DELETE FROM trending_leaderboard WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{VIDEO_PREFIX}%"})
+        session.execute(text("DELETE FROM trending_leaderboard_current WHERE region = :region"),
+                        {"region": LEADERBOARD_REGION})
+        session.commit()
+
+
+def bench_collector_writes(args) -> List[Dict[str, Any]]:
+    """One combined video + snapshot write per capture, like a collector run every interval"""
+    videos = generate_videos(args.collector_videos, args.seed, VIDEO_PREFIX)
+    snapshots = generate_snapshots(videos, args.collector_captures, seed=args.seed)
+    captures = [(captured_at.to_pydatetime(), to_youtube_videos(videos, frame))
+                for captured_at, frame in snapshots.groupby("captured_at")]
+
+    samples = []
+    rows = 0
+    with TrendingCollector() as collector:
+        ensure_snapshot_partitions(collector.db, captures[0][0].date(), captures[-1][0].date())
+        collector.db.commit()
+        for captured_at, batch in captures:
+            start = time.perf_counter()
+            # _store_batch's write path, with the synthetic capture time instead of now
+            collector._write_batch(batch, captured_at, "bench_suite")
+            collector.db.commit()
+            samples.append(time.perf_counter() - start)
+            rows += len(batch)
+
+    seconds = sum(samples)
+    return [{
+        "benchmark": "collector_writes",
+        "case": f"videos={args.collector_videos}",
+        "batches": len(captures),
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_sec": int(rows / seconds) if seconds > 0 else None,
+        **_latencies(samples)
+    }]
+
+
+def load_snapshots(args) -> int:
+    """Insert synthetic videos and their snapshot history ending now"""
+    videos = generate_videos(args.videos, args.seed, VIDEO_PREFIX)
+    snapshots = generate_snapshots(videos, args.hours, args.interval_minutes, seed=args.seed)
+    now = datetime.now(timezone.utc)
+
+    with SessionLocal() as session:
+        ensure_snapshot_partitions(session, (now - timedelta(hours=args.hours)).date(), now.date())
+        session.execute(text("""
+            INSERT INTO videos (video_id, title, channel, category, country_code)
+            SELECT * FROM UNNEST(CAST(:ids AS text[]), CAST(:titles AS text[]), CAST(:channels AS text[]),
+                                 CAST(:categories AS text[]), CAST(:countries AS text[]))
+            ON CONFLICT (video_id) DO NOTHING
+        """), {
+            "ids": videos["video_id"].tolist(), "titles": videos["title"].tolist(),
+            "channels": videos["channel"].tolist(), "categories": videos["category"].tolist(),
+            "countries": videos["country_code"].tolist()
+        })
+        copy_snapshots(session, snapshots.to_dict("records"))
+        # What the collectors would have folded into the online estimates as they wrote
+        update_velocity_ewma(session, snapshots[["video_id", "captured_at", "view_count"]].to_dict("records"))
+        session.commit()
+    return len(snapshots)
+
+
+def bench_analyze_velocity(args) -> List[Dict[str, Any]]:
+    rows = load_snapshots(args)
+    results = []
+    for engine in args.engines:
+        best = float("inf")
+        for _ in range(args.repeat):
+            with VelocityAnalyzer(engine) as analyzer:
+                start = time.perf_counter()
+                analyzer.analyze_velocity(window_hours=args.window_hours, top_n=10)
+                best = min(best, time.perf_counter() - start)
+        results.append({
+            "benchmark": "analyze_velocity",
+            "case": f"engine={engine},videos={args.videos},hours={args.hours},window={args.window_hours}",
+            "rows": rows,
+            "seconds": round(best, 4),
+            "rows_per_sec": int(rows / best) if best > 0 else None
+        })
+    return results
+
+
+def bench_leaderboard(args) -> List[Dict[str, Any]]:
+    """Publish latency of a full leaderboard and read latency of its top N"""
+    load_snapshots(args)
+    with VelocityAnalyzer("sql") as analyzer:
+        top = analyzer.analyze_velocity(window_hours=args.window_hours, top_n=LEADERBOARD_SIZE)
+
+    results = []
+    with SessionLocal() as session:
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            publish_leaderboard(session, top, args.window_hours, region=LEADERBOARD_REGION)
+            session.commit()
+            samples.append(time.perf_counter() - start)
+        results.append({"benchmark": "leaderboard", "case": f"op=publish,entries={len(top)}",
+                        **_latencies(samples)})
+
+        for top_n in (10, LEADERBOARD_SIZE):
+            samples = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                read_leaderboard(session, LEADERBOARD_REGION, args.window_hours, top_n=top_n)
+                samples.append(time.perf_counter() - start)
+            session.commit()
+            results.append({"benchmark": "leaderboard", "case": f"op=read,top_n={top_n}",
+                            **_latencies(samples)})
+    return results
+
+
+def bench_ideas_api(args) -> List[Dict[str, Any]]:
+    """Request latency of the ideas endpoint with a fixed model latency"""
+    from fastapi.testclient import TestClient
+
+    # app.main points JSON logging at stdout on import; keep stdout for results
+    root = logging.getLogger()
+    handlers, level = root.handlers, root.level
+    with contextlib.redirect_stdout(sys.stderr):
+        from app.main import app
+    root.handlers, root.level = handlers, level
+    from app.deps.common import get_model_client
+    from generation.clients.model_client import StubModelClient
+
+    app.dependency_overrides[get_model_client] = lambda: StubModelClient(latency=args.model_latency)
+    # Keywords must not collide with the stub's fixed tags (#트렌드, #분석, ...)
+    payload = {"keywords": ["벤치마크", "성능"], "signals": {"velocity": 120.5}}
+    samples = []
+    try:
+        with TestClient(app) as client:
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                response = client.post("/api/v1/ideas", json=payload)
+                samples.append(time.perf_counter() - start)
+                response.raise_for_status()
+    finally:
+        app.dependency_overrides.pop(get_model_client, None)
+
+    seconds = sum(samples)
+    return [{
+        "benchmark": "ideas_api",
+        "case": f"model_latency={args.model_latency}",
+        "requests": len(samples),
+        "seconds": round(seconds, 4),
+        "requests_per_sec": round(len(samples) / seconds, 2) if seconds > 0 else None,
+        **_latencies(samples)
+    }]
+
+
+RUNNERS: Dict[str, Callable] = {
+    "collector_writes": bench_collector_writes,
+    "analyze_velocity": bench_analyze_velocity,
+    "leaderboard": bench_leaderboard,
+    "ideas_api": bench_ideas_api,
+}
+
+
+def compare(result: Dict[str, Any], baseline: List[Dict[str, Any]]) -> Optional[Dict[str, float]]:
+    """Current/baseline ratio per shared metric; >1 is slower for durations, faster for throughput"""
+    for previous in baseline:
+        if previous["benchmark"] == result["benchmark"] and previous["case"] == result["case"]:
+            return {
+                metric: round(result[metric] / previous[metric], 3)
+                for metric in ("seconds", "p50_ms", "p95_ms") + THROUGHPUT_METRICS
+                if result.get(metric) and previous.get(metric)
+            }
+    return None
+
+
+def run_metadata() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark suite on synthetic data")
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--videos", type=int, default=10_000, help="Videos in the analyzer dataset")
+    parser.add_argument("--hours", type=int, default=24, help="Hours of snapshot history")
+    parser.add_argument("--interval-minutes", type=int, default=60)
+    parser.add_argument("--window-hours", type=int, default=24)
+    parser.add_argument("--engines", nargs="+", choices=ANALYZER_ENGINES,
+                        default=["vectorized", "sql", "streaming", "ewma"])
+    parser.add_argument("--collector-videos", type=int, default=200, help="Videos per collector batch")
+    parser.add_argument("--collector-captures", type=int, default=24, help="Collector batches to write")
+    parser.add_argument("--requests", type=int, default=200, help="Ideas API requests")
+    parser.add_argument("--model-latency", type=float, default=0.0,
+                        help="Seconds the stub model sleeps per request (default: 0, API overhead only)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the run (metadata + results) to this JSON file")
+    parser.add_argument("--baseline", help="Earlier --output file to compare against")
+    parser.add_argument("--log-level", default="WARNING", help="Log level for job logs on stderr (default: WARNING)")
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level, stream=sys.stderr)
+
+    baseline = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    run = {"meta": run_metadata(), "params": vars(args), "results": []}
+    try:
+        for name in args.benchmarks:
+            cleanup()
+            for result in RUNNERS[name](args):
+                if baseline:
+                    result["vs_baseline"] = compare(result, baseline)
+                run["results"].append(result)
+                print(json.dumps(result))
+    finally:
+        cleanup()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
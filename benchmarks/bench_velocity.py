@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Benchmark velocity engines from 1k to 1M snapshot rows"""
+import sys
+import time
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+from analysis.velocity import ENGINES, calculate_velocity
+
+SNAPSHOTS_PER_VIDEO = 24
+
+
+def make_snapshot_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Build an hourly snapshot frame with the analyzer's fetch columns"""
+    rng = np.random.default_rng(seed)
+    videos = -(-rows // SNAPSHOTS_PER_VIDEO)
+
+    video_idx = np.repeat(np.arange(videos), SNAPSHOTS_PER_VIDEO)[:rows]
+    hour_idx = np.tile(np.arange(SNAPSHOTS_PER_VIDEO), videos)[:rows]
+    video_ids = np.char.add("vid_", video_idx.astype(str))
+
+    increments = rng.integers(0, 5_000, size=rows)
+    views = pd.Series(increments).groupby(video_idx).cumsum().to_numpy()
+
+    return pd.DataFrame({
+        "video_id": video_ids,
+        "captured_at": pd.Timestamp("2025-01-01", tz="UTC") + pd.to_timedelta(hour_idx, unit="h"),
+        "view_count": views,
+        "title": np.char.add("title_", video_ids),
+        "channel": np.char.add("channel_", (video_idx % 500).astype(str)),
+    })
+
+
+def time_engine(df: pd.DataFrame, engine: str, repeat: int) -> float:
+    """Return best-of-N wall time in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        calculate_velocity(df, engine)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark velocity engines")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-loop-rows", type=int, default=100_000,
+                        help="Skip the loop engine above this many rows")
+
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.sizes:
+        df = make_snapshot_frame(rows)
+        for engine in args.engines:
+            if engine == "loop" and rows > args.max_loop_rows:
+                continue
+            seconds = time_engine(df, engine, args.repeat)
+            results.append({
+                "engine": engine,
+                "rows": rows,
+                "seconds": round(seconds, 4),
+                "rows_per_sec": int(rows / seconds) if seconds > 0 else None
+            })
+            print(json.dumps(results[-1]))
+
+
+if __name__ == "__main__":
+    main()
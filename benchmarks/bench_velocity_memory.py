@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Compare peak RSS of the materialized and streaming analyzer read paths"""
+import sys
+import argparse
+import json
+import resource
+import subprocess
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Tuple
+
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+from analysis.velocity import VelocityAccumulator, calculate_velocity_vectorized
+
+COLUMNS = ['video_id', 'captured_at', 'view_count', 'title', 'channel']
+SNAPSHOTS_PER_VIDEO = 24
+
+
+def iter_rows(rows: int) -> Iterator[Tuple]:
+    """Yield rows shaped like the analyzer query, ordered by (video_id, captured_at)"""
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for i in range(rows):
+        video, hour = divmod(i, SNAPSHOTS_PER_VIDEO)
+        video_id = f"vid_{video:08d}"
+        yield (
+            video_id,
+            start + timedelta(hours=hour),
+            1_000 + hour * (video % 97 + 1) * 100,
+            f"Synthetic title for {video_id} with some realistic length",
+            f"channel_{video % 500}",
+        )
+
+
+def iter_chunks(rows: int, chunk_size: int) -> Iterator[List[Tuple]]:
+    """Mimic Result.partitions() with a server-side cursor"""
+    chunk = []
+    for row in iter_rows(rows):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_materialized(rows: int, chunk_size: int) -> int:
+    data = list(iter_rows(rows))  # fetchall()
+    df = pd.DataFrame(data, columns=COLUMNS)
+    df['captured_at'] = pd.to_datetime(df['captured_at'])
+    return len(calculate_velocity_vectorized(df))
+
+
+def run_streaming(rows: int, chunk_size: int) -> int:
+    accumulator = VelocityAccumulator()
+    for partition in iter_chunks(rows, chunk_size):
+        chunk = pd.DataFrame(partition, columns=COLUMNS)
+        chunk['captured_at'] = pd.to_datetime(chunk['captured_at'])
+        accumulator.add_chunk(chunk)
+    return len(accumulator.result())
+
+
+MODES = {"materialized": run_materialized, "streaming": run_streaming}
+
+
+def measure(mode: str, rows: int, chunk_size: int) -> dict:
+    """Run one mode in this process and report peak RSS"""
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    videos = MODES[mode](rows, chunk_size)
+    seconds = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {
+        "mode": mode,
+        "rows": rows,
+        "chunk_size": chunk_size,
+        "videos": videos,
+        "seconds": round(seconds, 3),
+        "peak_rss_mb": round(peak_kb / 1024, 1),
+        "delta_rss_mb": round((peak_kb - baseline_kb) / 1024, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analyzer read-path memory")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--mode", choices=MODES, help="Run a single mode in-process (used internally)")
+
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.sizes[0], args.chunk_size)))
+        return
+
+    # One fresh interpreter per measurement so peak RSS is not shared
+    for rows in args.sizes:
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--sizes", str(rows),
+                 "--chunk-size", str(args.chunk_size)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            print(output.strip())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Per-tick overhead of main()-style job runs vs the long-lived JobWorker.
+
+Each tick polls a fixed set of due videos with the incremental collector
+(--mode due), either through collector_incremental.main() as the runner used
+to, or through JobWorker.run() on one worker kept for the whole benchmark.
+The YouTube API is tests.fixtures.youtube_api served over a real localhost
+socket, so main() pays for a new HTTP client and TCP connection every tick
+while the worker keeps its connection alive. Plain HTTP has no TLS
+handshake, so against the real API the saving per tick is larger.
+
+Needs DATABASE_URL. Rows use the `bench_worker_` prefix and are deleted
+afterwards. Prints one JSON line per mode.
+"""
+import os
+import sys
+import time
+import argparse
+import contextlib
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List
+
+import httpx
+import numpy as np
+from sqlalchemy import text
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+os.environ.setdefault("YOUTUBE_API_KEY", "bench")
+
+from core.db import SessionLocal
+from core.logging import setup_json_logging
+from core.partitions import ensure_snapshot_partitions
+from collection.clients import youtube as youtube_module
+from collection.jobs import collector_incremental
+from collection.polling import update_poll_schedule
+from jobs.worker import JobWorker
+from tests.fixtures.youtube_api import FakeYouTubeAPI
+
+VIDEO_PREFIX = "bench_worker_"
+MODES = ("main", "worker")
+
+
+def serve(api: FakeYouTubeAPI) -> ThreadingHTTPServer:
+    """Answer API requests on a localhost port with keep-alive"""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Otherwise delayed ACKs add ~40 ms to every response
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            response = api.handle(httpx.Request("GET", f"http://localhost{self.path}", headers=dict(self.headers)))
+            self.send_response(response.status_code)
+            for header in ("ETag", "Content-Type"):
+                if header in response.headers:
+                    self.send_header(header, response.headers[header])
+            self.send_header("Content-Length", str(len(response.content)))
+            self.end_headers()
+            self.wfile.write(response.content)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def setup(videos: int) -> List[str]:
+    ids = [f"{VIDEO_PREFIX}{i:04d}" for i in range(videos)]
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as session:
+        ensure_snapshot_partitions(session, now.date(), now.date())
+        session.execute(text("""
+            INSERT INTO videos (video_id, title) SELECT id, 'bench' FROM UNNEST(CAST(:ids AS text[])) AS id
+            ON CONFLICT (video_id) DO NOTHING
+        """), {"ids": ids})
+        update_poll_schedule(session, {video_id: 5_000.0 for video_id in ids}, now)
+        session.commit()
+    return ids
+
+
+def make_due(ids: List[str]) -> None:
+    with SessionLocal() as session:
+        session.execute(text("UPDATE video_poll_schedule SET next_due_at = :due WHERE video_id = ANY(:ids)"),
+                        {"due": datetime.now(timezone.utc) - timedelta(minutes=1), "ids": ids})
+        session.commit()
+
+
+def cleanup() -> None:
+    with SessionLocal() as session:
+        for table in ("video_poll_schedule", "video_velocity_ewma", "video_metrics_snapshot", "videos"):
+            session.execute(text(f"DELETE FROM {table} WHERE video_id LIKE :prefix"),
+                            {"prefix": f"{VIDEO_PREFIX}%"})
+        session.commit()
+
+
+def time_ticks(tick: Callable[[], Any], ids: List[str], ticks: int) -> List[float]:
+    samples = []
+    for _ in range(ticks):
+        make_due(ids)
+        start = time.perf_counter()
+        tick()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-tick overhead of main() runs vs a long-lived worker")
+    parser.add_argument("--videos", type=int, default=100, help="Due videos polled per tick")
+    parser.add_argument("--ticks", type=int, default=30)
+
+    args = parser.parse_args()
+
+    api = FakeYouTubeAPI()
+    server = serve(api)
+    youtube_module.BASE_URL = f"http://127.0.0.1:{server.server_address[1]}"
+
+    results: Dict[str, List[float]] = {}
+    with open(os.devnull, "w") as devnull:
+        try:
+            cleanup()
+            ids = setup(args.videos)
+            # Job logs go to /dev/null in both modes so formatting costs the same
+            with contextlib.redirect_stdout(devnull):
+                setup_json_logging()
+                with JobWorker() as worker:
+                    # One untimed tick each so imports and the DB pool are warm in both modes
+                    for mode, tick in (("main", lambda: collector_incremental.main(["--mode", "due"])),
+                                       ("worker", lambda: worker.run("collect_incremental"))):
+                        time_ticks(tick, ids, 1)
+                        results[mode] = time_ticks(tick, ids, args.ticks)
+        finally:
+            cleanup()
+            server.shutdown()
+
+    baseline = float(np.median(results["main"]))
+    for mode in MODES:
+        values = np.array(results[mode]) * 1000
+        print(json.dumps({
+            "benchmark": "worker_startup",
+            "case": f"mode={mode},videos={args.videos}",
+            "ticks": len(values),
+            "p50_ms": round(float(np.percentile(values, 50)), 3),
+            "p95_ms": round(float(np.percentile(values, 95)), 3),
+            "saved_per_tick_ms": round((baseline - float(np.median(results[mode]))) * 1000, 3),
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Benchmark sync vs async YouTube clients fetching trending charts for 10 regions.
+
+Limits above 50 page through the chart, so they also show how much of the
+extra pages is hidden by pipelining detail lookups behind the listing.
+
+Requests are answered in-process by tests.fixtures.youtube_api with a fixed
+per-request latency, so the numbers isolate request scheduling (serial
+vs concurrent) from real network and quota effects.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+from collection.clients.youtube import AsyncYouTubeClient, YouTubeClient
+from tests.fixtures.youtube_api import FakeYouTubeAPI
+
+REGIONS = ["KR", "US", "JP", "GB", "DE", "FR", "IN", "BR", "CA", "AU"]
+MODES = ("sync", "threads", "async")
+
+
+def run_sync(api: FakeYouTubeAPI, regions, limit: int) -> int:
+    """One client per region, regions fetched back to back (one process per region today)"""
+    fetched = 0
+    for region in regions:
+        with YouTubeClient(transport=api.sync_transport()) as client:
+            fetched += len(client.get_trending_videos(region, limit))
+    return fetched
+
+
+def run_threads(api: FakeYouTubeAPI, regions, limit: int, workers: int = 4) -> int:
+    """Thread pool over sync clients (TrendingCollector.collect_regions)"""
+    def fetch(region):
+        with YouTubeClient(transport=api.sync_transport()) as client:
+            return len(client.get_trending_videos(region, limit))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(fetch, regions))
+
+
+def run_async(api: FakeYouTubeAPI, regions, limit: int) -> int:
+    """One AsyncYouTubeClient, every region in flight at once"""
+    async def fetch():
+        async with AsyncYouTubeClient(transport=api.async_transport()) as client:
+            results = await client.get_trending_videos_many(regions, limit)
+        return sum(len(videos) for videos in results.values())
+
+    return asyncio.run(fetch())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async YouTube clients")
+    parser.add_argument("--regions", type=int, default=len(REGIONS))
+    parser.add_argument("--limits", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[20, 50, 100])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--repeat", type=int, default=3)
+
+    args = parser.parse_args()
+    os.environ.setdefault("YOUTUBE_API_KEY", "benchmark")
+    regions = (REGIONS * (args.regions // len(REGIONS) + 1))[:args.regions]
+    runners = {"sync": run_sync, "threads": run_threads, "async": run_async}
+
+    for limit in args.limits:
+        for latency_ms in args.latency_ms:
+            for mode in args.modes:
+                api = FakeYouTubeAPI(videos_per_region=max(limit, 200), latency=latency_ms / 1000)
+                best = float("inf")
+                for _ in range(args.repeat):
+                    api.requests.clear()
+                    start = time.perf_counter()
+                    fetched = runners[mode](api, regions, limit)
+                    best = min(best, time.perf_counter() - start)
+                print(json.dumps({
+                    "mode": mode,
+                    "regions": len(regions),
+                    "limit": limit,
+                    "latency_ms": latency_ms,
+                    "requests": len(api.requests),
+                    "videos": fetched,
+                    "seconds": round(best, 4)
+                }))
+
+
+if __name__ == "__main__":
+    main()
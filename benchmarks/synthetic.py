@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Synthetic trending data for benchmarks.
+
+Each video follows a logistic view curve: a heavy-tailed (log-normal) final
+audience, a random growth rate and a random point in its life when it
+enters the chart, so some videos are still accelerating while others have
+plateaued. Views grow with noise but never decrease; likes and comments
+follow per-video engagement ratios, and a small share of snapshots is
+dropped to mimic videos falling off the chart between polls.
+
+Run as a script to write the data as per-day dumps that
+collection/jobs/backfill_snapshots.py can load.
+"""
+import os
+import sys
+import argparse
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+from collection.clients.youtube import YouTubeVideo
+
+DEFAULT_PREFIX = "synth_"
+REGIONS = ("KR", "US", "JP", "GB")
+CHANNELS = 500
+# Share of snapshots missing because the video was briefly off the chart
+DROPOUT_RATE = 0.02
+
+
+def generate_videos(videos: int, seed: int = 0, prefix: str = DEFAULT_PREFIX) -> pd.DataFrame:
+    """Video metadata plus the parameters of each video's view curve"""
+    rng = np.random.default_rng(seed)
+    ids = np.char.add(prefix, np.char.zfill(np.arange(videos).astype(str), 7))
+
+    return pd.DataFrame({
+        "video_id": ids,
+        "title": np.char.add("Synthetic video ", ids),
+        "channel": np.char.add("channel_", (rng.zipf(1.6, videos) % CHANNELS).astype(str)),
+        "category": rng.choice(["10", "17", "20", "22", "24"], videos),
+        "country_code": rng.choice(REGIONS, videos),
+        # Final audience: median ~200k views with a long tail into the tens of millions
+        "audience": rng.lognormal(mean=12.2, sigma=1.5, size=videos),
+        # Logistic growth rate per hour and the curve's midpoint relative to the first snapshot
+        "growth": rng.uniform(0.05, 0.6, videos),
+        "midpoint_hours": rng.uniform(-24, 48, videos),
+        "like_ratio": rng.beta(2, 50, videos),
+        "comment_ratio": rng.beta(1, 400, videos),
+    })
+
+
+def generate_snapshots(videos: pd.DataFrame, hours: int, interval_minutes: int = 60,
+                       end: Optional[datetime] = None, seed: int = 0) -> pd.DataFrame:
+    """Snapshot rows for every video every `interval_minutes` over `hours`, ending at `end`.
+
+    Rows are ordered by (video_id, captured_at), like the analyzer query.
+    """
+    rng = np.random.default_rng(seed + 1)
+    end = (end or datetime.now(timezone.utc)).replace(second=0, microsecond=0)
+    steps = hours * 60 // interval_minutes
+    offsets = np.arange(steps) * interval_minutes / 60.0
+    n = len(videos)
+
+    audience = videos["audience"].to_numpy()[:, None]
+    growth = videos["growth"].to_numpy()[:, None]
+    midpoint = videos["midpoint_hours"].to_numpy()[:, None]
+    curve = audience / (1.0 + np.exp(-growth * (offsets[None, :] - midpoint)))
+
+    # Noisy increments, clipped at zero so counters never go backwards
+    increments = np.diff(curve, axis=1, prepend=0.0) * rng.lognormal(0.0, 0.25, (n, steps))
+    views = np.cumsum(np.clip(increments, 0.0, None), axis=1).astype(np.int64)
+    likes = (views * videos["like_ratio"].to_numpy()[:, None]).astype(np.int64)
+    comments = (views * videos["comment_ratio"].to_numpy()[:, None]).astype(np.int64)
+
+    start = pd.Timestamp(end) - pd.Timedelta(minutes=interval_minutes * (steps - 1))
+    frame = pd.DataFrame({
+        "video_id": np.repeat(videos["video_id"].to_numpy(), steps),
+        "captured_at": np.tile(start + pd.to_timedelta(offsets, unit="h"), n),
+        "view_count": views.ravel(),
+        "like_count": likes.ravel(),
+        "comment_count": comments.ravel(),
+    })
+    return frame[rng.random(len(frame)) >= DROPOUT_RATE].reset_index(drop=True)
+
+
+def to_youtube_videos(videos: pd.DataFrame, snapshots: pd.DataFrame) -> List[YouTubeVideo]:
+    """Collector-shaped records from one capture's snapshot rows"""
+    merged = snapshots.merge(videos, on="video_id")
+    published_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        YouTubeVideo(
+            video_id=row.video_id, title=row.title, description="", channel=row.channel,
+            category=row.category, tags=[], country_code=row.country_code, published_at=published_at,
+            view_count=row.view_count, like_count=row.like_count, comment_count=row.comment_count
+        )
+        for row in merged.itertuples(index=False)
+    ]
+
+
+def write_dumps(directory: str, videos: pd.DataFrame, snapshots: pd.DataFrame, fmt: str = "csv") -> List[str]:
+    """Write one dump per UTC day with video metadata on every row; returns paths"""
+    os.makedirs(directory, exist_ok=True)
+    rows = snapshots.merge(videos[["video_id", "title", "channel", "category", "country_code"]], on="video_id")
+    paths = []
+    for day, frame in rows.groupby(rows["captured_at"].dt.date):
+        path = os.path.join(directory, f"snapshots_{day.strftime('%Y%m%d')}.{fmt}")
+        frame = frame.assign(captured_at=frame["captured_at"].map(pd.Timestamp.isoformat))
+        if fmt == "csv":
+            frame.to_csv(path, index=False)
+        else:
+            frame.to_json(path, orient="records", lines=True)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic snapshot dumps")
+    parser.add_argument("output", help="Directory for the per-day dump files")
+    parser.add_argument("--videos", type=int, default=10_000)
+    parser.add_argument("--hours", type=int, default=72)
+    parser.add_argument("--interval-minutes", type=int, default=60)
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX, help="Video id prefix")
+
+    args = parser.parse_args()
+
+    videos = generate_videos(args.videos, args.seed, args.prefix)
+    snapshots = generate_snapshots(videos, args.hours, args.interval_minutes, seed=args.seed)
+    for path in write_dumps(args.output, videos, snapshots, args.format):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,16 @@ import httpx
 import logging
 import asyncio
 import random
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional, Tuple, Union
 from datetime import datetime, timezone
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings
-from tenacity import retry, stop_after_attempt, wait_exponential_jitter
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+from collection.http_cache import ResponseCache, get_response_cache
+from collection.quota import TokenBucket, get_quota_budget, unit_cost
 
 logger = logging.getLogger(__name__)
 
@@ -30,65 +35,282 @@ class YouTubeVideo(BaseModel):
     like_count: int
     comment_count: int
 
+BASE_URL = "https://www.googleapis.com/youtube/v3"
+# The videos endpoint accepts at most 50 ids (or chart results) per call
+DETAIL_BATCH_SIZE = 50
+CHART_PAGE_SIZE = 50
+DETAIL_PARTS = "snippet,statistics"
+# Counters only, for refreshing videos already stored
+STATISTICS_PART = "statistics"
+
+# Single-pass asks the chart for DETAIL_PARTS directly; two-step lists ids
+# and then looks details up separately
+FETCH_MODES = ("single", "two_step")
+DEFAULT_FETCH_MODE = "single"
+
+def _is_transient(error: BaseException) -> bool:
+    """429s, 5xx answers and transport failures; other 4xx answers (bad request,
+    auth, quotaExceeded) and local budget exhaustion fail the same way again"""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+_request_retry = retry(
+    retry=retry_if_exception(_is_transient),
+    stop=stop_after_attempt(5),
+    wait=wait_exponential_jitter(initial=1, max=30, jitter=0.2),
+    before_sleep=lambda retry_state: logger.warning(
+        f"Retry {retry_state.attempt_number}: {retry_state.outcome.exception()}"
+    ),
+    # The last error reaches the caller instead of a RetryError
+    reraise=True
+)
+
+
+def _chunks(items: List[str], size: int) -> List[List[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _parse_videos(videos_data: Dict[str, Any], region_code: str) -> List[YouTubeVideo]:
+    """Parse video data into YouTubeVideo models"""
+    videos = []
+
+    for item in videos_data.get("items", []):
+        try:
+            snippet = item["snippet"]
+            statistics = item["statistics"]
+
+            video = YouTubeVideo(
+                video_id=item["id"],
+                title=snippet.get("title", ""),
+                description=snippet.get("description", ""),
+                channel=snippet.get("channelTitle", ""),
+                category=snippet.get("categoryId", ""),
+                tags=snippet.get("tags", []),
+                country_code=region_code,
+                published_at=datetime.fromisoformat(snippet["publishedAt"].replace("Z", "+00:00")),
+                view_count=int(statistics.get("viewCount", 0)),
+                like_count=int(statistics.get("likeCount", 0)),
+                comment_count=int(statistics.get("commentCount", 0))
+            )
+            videos.append(video)
+
+        except (KeyError, ValueError, TypeError) as e:
+            logger.warning(f"Failed to parse video {item.get('id', 'unknown')}: {e}")
+            continue
+
+    return videos
+
+
+def _parse_statistics(items: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    """Map video id -> view/like/comment counts from statistics-only items"""
+    statistics = {}
+    for item in items:
+        try:
+            counts = item["statistics"]
+            statistics[item["id"]] = {
+                "view_count": int(counts.get("viewCount", 0)),
+                "like_count": int(counts.get("likeCount", 0)),
+                "comment_count": int(counts.get("commentCount", 0))
+            }
+        except (KeyError, ValueError, TypeError) as e:
+            logger.warning(f"Failed to parse statistics for {item.get('id', 'unknown')}: {e}")
+    return statistics
+
+
+def _has_detail_parts(items: List[Dict[str, Any]]) -> bool:
+    return all("snippet" in item and "statistics" in item for item in items)
+
+
+def _conditional_headers(cache: Optional[ResponseCache], endpoint: str,
+                         params: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, str]]:
+    """Cache key and If-None-Match header for a request (no-op without a cache).
+
+    Statistics-only requests are not cached: their counters change between
+    nearly every poll, so an entry would rarely validate.
+    """
+    if cache is None or params.get("part") == STATISTICS_PART:
+        return None, {}
+    key = cache.key(endpoint, params)
+    etag = cache.lookup(key)
+    return key, ({"If-None-Match": etag} if etag else {})
+
+
+def _read_response(cache: Optional[ResponseCache], key: Optional[str], headers: Dict[str, str],
+                   response: httpx.Response) -> Dict[str, Any]:
+    """Serve 304s from the cache, otherwise decode and remember the body"""
+    if response.status_code == 304 and headers:
+        return cache.hit(key)
+
+    response.raise_for_status()
+    data = response.json()
+    if key is not None:
+        cache.store(key, response.headers.get("etag"), response.content, data)
+    return data
+
+
+def new_http_client(transport: Optional[httpx.BaseTransport] = None) -> httpx.Client:
+    """HTTP client with the pool limits YouTubeClient uses; long-lived callers share one"""
+    return httpx.Client(
+        timeout=10.0,
+        limits=httpx.Limits(max_connections=5, max_keepalive_connections=2),
+        transport=transport
+    )
+
+
 class YouTubeClient:
-    def __init__(self):
-        self.settings = YouTubeSettings()
-        self.base_url = "https://www.googleapis.com/youtube/v3"
-        self.client = httpx.Client(
-            timeout=10.0,
-            limits=httpx.Limits(max_connections=5, max_keepalive_connections=2)
-        )
+    """Sync Data API client.
+
+    Pass `http_client` (see new_http_client) and `settings` to reuse warm
+    keep-alive connections and parsed settings across clients; a passed-in
+    HTTP client is left open on exit, its owner closes it.
+    """
+
+    def __init__(self, transport: Optional[httpx.BaseTransport] = None,
+                 fetch_mode: str = DEFAULT_FETCH_MODE, budget: Optional[TokenBucket] = None,
+                 cache: Optional[ResponseCache] = None, http_client: Optional[httpx.Client] = None,
+                 settings: Optional[YouTubeSettings] = None):
+        if fetch_mode not in FETCH_MODES:
+            raise ValueError(f"Unknown fetch mode: {fetch_mode}")
+        self.settings = settings or YouTubeSettings()
+        self.base_url = BASE_URL
+        self.fetch_mode = fetch_mode
+        # Shared by every client in the process unless passed in
+        self.budget = budget or get_quota_budget()
+        self.cache = cache or get_response_cache()
+        # Quota units spent and budget waits of this client (every attempt counts)
+        self.quota_units = 0
+        self.throttled_seconds = 0.0
+        self._quota_lock = threading.Lock()
+        self._owns_client = http_client is None
+        self.client = http_client or new_http_client(transport)
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.client.close()
+        if self._owns_client:
+            self.client.close()
 
     def get_trending_videos(self, region_code: str = "KR", max_results: int = 50) -> List[YouTubeVideo]:
         """Fetch trending videos from YouTube Data API v3"""
         try:
-            # Step 1: Get video list from mostPopular chart
-            videos_response = self._fetch_videos_list(region_code, max_results)
-            video_ids = [item["id"] for item in videos_response.get("items", [])]
+            if self.fetch_mode == "single":
+                try:
+                    return self._fetch_single_pass(region_code, max_results)
+                except Exception as e:
+                    logger.warning(f"Single-pass fetch failed, falling back to two-step: {e}")
+
+            return self._fetch_two_step(region_code, max_results)
+
+        except Exception as e:
+            logger.error(f"Failed to fetch trending videos: {e}", extra={"trace_id": "youtube_fetch_error"})
+            raise
+
+    def _fetch_single_pass(self, region_code: str, max_results: int) -> List[YouTubeVideo]:
+        """One chart call per page returning snippet and statistics directly"""
+        videos = []
+        for items in self._iter_chart_pages(region_code, max_results, DETAIL_PARTS):
+            if not _has_detail_parts(items):
+                # Chart answered without the requested parts - look this page up
+                items = self._fetch_videos_details([item["id"] for item in items])["items"]
+            videos.extend(self._parse_videos({"items": items}, region_code))
+
+        if not videos:
+            logger.warning("No videos found in trending response")
+        return videos
+
+    def _fetch_two_step(self, region_code: str, max_results: int) -> List[YouTubeVideo]:
+        """List chart ids, then look details up.
+
+        Chart pages are listed one after another (each needs the previous
+        page's token) while each page's details are fetched on a worker
+        thread, so detail lookups overlap with listing the next page.
+        """
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            # Step 1: Walk the mostPopular chart, handing each page to a detail fetch
+            detail_futures = [
+                pool.submit(self._fetch_videos_details, [item["id"] for item in items])
+                for items in self._iter_chart_pages(region_code, max_results)
+            ]
 
-            if not video_ids:
+            if not detail_futures:
                 logger.warning("No video IDs found in trending response")
                 return []
 
-            # Step 2: Get detailed video information
-            videos_details = self._fetch_videos_details(video_ids)
+            # Step 2: Parse details in chart order
+            videos = []
+            for future in detail_futures:
+                videos.extend(self._parse_videos(future.result(), region_code))
+            return videos
 
-            # Step 3: Parse and return structured data
-            return self._parse_videos(videos_details, region_code)
+    def _iter_chart_pages(self, region_code: str, max_results: int,
+                          part: str = "id") -> Iterator[List[Dict[str, Any]]]:
+        """Yield chart items page by page until max_results or the end of the chart"""
+        remaining = max_results
+        page_token = None
+        while remaining > 0:
+            response = self._fetch_videos_list(region_code, min(remaining, CHART_PAGE_SIZE), page_token, part)
+            items = response.get("items", [])[:remaining]
+            if not items:
+                return
+            yield items
 
-        except Exception as e:
-            logger.error(f"Failed to fetch trending videos: {e}", extra={"trace_id": "youtube_fetch_error"})
-            raise
+            remaining -= len(items)
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return
 
-    def _fetch_videos_list(self, region_code: str, max_results: int) -> Dict[str, Any]:
-        """Fetch mostPopular videos list"""
-        return self._make_request("videos", {
-            "part": "id",
+    def _fetch_videos_list(self, region_code: str, max_results: int,
+                           page_token: Optional[str] = None, part: str = "id") -> Dict[str, Any]:
+        """Fetch one page of the mostPopular videos list"""
+        params = {
+            "part": part,
             "chart": "mostPopular",
             "regionCode": region_code,
             "maxResults": max_results
-        })
+        }
+        if page_token:
+            params["pageToken"] = page_token
+        return self._make_request("videos", params)
 
     def _fetch_videos_details(self, video_ids: List[str]) -> Dict[str, Any]:
-        """Fetch detailed video information"""
-        return self._make_request("videos", {
-            "part": "snippet,statistics",
-            "id": ",".join(video_ids)
-        })
+        """Fetch detailed video information in batches of at most 50 ids"""
+        items = []
+        for batch in _chunks(video_ids, DETAIL_BATCH_SIZE):
+            response = self._make_request("videos", {
+                "part": DETAIL_PARTS,
+                "id": ",".join(batch)
+            })
+            items.extend(response.get("items", []))
+        return {"items": items}
 
-    @retry(
-        stop=stop_after_attempt(5),
-        wait=wait_exponential_jitter(initial=1, max=30, jitter=0.2),
-        retry_error_callback=lambda retry_state: logger.warning(
-            f"Retry {retry_state.attempt_number}: {retry_state.outcome.exception()}"
-        )
-    )
+    def get_video_statistics(self, video_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        """Fetch counters only (no snippet) for known videos, 50 ids per call.
+
+        Videos the API no longer returns (deleted or private) are absent from
+        the result.
+        """
+        statistics = {}
+        for batch in _chunks(video_ids, DETAIL_BATCH_SIZE):
+            response = self._make_request("videos", {
+                "part": STATISTICS_PART,
+                "id": ",".join(batch)
+            })
+            statistics.update(_parse_statistics(response.get("items", [])))
+        return statistics
+
+    @_request_retry
     def _make_request(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Make HTTP request with retry logic for 429/5xx errors"""
         params = {
@@ -97,15 +319,25 @@ class YouTubeClient:
         }
 
         try:
-            response = self.client.get(f"{self.base_url}/{endpoint}", params=params)
+            cost = unit_cost(endpoint, params.get("part"))
+            waited = self.budget.acquire(cost)
+            with self._quota_lock:
+                self.quota_units += cost
+                self.throttled_seconds += waited
+
+            cache_key, headers = _conditional_headers(self.cache, endpoint, params)
+            response = self.client.get(f"{self.base_url}/{endpoint}", params=params, headers=headers)
+
+            if response.status_code == 429:
+                # Make every worker sharing the budget back off, not just this one
+                self.budget.drain()
 
             # Retry on 429 (rate limit) and 5xx (server errors)
             if response.status_code == 429 or response.status_code >= 500:
                 logger.warning(f"HTTP {response.status_code}: retrying request")
                 response.raise_for_status()
 
-            response.raise_for_status()
-            return response.json()
+            return _read_response(self.cache, cache_key, headers, response)
 
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error {e.response.status_code}: {e}")
@@ -116,30 +348,185 @@ class YouTubeClient:
 
     def _parse_videos(self, videos_data: Dict[str, Any], region_code: str) -> List[YouTubeVideo]:
         """Parse video data into YouTubeVideo models"""
+        return _parse_videos(videos_data, region_code)
+
+
+class AsyncYouTubeClient:
+    """Asyncio counterpart of YouTubeClient with the same get_trending_videos contract.
+
+    One long-lived connection pool is shared by every request made through
+    the client, so fan-out across regions and detail batches reuses
+    keep-alive connections (multiplexed streams when HTTP/2 is enabled).
+    """
+
+    def __init__(self, max_connections: int = 20, max_keepalive_connections: int = 10,
+                 http2: bool = False, max_concurrency: int = 10,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 fetch_mode: str = DEFAULT_FETCH_MODE, budget: Optional[TokenBucket] = None,
+                 cache: Optional[ResponseCache] = None):
+        if fetch_mode not in FETCH_MODES:
+            raise ValueError(f"Unknown fetch mode: {fetch_mode}")
+        self.settings = YouTubeSettings()
+        self.base_url = BASE_URL
+        self.fetch_mode = fetch_mode
+        self.budget = budget or get_quota_budget()
+        self.cache = cache or get_response_cache()
+        self.quota_units = 0
+        self.throttled_seconds = 0.0
+
+        if http2 and not _http2_available():
+            logger.warning("HTTP/2 requested but the 'h2' package is missing - using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_keepalive_connections),
+            http2=http2,
+            transport=transport
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.client.aclose()
+
+    async def get_trending_videos(self, region_code: str = "KR", max_results: int = 50) -> List[YouTubeVideo]:
+        """Fetch trending videos from YouTube Data API v3"""
+        try:
+            if self.fetch_mode == "single":
+                try:
+                    return await self._fetch_single_pass(region_code, max_results)
+                except Exception as e:
+                    logger.warning(f"Single-pass fetch failed, falling back to two-step: {e}")
+
+            return await self._fetch_two_step(region_code, max_results)
+
+        except Exception as e:
+            logger.error(f"Failed to fetch trending videos: {e}", extra={"trace_id": "youtube_fetch_error"})
+            raise
+
+    async def _fetch_single_pass(self, region_code: str, max_results: int) -> List[YouTubeVideo]:
+        """One chart call per page returning snippet and statistics directly"""
         videos = []
+        async for items in self._iter_chart_pages(region_code, max_results, DETAIL_PARTS):
+            if not _has_detail_parts(items):
+                # Chart answered without the requested parts - look this page up
+                items = (await self._fetch_videos_details([item["id"] for item in items]))["items"]
+            videos.extend(_parse_videos({"items": items}, region_code))
 
-        for item in videos_data.get("items", []):
-            try:
-                snippet = item["snippet"]
-                statistics = item["statistics"]
-
-                video = YouTubeVideo(
-                    video_id=item["id"],
-                    title=snippet.get("title", ""),
-                    description=snippet.get("description", ""),
-                    channel=snippet.get("channelTitle", ""),
-                    category=snippet.get("categoryId", ""),
-                    tags=snippet.get("tags", []),
-                    country_code=region_code,
-                    published_at=datetime.fromisoformat(snippet["publishedAt"].replace("Z", "+00:00")),
-                    view_count=int(statistics.get("viewCount", 0)),
-                    like_count=int(statistics.get("likeCount", 0)),
-                    comment_count=int(statistics.get("commentCount", 0))
+        if not videos:
+            logger.warning("No videos found in trending response")
+        return videos
+
+    async def _fetch_two_step(self, region_code: str, max_results: int) -> List[YouTubeVideo]:
+        """List chart ids, then look details up.
+
+        Each chart page's detail batches start as soon as the page arrives,
+        while the next page is being listed.
+        """
+        detail_tasks: List[asyncio.Task] = []
+        try:
+            async for items in self._iter_chart_pages(region_code, max_results):
+                detail_tasks.extend(
+                    asyncio.create_task(self._fetch_videos_details(batch))
+                    for batch in _chunks([item["id"] for item in items], DETAIL_BATCH_SIZE)
                 )
-                videos.append(video)
 
-            except (KeyError, ValueError, TypeError) as e:
-                logger.warning(f"Failed to parse video {item.get('id', 'unknown')}: {e}")
-                continue
+            if not detail_tasks:
+                logger.warning("No video IDs found in trending response")
+                return []
+
+            videos = []
+            for response in await asyncio.gather(*detail_tasks):
+                videos.extend(_parse_videos(response, region_code))
+            return videos
+
+        except BaseException:
+            for task in detail_tasks:
+                task.cancel()
+            raise
+
+    async def get_trending_videos_many(self, region_codes: List[str], max_results: int = 50
+                                       ) -> Dict[str, Union[List[YouTubeVideo], Exception]]:
+        """Fetch several regions concurrently; failed regions map to their exception"""
+        results = await asyncio.gather(
+            *(self.get_trending_videos(region, max_results) for region in region_codes),
+            return_exceptions=True
+        )
+        return dict(zip(region_codes, results))
+
+    async def _iter_chart_pages(self, region_code: str, max_results: int,
+                                part: str = "id") -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield chart items page by page until max_results or the end of the chart"""
+        remaining = max_results
+        page_token = None
+        while remaining > 0:
+            response = await self._fetch_videos_list(region_code, min(remaining, CHART_PAGE_SIZE), page_token, part)
+            items = response.get("items", [])[:remaining]
+            if not items:
+                return
+            yield items
 
-        return videos
\ No newline at end of file
+            remaining -= len(items)
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return
+
+    async def _fetch_videos_list(self, region_code: str, max_results: int,
+                                 page_token: Optional[str] = None, part: str = "id") -> Dict[str, Any]:
+        """Fetch one page of the mostPopular videos list"""
+        params = {
+            "part": part,
+            "chart": "mostPopular",
+            "regionCode": region_code,
+            "maxResults": max_results
+        }
+        if page_token:
+            params["pageToken"] = page_token
+        return await self._make_request("videos", params)
+
+    async def _fetch_videos_details(self, video_ids: List[str]) -> Dict[str, Any]:
+        """Fetch details for at most 50 ids"""
+        return await self._make_request("videos", {
+            "part": DETAIL_PARTS,
+            "id": ",".join(video_ids)
+        })
+
+    @_request_retry
+    async def _make_request(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Make HTTP request with retry logic for 429/5xx errors"""
+        params = {
+            **params,
+            "key": self.settings.youtube_api_key
+        }
+
+        try:
+            cost = unit_cost(endpoint, params.get("part"))
+            wait = self.budget.reserve(cost)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.quota_units += cost
+            self.throttled_seconds += wait
+
+            cache_key, headers = _conditional_headers(self.cache, endpoint, params)
+            async with self._semaphore:
+                response = await self.client.get(f"{self.base_url}/{endpoint}", params=params, headers=headers)
+
+            if response.status_code == 429:
+                self.budget.drain()
+
+            if response.status_code == 429 or response.status_code >= 500:
+                logger.warning(f"HTTP {response.status_code}: retrying request")
+
+            return _read_response(self.cache, cache_key, headers, response)
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error {e.response.status_code}: {e}")
+            raise
+        except httpx.RequestError as e:
+            logger.error(f"Request error: {e}")
+            raise
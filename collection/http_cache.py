@@ -0,0 +1,188 @@
+"""ETag response cache for YouTube API requests"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from pydantic_settings import BaseSettings
+
+logger = logging.getLogger(__name__)
+
+# Response bytes whose decoded bodies stay memoized; least recently used go first
+DEFAULT_MEMO_BYTES = 64 * 1024 * 1024
+# Expired entries are deleted at most this often, from lookups and stores
+EVICTION_INTERVAL_SECONDS = 60.0
+
+
+class CacheSettings(BaseSettings):
+    # SQLite file for cached responses; caching is off when unset
+    youtube_cache_path: Optional[str] = None
+    youtube_cache_ttl: int = 3600
+    youtube_cache_memo_bytes: int = DEFAULT_MEMO_BYTES
+
+    class Config:
+        env_file = ".env"
+        extra = "ignore"
+
+
+class ResponseCache:
+    """On-disk store of ETag-validated JSON responses with TTL eviction.
+
+    Bodies are kept zlib-compressed in SQLite so they survive between
+    collector runs; decoded bodies of up to `memo_bytes` of responses are
+    also memoized in-process, so a 304 answer is served without
+    decompressing or parsing JSON again. Lookups and stores delete expired
+    entries every EVICTION_INTERVAL_SECONDS, so a long-lived process keeps
+    neither store growing.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int = 3600, memo_bytes: int = DEFAULT_MEMO_BYTES,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.memo_bytes = memo_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._memo: "OrderedDict[str, Tuple[str, float, int, Any]]" = OrderedDict()
+        self._memo_size = 0
+        self._next_eviction = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    key TEXT PRIMARY KEY,
+                    etag TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    stored_at REAL NOT NULL
+                )
+            """)
+        self.evict_expired()
+
+    @staticmethod
+    def key(endpoint: str, params: Dict[str, Any]) -> str:
+        """Cache key from endpoint and request params (API key excluded)"""
+        return endpoint + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params) if k != "key")
+
+    def lookup(self, key: str) -> Optional[str]:
+        """ETag to send as If-None-Match, or None when nothing fresh is stored"""
+        self._evict_if_due()
+        entry = self._entry(key)
+        return entry[0] if entry else None
+
+    def hit(self, key: str) -> Any:
+        """Record a 304 for `key` and return the cached body"""
+        etag, _, size, data = self._entry(key, fresh_only=False)
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += size
+        return data
+
+    def store(self, key: str, etag: Optional[str], content: bytes, data: Any) -> None:
+        """Record a full response; only responses carrying an ETag are kept"""
+        with self._lock:
+            self.misses += 1
+        self._evict_if_due()
+        if not etag:
+            return
+
+        stored_at = self._clock()
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT INTO http_cache (key, etag, body, size, stored_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    etag = excluded.etag, body = excluded.body, size = excluded.size, stored_at = excluded.stored_at
+            """, (key, etag, zlib.compress(content), len(content), stored_at))
+        self._remember(key, (etag, stored_at, len(content), data))
+
+    def evict_expired(self) -> int:
+        """Delete entries older than the TTL; returns rows removed"""
+        now = self._clock()
+        horizon = now - self.ttl_seconds
+        with self._connect() as conn:
+            removed = conn.execute("DELETE FROM http_cache WHERE stored_at < ?", (horizon,)).rowcount
+        with self._lock:
+            self._next_eviction = now + EVICTION_INTERVAL_SECONDS
+            self._memo = OrderedDict((k, v) for k, v in self._memo.items() if v[1] >= horizon)
+            self._memo_size = sum(entry[2] for entry in self._memo.values())
+        return removed
+
+    def metrics(self) -> Dict[str, Any]:
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / requests, 4) if requests else 0.0,
+            "bytes_saved": self.bytes_saved,
+        }
+
+    def _entry(self, key: str, fresh_only: bool = True) -> Optional[Tuple[str, float, int, Any]]:
+        horizon = self._clock() - self.ttl_seconds
+        with self._lock:
+            entry = self._memo.get(key)
+            if entry is not None:
+                self._memo.move_to_end(key)
+        if entry is None:
+            with self._connect() as conn:
+                row = conn.execute("SELECT etag, body, size, stored_at FROM http_cache WHERE key = ?",
+                                   (key,)).fetchone()
+            if row is None:
+                return None
+            etag, body, size, stored_at = row
+            entry = (etag, stored_at, size, json.loads(zlib.decompress(body)))
+            self._remember(key, entry)
+
+        return entry if entry[1] >= horizon or not fresh_only else None
+
+    def _remember(self, key: str, entry: Tuple[str, float, int, Any]) -> None:
+        """Memoize a decoded body, dropping least recently used ones past memo_bytes"""
+        with self._lock:
+            previous = self._memo.pop(key, None)
+            if previous is not None:
+                self._memo_size -= previous[2]
+            self._memo[key] = entry
+            self._memo_size += entry[2]
+            while self._memo_size > self.memo_bytes and self._memo:
+                self._memo_size -= self._memo.popitem(last=False)[1][2]
+
+    def _evict_if_due(self) -> None:
+        with self._lock:
+            if self._clock() < self._next_eviction:
+                return
+            # Claimed here so concurrent callers do not evict twice
+            self._next_eviction = self._clock() + EVICTION_INTERVAL_SECONDS
+        self.evict_expired()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide cache from CacheSettings, or None when caching is not configured"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = CacheSettings()
+            if settings.youtube_cache_path:
+                _cache = ResponseCache(settings.youtube_cache_path, settings.youtube_cache_ttl,
+                                       settings.youtube_cache_memo_bytes)
+        return _cache
@@ -0,0 +1,77 @@
+"""Snapshot write paths: multi-row INSERT for small batches, COPY for bulk"""
+import logging
+from typing import Any, Dict, Iterable, Sequence
+
+from sqlalchemy import literal_column, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from core.models import VideoMetricsSnapshot
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_COLUMNS = ("video_id", "captured_at", "view_count", "like_count", "comment_count")
+INGEST_METHODS = ("auto", "values", "copy")
+# Above this many rows "auto" streams through COPY instead of INSERT ... VALUES
+COPY_THRESHOLD = 1_000
+# Rows per INSERT ... VALUES statement (5 bind params each, PostgreSQL allows 65535)
+VALUES_BATCH_ROWS = 10_000
+
+STAGING_TABLE = "video_metrics_snapshot_staging"
+
+
+def insert_snapshots(db: Session, rows: Sequence[Dict[str, Any]], method: str = "auto") -> int:
+    """Insert snapshot rows idempotently; returns rows actually inserted.
+
+    Runs inside the session's current transaction - the caller commits.
+    """
+    if method not in INGEST_METHODS:
+        raise ValueError(f"Unknown ingest method: {method}")
+    if not rows:
+        return 0
+    if method == "copy" or (method == "auto" and len(rows) > COPY_THRESHOLD):
+        return copy_snapshots(db, rows)
+    return insert_snapshots_values(db, rows)
+
+
+def insert_snapshots_values(db: Session, rows: Sequence[Dict[str, Any]]) -> int:
+    """Multi-row INSERT ... VALUES ON CONFLICT DO NOTHING, batched under the bind limit"""
+    inserted = 0
+    for start in range(0, len(rows), VALUES_BATCH_ROWS):
+        stmt = insert(VideoMetricsSnapshot).values(list(rows[start:start + VALUES_BATCH_ROWS]))
+        stmt = stmt.on_conflict_do_nothing(index_elements=['video_id', 'captured_at'])
+        # rowcount is not reported for ORM inserts, so count the RETURNING rows instead
+        inserted += len(db.execute(stmt.returning(literal_column("1"))).fetchall())
+    return inserted
+
+
+def copy_snapshots(db: Session, rows: Iterable[Dict[str, Any]]) -> int:
+    """Stream rows through COPY into a temp staging table, then merge.
+
+    The staging table lives for the connection and is emptied on commit, so
+    repeated calls reuse it without catalog churn.
+    """
+    db.execute(text(f"""
+        CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+            video_id VARCHAR NOT NULL,
+            captured_at TIMESTAMPTZ NOT NULL,
+            view_count BIGINT,
+            like_count BIGINT,
+            comment_count BIGINT
+        ) ON COMMIT DELETE ROWS
+    """))
+    db.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+
+    # COPY is driver-level; use the psycopg connection behind the session's transaction
+    driver_connection = db.connection().connection.driver_connection
+    with driver_connection.cursor() as cursor:
+        with cursor.copy(f"COPY {STAGING_TABLE} ({', '.join(SNAPSHOT_COLUMNS)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(tuple(row[column] for column in SNAPSHOT_COLUMNS))
+
+    columns = ", ".join(SNAPSHOT_COLUMNS)
+    return db.execute(text(f"""
+        INSERT INTO video_metrics_snapshot ({columns})
+        SELECT {columns} FROM {STAGING_TABLE}
+        ON CONFLICT (video_id, captured_at) DO NOTHING
+    """)).rowcount
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+from core.db import SessionLocal, engine
+from core.logging import setup_json_logging
+from core.models import BackfillCheckpoint, Video
+from core.partitions import ensure_snapshot_partitions
+from collection.ingest import INGEST_METHODS, insert_snapshots
+from analysis.jobs.rollup_metrics import MetricsRollup
+
+logger = logging.getLogger(__name__)
+
+# Dump formats by file extension; JSONL and CSV may also be gzip-compressed
+FILE_FORMATS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv", ".parquet": "parquet"}
+DEFAULT_WORKERS = 4
+# Rows read, written and checkpointed per transaction
+DEFAULT_CHUNK_ROWS = 50_000
+
+COUNT_COLUMNS = ("view_count", "like_count", "comment_count")
+# Optional video metadata; videos missing from the table are created from it
+VIDEO_COLUMNS = ("title", "description", "channel", "category", "tags", "country_code", "published_at")
+# Rows per videos INSERT (8 bind params each, PostgreSQL allows 65535)
+VIDEO_BATCH_ROWS = 5_000
+
+# Advisory lock key serializing partition DDL between backfill workers
+PARTITION_LOCK_KEY = 0x6261636B
+
+
+def file_format(path: str) -> Optional[str]:
+    """Dump format of a file, or None when it is not a supported dump"""
+    name = path.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+        if name.endswith(".parquet"):
+            return None
+    return FILE_FORMATS.get(os.path.splitext(name)[1])
+
+
+def discover_files(paths: List[str]) -> List[str]:
+    """Absolute paths of dump files, expanding directories in sorted order"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in sorted(os.walk(path)):
+                files += [os.path.join(root, name) for name in sorted(names) if file_format(name)]
+        elif file_format(path):
+            files.append(path)
+        else:
+            raise ValueError(f"Unsupported dump file: {path}")
+    return [os.path.abspath(path) for path in files]
+
+
+def read_chunks(path: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Yield a dump file as DataFrames of at most `chunk_rows` rows"""
+    fmt = file_format(path)
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_rows, dtype={"video_id": str, "category": str})
+    elif fmt == "jsonl":
+        # dtype/convert_dates off so numeric-looking video ids stay strings
+        yield from pd.read_json(path, lines=True, chunksize=chunk_rows, dtype=False, convert_dates=False)
+    elif fmt == "parquet":
+        # Needs pyarrow or fastparquet; pandas raises ImportError naming them otherwise
+        frame = pd.read_parquet(path)
+        for start in range(0, len(frame), chunk_rows):
+            yield frame.iloc[start:start + chunk_rows]
+    else:
+        raise ValueError(f"Unsupported dump file: {path}")
+
+
+def _timestamps(values: pd.Series) -> List[Optional[datetime]]:
+    """UTC datetimes (naive values taken as UTC), None where unparseable"""
+    parsed = pd.to_datetime(values, utc=True, errors="coerce", format="mixed")
+    return [None if pd.isna(value) else value.to_pydatetime() for value in parsed]
+
+
+def _earliest(frame: pd.DataFrame, earliest: Optional[datetime]) -> Optional[datetime]:
+    """Earlier of `earliest` and the chunk's first parseable captured_at"""
+    if "captured_at" not in frame:
+        return earliest
+    first = pd.to_datetime(frame["captured_at"], utc=True, errors="coerce", format="mixed").min()
+    if pd.isna(first):
+        return earliest
+    first = first.to_pydatetime()
+    return first if earliest is None else min(earliest, first)
+
+
+def _counts(values: pd.Series) -> List[Optional[int]]:
+    numbers = pd.to_numeric(values, errors="coerce").tolist()
+    return [None if number != number else int(number) for number in numbers]
+
+
+def _tags(value: Any) -> Optional[List[str]]:
+    """Tags from a JSON list, a JSON-encoded string (CSV) or a bare string"""
+    if isinstance(value, str):
+        if value.startswith("["):
+            return json.loads(value)
+        return [value] if value else None
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return list(value)
+
+
+def frame_rows(frame: pd.DataFrame) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], int]:
+    """Split a dump chunk into video rows, snapshot rows and a count of invalid rows.
+
+    Rows without a video id or a parseable captured_at are dropped. Video
+    rows are deduplicated (first row wins) and sorted by id so concurrent
+    workers lock videos in the same order.
+    """
+    n = len(frame)
+    video_ids = [None if pd.isna(value) else str(value) for value in frame["video_id"]] \
+        if "video_id" in frame else [None] * n
+    captured = _timestamps(frame["captured_at"]) if "captured_at" in frame else [None] * n
+    counts = {column: _counts(frame[column]) if column in frame else [None] * n for column in COUNT_COLUMNS}
+
+    snapshot_rows = []
+    valid = []
+    for i in range(n):
+        if not video_ids[i] or captured[i] is None:
+            continue
+        valid.append(i)
+        snapshot_rows.append({
+            "video_id": video_ids[i],
+            "captured_at": captured[i],
+            **{column: counts[column][i] for column in COUNT_COLUMNS}
+        })
+
+    metadata = {}
+    for column in VIDEO_COLUMNS:
+        if column not in frame:
+            continue
+        if column == "published_at":
+            metadata[column] = _timestamps(frame[column])
+        elif column == "tags":
+            metadata[column] = [_tags(value) for value in frame[column]]
+        else:
+            metadata[column] = [None if pd.isna(value) else str(value) for value in frame[column]]
+
+    videos = {}
+    for i in valid:
+        if video_ids[i] not in videos:
+            videos[video_ids[i]] = {"video_id": video_ids[i], **{column: values[i] for column, values in metadata.items()}}
+    video_rows = [videos[video_id] for video_id in sorted(videos)]
+
+    return video_rows, snapshot_rows, n - len(valid)
+
+
+class SnapshotBackfill:
+    def __init__(self, method: str = "auto", chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        if method not in INGEST_METHODS:
+            raise ValueError(f"Unknown ingest method: {method}")
+        self.method = method
+        self.chunk_rows = chunk_rows
+        self.db = SessionLocal()
+        # Days whose partition this worker has already ensured
+        self._partition_days = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.db.close()
+
+    def load_file(self, path: str) -> Dict[str, Any]:
+        """Load one dump file, resuming after its last committed chunk.
+
+        Each chunk's videos, snapshots and checkpoint commit together, so an
+        interrupted run never skips or double-counts rows when restarted.
+        """
+        trace_id = f"backfill_{os.getpid()}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}"
+        source = os.path.abspath(path)
+        file_size = os.path.getsize(source)
+        result = {"file": source, "rows_read": 0, "snapshots_inserted": 0, "videos_inserted": 0,
+                  "errors": 0, "resumed_at": 0, "skipped": False, "seconds": 0.0, "earliest_captured_at": None}
+        started = time.perf_counter()
+
+        try:
+            rows_done = self._start_checkpoint(source, file_size)
+            if rows_done is None:
+                result["skipped"] = True
+                logger.info("Backfill file already loaded - skipping", extra={"trace_id": trace_id, "file": source})
+                return result
+            result["resumed_at"] = rows_done
+
+            offset = 0
+            for frame in read_chunks(source, self.chunk_rows):
+                # Chunks an interrupted run loaded count too; that run may never have rolled them up
+                result["earliest_captured_at"] = _earliest(frame, result["earliest_captured_at"])
+                end = offset + len(frame)
+                if end <= rows_done:
+                    offset = end
+                    continue
+                if offset < rows_done:
+                    frame = frame.iloc[rows_done - offset:]
+
+                video_rows, snapshot_rows, errors = frame_rows(frame)
+                self._ensure_partitions(snapshot_rows)
+                result["videos_inserted"] += self._insert_videos(video_rows)
+                result["snapshots_inserted"] += insert_snapshots(self.db, snapshot_rows, self.method)
+                self._save_checkpoint(source, end)
+                self.db.commit()
+
+                result["rows_read"] += len(frame)
+                result["errors"] += errors
+                offset = end
+
+            self._save_checkpoint(source, offset, completed=True)
+            self.db.commit()
+
+            result["seconds"] = round(time.perf_counter() - started, 3)
+            logger.info("Backfill file completed", extra={"trace_id": trace_id, "job": "backfill_snapshots", **result})
+            return result
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Backfill of {source} failed: {e}", extra={
+                "trace_id": trace_id,
+                "job": "backfill_snapshots",
+                "file": source
+            })
+            raise
+
+    def _start_checkpoint(self, source: str, file_size: int) -> Optional[int]:
+        """Rows already loaded from `source`, or None when the file is done.
+
+        A file whose size changed since its checkpoint is loaded from the start.
+        """
+        checkpoint = self.db.get(BackfillCheckpoint, source)
+        if checkpoint is not None and checkpoint.file_size == file_size:
+            return None if checkpoint.completed_at is not None else checkpoint.rows_done
+
+        stmt = insert(BackfillCheckpoint).values(source=source, file_size=file_size, rows_done=0)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["source"],
+            set_={"file_size": file_size, "rows_done": 0, "completed_at": None, "updated_at": text("NOW()")}
+        )
+        self.db.execute(stmt)
+        self.db.commit()
+        return 0
+
+    def _save_checkpoint(self, source: str, rows_done: int, completed: bool = False) -> None:
+        self.db.execute(text("""
+            UPDATE backfill_checkpoint
+            SET rows_done = :rows_done,
+                completed_at = CASE WHEN :completed THEN NOW() END,
+                updated_at = NOW()
+            WHERE source = :source
+        """), {"source": source, "rows_done": rows_done, "completed": completed})
+
+    def _ensure_partitions(self, snapshot_rows: List[Dict[str, Any]]) -> None:
+        """Create daily partitions for the chunk's days in a short transaction of its own"""
+        days = {row["captured_at"].date() for row in snapshot_rows} - self._partition_days
+        if not days:
+            return
+        self.db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+        ensure_snapshot_partitions(self.db, min(days), max(days))
+        self.db.commit()
+        self._partition_days.update(days)
+
+    def _insert_videos(self, video_rows: List[Dict[str, Any]]) -> int:
+        """Create videos the table does not know yet; existing metadata is newer, so it is kept"""
+        inserted = 0
+        for start in range(0, len(video_rows), VIDEO_BATCH_ROWS):
+            batch = video_rows[start:start + VIDEO_BATCH_ROWS]
+            # Every row in a multi-row INSERT needs the same keys
+            columns = set().union(*batch)
+            stmt = insert(Video).values([{column: row.get(column) for column in columns} for row in batch])
+            stmt = stmt.on_conflict_do_nothing(index_elements=["video_id"]).returning(Video.video_id)
+            inserted += len(self.db.execute(stmt).fetchall())
+        return inserted
+
+
+def _init_worker() -> None:
+    # Forked workers must not reuse the parent's pooled connections
+    engine.dispose(close=False)
+
+
+def _load_file(path: str, method: str, chunk_rows: int) -> Dict[str, Any]:
+    with SnapshotBackfill(method, chunk_rows) as backfill:
+        return backfill.load_file(path)
+
+
+def backfill(paths: List[str], workers: int = DEFAULT_WORKERS, method: str = "auto",
+             chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Dict[str, Any]:
+    """Load dump files in parallel, one file per worker process at a time.
+
+    With `workers` <= 1 files are loaded in this process. Files that fail are
+    reported and raise once every other file has been loaded; re-running
+    resumes them from their checkpoint.
+
+    The hourly and daily rollups are then rebuilt from the earliest loaded
+    snapshot: the rollup job only resumes from its watermark, and raw days
+    are dropped after retention only once rolled up.
+    """
+    trace_id = f"backfill_snapshots_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}"
+    files = discover_files(paths)
+    started = time.perf_counter()
+
+    logger.info("Starting snapshot backfill", extra={
+        "trace_id": trace_id,
+        "job": "backfill_snapshots",
+        "files": len(files),
+        "workers": workers,
+        "method": method,
+        "chunk_rows": chunk_rows
+    })
+
+    results = []
+    failed = {}
+    if workers <= 1:
+        for path in files:
+            try:
+                results.append(_load_file(path, method, chunk_rows))
+            except Exception as e:
+                failed[path] = str(e)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            futures = {executor.submit(_load_file, path, method, chunk_rows): path for path in files}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    failed[futures[future]] = str(e)
+
+    earliest = [result["earliest_captured_at"] for result in results if result["earliest_captured_at"]]
+    rolled_up_since = min(earliest) if earliest else None
+    if rolled_up_since is not None:
+        with MetricsRollup() as rollup:
+            rollup.rollup(since=rolled_up_since)
+
+    seconds = time.perf_counter() - started
+    rows = sum(result["rows_read"] for result in results)
+    summary = {
+        "files": len(files),
+        "files_loaded": sum(1 for result in results if not result["skipped"]),
+        "files_skipped": sum(1 for result in results if result["skipped"]),
+        "files_failed": failed,
+        "workers": workers,
+        "rows_read": rows,
+        "snapshots_inserted": sum(result["snapshots_inserted"] for result in results),
+        "videos_inserted": sum(result["videos_inserted"] for result in results),
+        "errors": sum(result["errors"] for result in results),
+        "rolled_up_since": rolled_up_since.isoformat() if rolled_up_since else None,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": int(rows / seconds) if seconds > 0 else None
+    }
+
+    logger.info("Snapshot backfill completed", extra={
+        "trace_id": trace_id,
+        "job": "backfill_snapshots",
+        **summary
+    })
+
+    if failed:
+        raise RuntimeError(f"Backfill failed for {len(failed)} of {len(files)} files: {sorted(failed)}")
+
+    return summary
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load historical snapshot dumps (JSONL, CSV, Parquet)")
+    parser.add_argument("paths", nargs="+", help="Dump files or directories containing them")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Files loaded in parallel processes (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--method", choices=INGEST_METHODS, default="auto",
+                        help="Snapshot write path (default: auto, COPY for large chunks)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                        help=f"Rows committed and checkpointed together (default: {DEFAULT_CHUNK_ROWS})")
+
+    args = parser.parse_args(argv)
+
+    setup_json_logging()
+
+    backfill(args.paths, args.workers, args.method, args.chunk_rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+import sys
+import math
+import logging
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import text
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+from core.db import SessionLocal
+from core.logging import setup_json_logging
+from core.watermarks import get_watermark
+from collection.clients.youtube import DETAIL_BATCH_SIZE, STATISTICS_PART, YouTubeClient, YouTubeSettings
+from collection.http_cache import get_response_cache
+from collection.ingest import insert_snapshots
+from collection.polling import advance_poll_schedule, due_videos, remove_from_schedule
+from collection.quota import get_quota_budget, unit_cost
+from analysis.velocity_ewma import update_velocity_ewma
+from analysis.velocity_state import VELOCITY_WATERMARK
+
+logger = logging.getLogger(__name__)
+
+# Hottest videos refreshed per run
+DEFAULT_HOT_LIMIT = 200
+# Velocity lookback used to rank videos
+DEFAULT_LOOKBACK_HOURS = 3
+# Due videos polled per tick in adaptive mode
+DEFAULT_DUE_LIMIT = 1_000
+# Buckets are trusted only if the analyzer has processed snapshots up to this
+# close to the newest one; otherwise hot videos are ranked from raw snapshots
+BUCKET_MAX_LAG_MINUTES = 10
+COLLECT_MODES = ("hot", "due")
+
+
+class IncrementalCollector:
+    """Refresh counters of tracked videos between full trending pulls.
+
+    `collect_hot` polls the fastest movers; `collect_due` polls whatever the
+    adaptive schedule (collection.polling) says is due. Only statistics are
+    requested, 50 ids per call, so a run costs ceil(videos / 50) quota units
+    however many regions the videos trend in.
+    """
+
+    def __init__(self, http_client: Optional[httpx.Client] = None,
+                 youtube_settings: Optional[YouTubeSettings] = None):
+        self.db = SessionLocal()
+        # Shared by long-lived workers so ticks reuse warm connections and parsed settings
+        self.http_client = http_client
+        self.youtube_settings = youtube_settings
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.db.close()
+
+    def collect_hot(self, limit: int = DEFAULT_HOT_LIMIT, lookback_hours: int = DEFAULT_LOOKBACK_HOURS,
+                    dry_run: bool = False) -> Dict[str, Any]:
+        """Snapshot the statistics of the `limit` hottest videos"""
+        trace_id = f"collect_incremental_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}"
+
+        try:
+            logger.info("Starting incremental collection", extra={
+                "trace_id": trace_id,
+                "job": "collector_incremental",
+                "limit": limit,
+                "lookback_hours": lookback_hours,
+                "dry_run": dry_run
+            })
+
+            video_ids, velocity_source = self._hot_videos(limit, lookback_hours)
+            summary: Dict[str, Any] = {"velocity_source": velocity_source, "selected": 0}
+            if not video_ids:
+                logger.warning("No recent velocity - nothing to refresh", extra={"trace_id": trace_id})
+                return summary
+
+            # Hottest first, so a short budget drops the slowest movers
+            summary.update(self._refresh(video_ids, dry_run, trace_id))
+
+            logger.info("Incremental collection completed", extra={
+                "trace_id": trace_id,
+                "job": "collector_incremental",
+                **summary,
+                **self._cache_metrics()
+            })
+
+            return summary
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Incremental collection failed: {e}", extra={
+                "trace_id": trace_id,
+                "job": "collector_incremental"
+            })
+            raise
+
+    def collect_due(self, limit: int = DEFAULT_DUE_LIMIT, dry_run: bool = False) -> Dict[str, Any]:
+        """Snapshot the videos whose adaptive poll interval has elapsed, then reschedule them"""
+        trace_id = f"collect_incremental_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}"
+        now = datetime.now(timezone.utc)
+
+        try:
+            logger.info("Starting due video collection", extra={
+                "trace_id": trace_id,
+                "job": "collector_incremental",
+                "limit": limit,
+                "dry_run": dry_run
+            })
+
+            video_ids = due_videos(self.db, now, limit)
+            summary: Dict[str, Any] = {"due": len(video_ids)}
+            if not video_ids:
+                logger.info("No videos due", extra={"trace_id": trace_id})
+                return summary
+
+            # Most overdue first, so a short budget postpones the least late
+            summary.update(self._refresh(video_ids, dry_run, trace_id))
+
+            logger.info("Due video collection completed", extra={
+                "trace_id": trace_id,
+                "job": "collector_incremental",
+                **summary,
+                **self._cache_metrics()
+            })
+
+            return summary
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Due video collection failed: {e}", extra={
+                "trace_id": trace_id,
+                "job": "collector_incremental"
+            })
+            raise
+
+    def _refresh(self, video_ids: List[str], dry_run: bool, trace_id: str) -> Dict[str, Any]:
+        """Fetch statistics for `video_ids` as far as the budget allows and store one snapshot each.
+
+        Polled videos are rescheduled and missing ones leave the poll
+        schedule, in the same transaction as the snapshots.
+        """
+        counts: Dict[str, Any] = {"selected": len(video_ids), "refreshed": 0, "missing": 0,
+                                  "snapshots_inserted": 0, "quota_units": 0}
+
+        affordable = self._affordable_videos(len(video_ids))
+        if affordable < len(video_ids):
+            logger.warning(f"Quota budget short - refreshing {affordable} of {len(video_ids)} videos", extra={
+                "trace_id": trace_id,
+                "job": "collector_incremental"
+            })
+            video_ids = video_ids[:affordable]
+            counts["selected"] = affordable
+        if not video_ids:
+            return counts
+
+        # Selection is done; don't hold a transaction open across the API calls
+        self.db.commit()
+        with YouTubeClient(http_client=self.http_client, settings=self.youtube_settings) as youtube:
+            statistics = youtube.get_video_statistics(video_ids)
+            counts["quota_units"] = youtube.quota_units
+
+        captured_at = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        rows = [
+            {"video_id": video_id, "captured_at": captured_at, **statistics[video_id]}
+            for video_id in video_ids if video_id in statistics
+        ]
+        missing = [video_id for video_id in video_ids if video_id not in statistics]
+        counts["refreshed"] = len(rows)
+        counts["missing"] = len(missing)
+
+        if dry_run:
+            logger.info("Dry run mode - no database changes", extra={
+                "trace_id": trace_id,
+                "would_snapshot": len(rows)
+            })
+            return counts
+
+        counts["snapshots_inserted"] = insert_snapshots(self.db, rows)
+        update_velocity_ewma(self.db, rows)
+        advance_poll_schedule(self.db, [row["video_id"] for row in rows], captured_at)
+        remove_from_schedule(self.db, missing)
+        self.db.commit()
+        return counts
+
+    def _cache_metrics(self) -> Dict[str, Any]:
+        cache = get_response_cache()
+        return {"http_cache": cache.metrics()} if cache else {}
+
+    def _hot_videos(self, limit: int, lookback_hours: int) -> Tuple[List[str], str]:
+        """Video ids by descending recent velocity and where the velocity came from.
+
+        Buckets kept by the incremental analyzer are used when the analyzer
+        has processed snapshots up to within BUCKET_MAX_LAG_MINUTES of the
+        newest one; otherwise velocity is derived from raw snapshots.
+        """
+        if self._buckets_current(lookback_hours):
+            rows = self.db.execute(text("""
+                SELECT video_id, MAX(max_views_per_min) AS velocity
+                FROM video_velocity_bucket
+                WHERE bucket_start >= NOW() - make_interval(hours => :hours)
+                  AND max_views_per_min > 0
+                GROUP BY video_id
+                ORDER BY velocity DESC, video_id
+                LIMIT :limit
+            """), {"hours": lookback_hours, "limit": limit}).fetchall()
+            if rows:
+                return [row.video_id for row in rows], "velocity_bucket"
+
+        rows = self.db.execute(text("""
+            SELECT
+                video_id,
+                (MAX(view_count) - MIN(view_count))
+                    / GREATEST(EXTRACT(EPOCH FROM MAX(captured_at) - MIN(captured_at)) / 60, 1) AS velocity
+            FROM video_metrics_snapshot
+            WHERE captured_at >= NOW() - make_interval(hours => :hours)
+            GROUP BY video_id
+            HAVING COUNT(*) >= 2 AND MAX(view_count) > MIN(view_count)
+            ORDER BY velocity DESC, video_id
+            LIMIT :limit
+        """), {"hours": lookback_hours, "limit": limit}).fetchall()
+        return [row.video_id for row in rows], "snapshots"
+
+    def _buckets_current(self, lookback_hours: int) -> bool:
+        """Whether the analyzer's buckets include all but the last few minutes of snapshots"""
+        watermark = get_watermark(self.db, VELOCITY_WATERMARK)
+        if watermark is None:
+            return False
+        latest = self.db.execute(text("""
+            SELECT MAX(captured_at) FROM video_metrics_snapshot
+            WHERE captured_at >= NOW() - make_interval(hours => :hours)
+        """), {"hours": lookback_hours}).scalar()
+        return latest is None or watermark >= latest - timedelta(minutes=BUCKET_MAX_LAG_MINUTES)
+
+    def _affordable_videos(self, videos: int) -> int:
+        """How many of `videos` the quota budget can refresh right now"""
+        cost_per_batch = unit_cost("videos", STATISTICS_PART)
+        batches = min(math.ceil(videos / DETAIL_BATCH_SIZE), int(get_quota_budget().remaining // cost_per_batch))
+        return min(videos, max(0, batches) * DETAIL_BATCH_SIZE)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Refresh statistics of hot or due videos")
+    parser.add_argument("--mode", choices=COLLECT_MODES, default="hot",
+                        help="hot: fastest recent movers; due: videos the adaptive poll schedule marks due")
+    parser.add_argument("--limit", type=int,
+                        help=f"Videos to refresh (default: {DEFAULT_HOT_LIMIT} hot, {DEFAULT_DUE_LIMIT} due)")
+    parser.add_argument("--lookback-hours", type=int, default=DEFAULT_LOOKBACK_HOURS,
+                        help=f"Velocity lookback for ranking hot videos (default: {DEFAULT_LOOKBACK_HOURS})")
+    parser.add_argument("--dry-run", action="store_true", help="Don't write to database")
+
+    args = parser.parse_args(argv)
+
+    setup_json_logging()
+
+    with IncrementalCollector() as collector:
+        if args.mode == "due":
+            collector.collect_due(args.limit or DEFAULT_DUE_LIMIT, args.dry_run)
+        else:
+            collector.collect_hot(args.limit or DEFAULT_HOT_LIMIT, args.lookback_hours, args.dry_run)
+
+if __name__ == "__main__":
+    main()
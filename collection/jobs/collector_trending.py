@@ -2,9 +2,12 @@
 import sys
 import logging
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from typing import List
+from typing import Any, Dict, List, Optional
 
+import httpx
+from sqlalchemy import literal_column, or_, text
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
@@ -12,15 +15,50 @@ from sqlalchemy.orm import Session
 sys.path.insert(0, ".")
 
 from core.db import SessionLocal
-from core.models import Video, VideoMetricsSnapshot
+from core.models import Video
 from core.logging import setup_json_logging
-from collection.clients.youtube import YouTubeClient, YouTubeVideo
+from collection.clients.youtube import (
+    DEFAULT_FETCH_MODE, FETCH_MODES, YouTubeClient, YouTubeSettings, YouTubeVideo
+)
+from collection.http_cache import get_response_cache
+from collection.ingest import insert_snapshots
+from collection.polling import advance_poll_schedule
+from collection.quota import estimate_region_cost, get_quota_budget, prioritize_regions
+from analysis.velocity_ewma import update_velocity_ewma
 
 logger = logging.getLogger(__name__)
 
+# Regions fetched at once in multi-region mode
+DEFAULT_MAX_WORKERS = 4
+# Lookback for ranking regions when the quota budget is short
+ACTIVITY_WINDOW_HOURS = 24
+# Videos per savepoint when a combined write has to be retried piecewise
+FALLBACK_BATCH_SIZE = 25
+# Video columns refreshed on upsert; a conflicting row is only rewritten when one differs
+VIDEO_UPDATE_COLUMNS = ("title", "description", "channel", "category", "tags", "country_code", "published_at")
+
+
+def merge_region_videos(region_videos: Dict[str, List[YouTubeVideo]], regions: List[str]) -> List[YouTubeVideo]:
+    """Merge per-region results, keeping the first region's copy of a video.
+
+    A video trending in several regions is stored once; `regions` decides
+    which region it is attributed to.
+    """
+    merged: Dict[str, YouTubeVideo] = {}
+    for region in regions:
+        for video in region_videos.get(region, []):
+            merged.setdefault(video.video_id, video)
+    return list(merged.values())
+
+
 class TrendingCollector:
-    def __init__(self):
+    def __init__(self, fetch_mode: str = DEFAULT_FETCH_MODE, http_client: Optional[httpx.Client] = None,
+                 youtube_settings: Optional[YouTubeSettings] = None):
         self.db = SessionLocal()
+        self.fetch_mode = fetch_mode
+        # Shared by long-lived workers so ticks reuse warm connections and parsed settings
+        self.http_client = http_client
+        self.youtube_settings = youtube_settings
 
     def __enter__(self):
         return self
@@ -43,8 +81,9 @@ class TrendingCollector:
             })
 
             # Fetch trending videos from YouTube
-            with YouTubeClient() as youtube:
+            with self._youtube_client() as youtube:
                 videos = youtube.get_trending_videos(country_code, limit)
+                quota_units = youtube.quota_units
 
             if not videos:
                 logger.warning("No videos fetched", extra={"trace_id": trace_id})
@@ -63,22 +102,22 @@ class TrendingCollector:
                 })
                 return len(videos), len(videos), 0
 
-            # Store videos and metrics
-            videos_stored, video_errors = self._upsert_videos(videos, trace_id)
-            snapshots_stored, snapshot_errors = self._insert_metrics_snapshots(videos, trace_id)
-            errors = video_errors + snapshot_errors
+            # Store videos and metrics in one transaction
+            counts = self._store_batch(videos, trace_id)
+            errors = counts["errors"]
 
             logger.info(f"Collection completed", extra={
                 "trace_id": trace_id,
                 "job": "collector_trending",
                 "country": country_code,
                 "fetched": len(videos),
-                "upserts": videos_stored,
-                "snapshots": snapshots_stored,
-                "errors": errors
+                **counts,
+                "fetch_mode": self.fetch_mode,
+                "quota_units": quota_units,
+                **self._cache_metrics()
             })
 
-            return len(videos), videos_stored, snapshots_stored
+            return len(videos), counts["upserts"], counts["snapshots"]
 
         except Exception as e:
             logger.error(f"Collection failed: {e}", extra={
@@ -88,100 +127,296 @@ class TrendingCollector:
             })
             raise
 
-    def _upsert_videos(self, videos: List[YouTubeVideo], trace_id: str) -> tuple[int, int]:
-        """Upsert videos into videos table"""
-        errors = 0
-        try:
-            video_data = []
-            for video in videos:
+    def collect_regions(self, country_codes: List[str], limit: int = 50, dry_run: bool = False,
+                        max_workers: int = DEFAULT_MAX_WORKERS) -> Dict[str, Any]:
+        """Collect several regions concurrently and store them in one transaction"""
+        trace_id = f"collect_trending_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}"
+        regions = list(dict.fromkeys(country_codes))
+
+        logger.info("Starting multi-region trending collection", extra={
+            "trace_id": trace_id,
+            "job": "collector_trending",
+            "regions": regions,
+            "limit": limit,
+            "max_workers": max_workers,
+            "dry_run": dry_run
+        })
+
+        region_videos: Dict[str, List[YouTubeVideo]] = {}
+        accounting: Dict[str, Dict[str, Any]] = {}
+        quota: Dict[str, int] = {}
+
+        # Most active regions go first and the ones the budget cannot cover wait for the next run
+        budget = get_quota_budget()
+        selected, deferred = prioritize_regions(
+            regions, self._region_activity(regions, trace_id), budget.remaining,
+            estimate_region_cost(limit, self.fetch_mode)
+        )
+        for region in deferred:
+            accounting[region] = {"status": "deferred", "fetched": 0, "quota_units": 0}
+        if deferred:
+            logger.warning(f"Quota budget short - deferring {len(deferred)} regions", extra={
+                "trace_id": trace_id,
+                "job": "collector_trending",
+                "deferred": deferred,
+                "quota_remaining": budget.remaining
+            })
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(selected) or 1))) as pool:
+            futures = {pool.submit(self._fetch_region, region, limit, quota): region for region in selected}
+            for future in as_completed(futures):
+                region = futures[future]
                 try:
-                    video_data.append({
-                        "video_id": video.video_id,
-                        "title": video.title,
-                        "description": video.description,
-                        "channel": video.channel,
-                        "category": video.category,
-                        "tags": video.tags,
-                        "country_code": video.country_code,
-                        "published_at": video.published_at
-                    })
+                    region_videos[region] = future.result()
+                    accounting[region] = {"status": "ok", "fetched": len(region_videos[region]),
+                                          "quota_units": quota.get(region, 0)}
                 except Exception as e:
-                    logger.warning(f"Skipping video {video.video_id}: {e}", extra={"trace_id": trace_id})
-                    errors += 1
-                    continue
-
-            stmt = insert(Video).values(video_data)
-            stmt = stmt.on_conflict_do_update(
-                index_elements=["video_id"],
-                set_={
-                    "title": stmt.excluded.title,
-                    "description": stmt.excluded.description,
-                    "channel": stmt.excluded.channel,
-                    "category": stmt.excluded.category,
-                    "tags": stmt.excluded.tags,
-                    "country_code": stmt.excluded.country_code,
-                    "published_at": stmt.excluded.published_at
-                }
-            )
-
-            result = self.db.execute(stmt)
-            self.db.commit()
+                    accounting[region] = {"status": "failed", "fetched": 0,
+                                          "quota_units": quota.get(region, 0), "error": str(e)}
+                    logger.error(f"Region {region} failed: {e}", extra={
+                        "trace_id": trace_id,
+                        "job": "collector_trending",
+                        "country": region
+                    })
+
+        failed = [region for region in regions if accounting[region]["status"] == "failed"]
+        if selected and len(failed) == len(selected):
+            raise RuntimeError(f"All regions failed: {', '.join(failed)}")
+
+        videos = merge_region_videos(region_videos, regions)
+        summary: Dict[str, Any] = {
+            "fetched": sum(a["fetched"] for a in accounting.values()),
+            "unique_videos": len(videos),
+            "upserts": 0,
+            "snapshots": 0,
+            "errors": 0,
+            "fetch_mode": self.fetch_mode,
+            "quota_units": sum(quota.values()),
+            "regions": {region: accounting[region] for region in regions},
+            "regions_failed": failed,
+            "regions_deferred": deferred,
+            "quota_budget": budget.metrics(),
+            **self._cache_metrics()
+        }
+
+        if dry_run:
+            logger.info("Dry run mode - no database changes", extra={
+                "trace_id": trace_id,
+                "would_upsert": len(videos),
+                "would_snapshot": len(videos)
+            })
+        elif videos:
+            summary.update(self._store_batch(videos, trace_id))
+
+        logger.info("Multi-region collection completed", extra={
+            "trace_id": trace_id,
+            "job": "collector_trending",
+            **summary
+        })
+
+        return summary
 
-            return len(video_data), errors
+    def _youtube_client(self) -> YouTubeClient:
+        return YouTubeClient(fetch_mode=self.fetch_mode, http_client=self.http_client,
+                             settings=self.youtube_settings)
+
+    def _cache_metrics(self) -> Dict[str, Any]:
+        """HTTP cache hit ratio and bytes saved, when the response cache is configured"""
+        cache = get_response_cache()
+        return {"http_cache": cache.metrics()} if cache else {}
+
+    def _region_activity(self, regions: List[str], trace_id: str) -> Dict[str, float]:
+        """Views gained per region over the activity window (empty on failure)"""
+        try:
+            rows = self.db.execute(text("""
+                SELECT country_code, SUM(gain) AS activity
+                FROM (
+                    SELECT v.country_code, MAX(s.view_count) - MIN(s.view_count) AS gain
+                    FROM video_metrics_snapshot s
+                    JOIN videos v ON v.video_id = s.video_id
+                    WHERE s.captured_at >= NOW() - make_interval(hours => :hours)
+                      AND v.country_code = ANY(:regions)
+                    GROUP BY v.country_code, v.video_id
+                ) per_video
+                GROUP BY country_code
+            """), {"hours": ACTIVITY_WINDOW_HOURS, "regions": regions}).fetchall()
+            return {row.country_code: float(row.activity or 0) for row in rows}
 
         except Exception as e:
             self.db.rollback()
-            logger.error(f"Failed to upsert videos: {e}", extra={"trace_id": trace_id})
-            return 0, len(videos)
+            logger.warning(f"Region activity unavailable, keeping given order: {e}", extra={"trace_id": trace_id})
+            return {}
+
+    def _fetch_region(self, country_code: str, limit: int, quota: Dict[str, int]) -> List[YouTubeVideo]:
+        """Fetch one region with its own client, recording quota spent even on failure"""
+        with self._youtube_client() as youtube:
+            try:
+                return youtube.get_trending_videos(country_code, limit)
+            finally:
+                quota[country_code] = youtube.quota_units
+
+    def _store_batch(self, videos: List[YouTubeVideo], trace_id: str) -> Dict[str, int]:
+        """Upsert videos and insert their snapshots in one transaction.
+
+        If the combined write fails, it is retried in batches of
+        FALLBACK_BATCH_SIZE videos, each inside its own savepoint, so one bad
+        batch only loses its own rows. A batch's videos and snapshots commit
+        or roll back together, so snapshots never point at missing videos.
+        """
+        captured_at = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        # Chart pages can shift between requests, so the same video may appear twice
+        videos = list({video.video_id: video for video in reversed(videos)}.values())[::-1]
 
-    def _insert_metrics_snapshots(self, videos: List[YouTubeVideo], trace_id: str) -> tuple[int, int]:
-        """Insert metrics snapshots"""
-        errors = 0
         try:
-            # Round to minute for deduplication
-            now = datetime.now(timezone.utc)
-            captured_at = now.replace(second=0, microsecond=0)
-            snapshot_data = []
-
-            for video in videos:
-                try:
-                    snapshot_data.append({
-                        "video_id": video.video_id,
-                        "captured_at": captured_at,
-                        "view_count": video.view_count,
-                        "like_count": video.like_count,
-                        "comment_count": video.comment_count
-                    })
-                except Exception as e:
-                    logger.warning(f"Skipping snapshot for {video.video_id}: {e}", extra={"trace_id": trace_id})
-                    errors += 1
-                    continue
-
-            # Use INSERT ... ON CONFLICT DO NOTHING for idempotency
-            stmt = insert(VideoMetricsSnapshot).values(snapshot_data)
-            stmt = stmt.on_conflict_do_nothing(index_elements=['video_id', 'captured_at'])
-            self.db.execute(stmt)
+            counts = self._write_batch(videos, captured_at, trace_id)
             self.db.commit()
+            return counts
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"Batch write failed, retrying in savepoint batches: {e}", extra={"trace_id": trace_id})
+
+        counts = self._empty_write_counts()
+        for start in range(0, len(videos), FALLBACK_BATCH_SIZE):
+            chunk = videos[start:start + FALLBACK_BATCH_SIZE]
+            try:
+                with self.db.begin_nested():
+                    chunk_counts = self._write_batch(chunk, captured_at, trace_id)
+                for key, value in chunk_counts.items():
+                    counts[key] += value
+            except Exception as e:
+                counts["errors"] += len(chunk)
+                counts["failed_batches"] += 1
+                logger.error(f"Failed to store batch of {len(chunk)} videos: {e}", extra={
+                    "trace_id": trace_id,
+                    "first_video_id": chunk[0].video_id
+                })
 
-            return len(snapshot_data), errors
-
+        try:
+            self.db.commit()
         except Exception as e:
             self.db.rollback()
-            logger.error(f"Failed to insert metrics snapshots: {e}", extra={"trace_id": trace_id})
-            return 0, len(videos)
+            logger.error(f"Failed to store collection batch: {e}", extra={"trace_id": trace_id})
+            raise
 
-def main():
+        return counts
+
+    def _write_batch(self, videos: List[YouTubeVideo], captured_at: datetime, trace_id: str) -> Dict[str, int]:
+        """Videos first, then snapshots, within the caller's transaction"""
+        video_data, video_errors = self._video_rows(videos, trace_id)
+        snapshot_data, snapshot_errors = self._snapshot_rows(videos, captured_at, trace_id)
+
+        counts = self._empty_write_counts()
+        if video_data:
+            result = self.db.execute(self._video_upsert(video_data))
+            counts.update(self._count_video_changes(result.fetchall(), len(video_data)))
+        counts["snapshots_inserted"] = insert_snapshots(self.db, snapshot_data)
+        update_velocity_ewma(self.db, snapshot_data)
+        # A chart snapshot counts as a poll for videos on the adaptive schedule
+        advance_poll_schedule(self.db, [row["video_id"] for row in snapshot_data], captured_at)
+        counts["upserts"] = len(video_data)
+        counts["snapshots"] = len(snapshot_data)
+        counts["errors"] = video_errors + snapshot_errors
+        return counts
+
+    def _empty_write_counts(self) -> Dict[str, int]:
+        return {
+            "upserts": 0,
+            **self._count_video_changes([], 0),
+            "snapshots": 0,
+            "snapshots_inserted": 0,
+            "errors": 0,
+            "failed_batches": 0
+        }
+
+    def _video_rows(self, videos: List[YouTubeVideo], trace_id: str) -> tuple[List[Dict[str, Any]], int]:
+        """Map videos onto `videos` table rows"""
+        errors = 0
+        video_data = []
+        for video in videos:
+            try:
+                video_data.append({
+                    "video_id": video.video_id,
+                    "title": video.title,
+                    "description": video.description,
+                    "channel": video.channel,
+                    "category": video.category,
+                    "tags": video.tags,
+                    "country_code": video.country_code,
+                    "published_at": video.published_at
+                })
+            except Exception as e:
+                logger.warning(f"Skipping video {video.video_id}: {e}", extra={"trace_id": trace_id})
+                errors += 1
+                continue
+        return video_data, errors
+
+    def _snapshot_rows(self, videos: List[YouTubeVideo], captured_at: datetime,
+                       trace_id: str) -> tuple[List[Dict[str, Any]], int]:
+        """Map videos onto `video_metrics_snapshot` rows"""
+        errors = 0
+        snapshot_data = []
+        for video in videos:
+            try:
+                snapshot_data.append({
+                    "video_id": video.video_id,
+                    "captured_at": captured_at,
+                    "view_count": video.view_count,
+                    "like_count": video.like_count,
+                    "comment_count": video.comment_count
+                })
+            except Exception as e:
+                logger.warning(f"Skipping snapshot for {video.video_id}: {e}", extra={"trace_id": trace_id})
+                errors += 1
+                continue
+        return snapshot_data, errors
+
+    def _video_upsert(self, video_data: List[Dict[str, Any]]):
+        """Upsert that skips rows whose content is unchanged.
+
+        Rows filtered out by the WHERE clause are neither rewritten nor
+        returned; RETURNING (xmax = 0) tells inserts from updates.
+        """
+        stmt = insert(Video).values(video_data)
+        columns = Video.__table__.c
+        return stmt.on_conflict_do_update(
+            index_elements=["video_id"],
+            set_={column: stmt.excluded[column] for column in VIDEO_UPDATE_COLUMNS},
+            where=or_(*(columns[column].is_distinct_from(stmt.excluded[column]) for column in VIDEO_UPDATE_COLUMNS))
+        ).returning(literal_column("(xmax = 0)").label("inserted"))
+
+    @staticmethod
+    def _count_video_changes(returned_rows: List[Any], attempted: int) -> Dict[str, int]:
+        """Split an upsert's RETURNING rows into inserted/updated/unchanged counts"""
+        inserted = sum(1 for row in returned_rows if row.inserted)
+        return {
+            "videos_inserted": inserted,
+            "videos_updated": len(returned_rows) - inserted,
+            "videos_unchanged": attempted - len(returned_rows)
+        }
+
+def main(argv: Optional[List[str]] = None):
     parser = argparse.ArgumentParser(description="Collect trending videos from YouTube")
     parser.add_argument("--country", default="KR", help="Country code (default: KR)")
-    parser.add_argument("--limit", type=int, default=50, help="Max videos to collect (default: 50)")
+    parser.add_argument("--countries",
+                        help="Comma-separated country codes collected concurrently (overrides --country)")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f"Regions fetched at once with --countries (default: {DEFAULT_MAX_WORKERS})")
+    parser.add_argument("--limit", type=int, default=50,
+                        help="Max videos per region; above 50 the chart is paged (default: 50)")
     parser.add_argument("--dry-run", action="store_true", help="Don't write to database")
+    parser.add_argument("--fetch-mode", choices=FETCH_MODES, default=DEFAULT_FETCH_MODE,
+                        help="single: chart call returns details; two_step: list ids then fetch details")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     setup_json_logging()
 
-    with TrendingCollector() as collector:
-        collector.collect_trending(args.country, args.limit, args.dry_run)
+    with TrendingCollector(args.fetch_mode) as collector:
+        if args.countries:
+            countries = [code.strip().upper() for code in args.countries.split(",") if code.strip()]
+            collector.collect_regions(countries, args.limit, args.dry_run, args.max_workers)
+        else:
+            collector.collect_trending(args.country, args.limit, args.dry_run)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+import sys
+import logging
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+from core.db import SessionLocal
+from core.logging import setup_json_logging
+from core.partitions import RAW_RETENTION_DAYS, drop_snapshot_partitions, ensure_snapshot_partitions
+from analysis.jobs.rollup_metrics import compactable_partitions
+
+logger = logging.getLogger(__name__)
+
+class PartitionMaintainer:
+    def __init__(self):
+        self.db = SessionLocal()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.db.close()
+
+    def maintain(self, days_ahead: int = 7, retention_days: int = RAW_RETENTION_DAYS,
+                 dry_run: bool = False) -> Tuple[List[str], List[str]]:
+        """Create upcoming daily snapshot partitions and drop expired ones that are rolled up"""
+        trace_id = f"maintain_partitions_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}"
+        today = datetime.now(timezone.utc).date()
+
+        try:
+            logger.info("Starting partition maintenance", extra={
+                "trace_id": trace_id,
+                "job": "maintain_partitions",
+                "days_ahead": days_ahead,
+                "retention_days": retention_days,
+                "dry_run": dry_run
+            })
+
+            # Expired days still missing from the rollups are kept for rollup_metrics
+            expired, uncovered = compactable_partitions(self.db, retention_days, today)
+            if uncovered:
+                logger.warning("Kept expired partitions that are not rolled up", extra={
+                    "trace_id": trace_id,
+                    "partitions": uncovered
+                })
+
+            if dry_run:
+                logger.info("Dry run mode - no partition changes", extra={
+                    "trace_id": trace_id,
+                    "would_drop": expired
+                })
+                return [], expired
+
+            created = ensure_snapshot_partitions(self.db, today, today + timedelta(days=days_ahead))
+            dropped = drop_snapshot_partitions(self.db, expired)
+            self.db.commit()
+
+            logger.info("Partition maintenance completed", extra={
+                "trace_id": trace_id,
+                "job": "maintain_partitions",
+                "partitions_created": created,
+                "partitions_dropped": dropped
+            })
+
+            return created, dropped
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Partition maintenance failed: {e}", extra={
+                "trace_id": trace_id,
+                "job": "maintain_partitions"
+            })
+            raise
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Maintain daily video_metrics_snapshot partitions")
+    parser.add_argument("--days-ahead", type=int, default=7, help="Future days to pre-create (default: 7)")
+    parser.add_argument("--retention-days", type=int, default=RAW_RETENTION_DAYS,
+                        help=f"Days of raw snapshots to keep once rolled up (default: {RAW_RETENTION_DAYS})")
+    parser.add_argument("--dry-run", action="store_true", help="Only report expired partitions")
+
+    args = parser.parse_args(argv)
+
+    setup_json_logging()
+
+    with PartitionMaintainer() as maintainer:
+        maintainer.maintain(args.days_ahead, args.retention_days, args.dry_run)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+import sys
+import logging
+import argparse
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+from core.db import SessionLocal
+from core.logging import setup_json_logging
+from analysis.jobs.analyzer_velocity import ANALYZER_ENGINES, VelocityAnalyzer
+from collection.polling import IDLE_INTERVAL_MINUTES, poll_interval, update_poll_schedule
+
+logger = logging.getLogger(__name__)
+
+# Must exceed the idle interval so slow videos still have two snapshots in it
+DEFAULT_WINDOW_HOURS = 6
+# Fastest videos given a schedule; the rest wait for the hourly trending pull
+DEFAULT_MAX_VIDEOS = 5_000
+
+
+class PollScheduler:
+    def __init__(self, engine: str = "sql"):
+        self.engine = engine
+        self.db = SessionLocal()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.db.close()
+
+    def schedule(self, window_hours: int = DEFAULT_WINDOW_HOURS, max_videos: int = DEFAULT_MAX_VIDEOS,
+                 dry_run: bool = False) -> Dict[str, Any]:
+        """Assign each video a poll interval from the analyzer's views per minute"""
+        trace_id = f"schedule_polls_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}"
+        now = datetime.now(timezone.utc)
+
+        try:
+            logger.info("Starting poll scheduling", extra={
+                "trace_id": trace_id,
+                "job": "schedule_polls",
+                "window_hours": window_hours,
+                "max_videos": max_videos,
+                "engine": self.engine,
+                "dry_run": dry_run
+            })
+
+            with VelocityAnalyzer(engine=self.engine) as analyzer:
+                results = analyzer.analyze_velocity(window_hours, max_videos)
+            velocities = {result["video_id"]: float(result["views_per_min"]) for result in results}
+
+            tiers = Counter(poll_interval(views_per_min) for views_per_min in velocities.values())
+            summary: Dict[str, Any] = {
+                "videos": len(velocities),
+                "intervals": {str(minutes): count for minutes, count in sorted(
+                    (minutes, count) for minutes, count in tiers.items() if minutes is not None)},
+                "untracked": tiers.get(None, 0),
+                # Video polls per hour the schedule implies (50 per quota unit)
+                "video_polls_per_hour": round(sum(60 / minutes * count for minutes, count in tiers.items()
+                                                  if minutes is not None), 1)
+            }
+
+            if dry_run:
+                logger.info("Dry run mode - no schedule changes", extra={"trace_id": trace_id, **summary})
+                return summary
+
+            summary.update(update_poll_schedule(self.db, velocities, now))
+            self.db.commit()
+
+            logger.info("Poll scheduling completed", extra={
+                "trace_id": trace_id,
+                "job": "schedule_polls",
+                **summary
+            })
+
+            return summary
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Poll scheduling failed: {e}", extra={
+                "trace_id": trace_id,
+                "job": "schedule_polls"
+            })
+            raise
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Assign adaptive poll intervals from measured velocity")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW_HOURS,
+                        help=f"Velocity window in hours, above {IDLE_INTERVAL_MINUTES // 60} "
+                             f"(default: {DEFAULT_WINDOW_HOURS})")
+    parser.add_argument("--max-videos", type=int, default=DEFAULT_MAX_VIDEOS,
+                        help=f"Fastest videos to schedule (default: {DEFAULT_MAX_VIDEOS})")
+    parser.add_argument("--engine", choices=ANALYZER_ENGINES, default="sql",
+                        help="Velocity engine (default: sql)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the interval distribution")
+
+    args = parser.parse_args(argv)
+
+    setup_json_logging()
+
+    with PollScheduler(args.engine) as scheduler:
+        scheduler.schedule(args.window, args.max_videos, args.dry_run)
+
+if __name__ == "__main__":
+    main()
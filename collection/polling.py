@@ -0,0 +1,109 @@
+"""Adaptive per-video polling schedule driven by measured velocity"""
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# (minimum views per minute, minutes between polls), fastest tier first
+POLL_TIERS = ((1_000.0, 10), (100.0, 20), (10.0, 30), (1.0, 60))
+IDLE_INTERVAL_MINUTES = 180
+# Below this a video is dropped from the schedule until it charts again
+MIN_TRACKED_VIEWS_PER_MIN = 0.1
+# Cadence the due collector runs at; no interval is shorter
+POLL_TICK_MINUTES = 10
+# Rows the analyzer has not re-assigned for this long are dropped
+STALE_SCHEDULE_HOURS = 24
+
+
+def poll_interval(views_per_min: float) -> Optional[int]:
+    """Minutes between polls for a velocity, or None when not worth tracking"""
+    if views_per_min is None or views_per_min != views_per_min or views_per_min < MIN_TRACKED_VIEWS_PER_MIN:
+        return None
+    for threshold, minutes in POLL_TIERS:
+        if views_per_min >= threshold:
+            return minutes
+    return IDLE_INTERVAL_MINUTES
+
+
+def update_poll_schedule(db: Session, velocities: Dict[str, float], now: datetime) -> Dict[str, int]:
+    """Assign intervals from fresh velocities; runs in the caller's transaction.
+
+    A video that speeds up is pulled forward to `now + interval` at the
+    latest; one that slows down keeps its next due time and picks up the
+    longer interval after that poll. Videos too slow to track and rows not
+    re-assigned for STALE_SCHEDULE_HOURS are removed.
+    """
+    tracked = {}
+    dropped = []
+    for video_id, views_per_min in velocities.items():
+        minutes = poll_interval(views_per_min)
+        if minutes is None:
+            dropped.append(video_id)
+        else:
+            tracked[video_id] = (minutes, float(views_per_min))
+
+    if tracked:
+        ids = list(tracked)
+        db.execute(text("""
+            INSERT INTO video_poll_schedule (video_id, interval_minutes, next_due_at, views_per_min, updated_at)
+            SELECT video_id, interval_minutes, CAST(:now AS timestamptz) + make_interval(mins => interval_minutes),
+                   views_per_min, :now
+            FROM UNNEST(CAST(:ids AS text[]), CAST(:intervals AS int[]), CAST(:velocities AS float8[]))
+                AS t(video_id, interval_minutes, views_per_min)
+            WHERE EXISTS (SELECT 1 FROM videos v WHERE v.video_id = t.video_id)
+            ON CONFLICT (video_id) DO UPDATE SET
+                interval_minutes = EXCLUDED.interval_minutes,
+                next_due_at = LEAST(video_poll_schedule.next_due_at, EXCLUDED.next_due_at),
+                views_per_min = EXCLUDED.views_per_min,
+                updated_at = EXCLUDED.updated_at
+        """), {
+            "now": now,
+            "ids": ids,
+            "intervals": [tracked[video_id][0] for video_id in ids],
+            "velocities": [tracked[video_id][1] for video_id in ids]
+        })
+
+    removed = 0
+    if dropped:
+        removed += db.execute(text("DELETE FROM video_poll_schedule WHERE video_id = ANY(:ids)"),
+                              {"ids": dropped}).rowcount
+    removed += db.execute(text("""
+        DELETE FROM video_poll_schedule WHERE updated_at < CAST(:now AS timestamptz) - make_interval(hours => :hours)
+    """), {"now": now, "hours": STALE_SCHEDULE_HOURS}).rowcount
+
+    return {"scheduled": len(tracked), "removed": removed}
+
+
+def due_videos(db: Session, now: datetime, limit: int) -> List[str]:
+    """Video ids due by `now`, most overdue first, fastest tier breaking ties"""
+    rows = db.execute(text("""
+        SELECT video_id FROM video_poll_schedule
+        WHERE next_due_at <= :now
+        ORDER BY next_due_at, interval_minutes, video_id
+        LIMIT :limit
+    """), {"now": now, "limit": limit}).fetchall()
+    return [row.video_id for row in rows]
+
+
+def advance_poll_schedule(db: Session, video_ids: List[str], polled_at: datetime) -> None:
+    """Set the next due time of polled videos one interval after `polled_at`"""
+    if not video_ids:
+        return
+    db.execute(text("""
+        UPDATE video_poll_schedule
+        SET next_due_at = CAST(:polled_at AS timestamptz) + make_interval(mins => interval_minutes),
+            last_polled_at = :polled_at
+        WHERE video_id = ANY(:ids)
+    """), {"polled_at": polled_at, "ids": video_ids})
+
+
+def remove_from_schedule(db: Session, video_ids: List[str]) -> int:
+    """Stop polling videos, e.g. ones the API no longer returns"""
+    if not video_ids:
+        return 0
+    return db.execute(text("DELETE FROM video_poll_schedule WHERE video_id = ANY(:ids)"),
+                      {"ids": video_ids}).rowcount
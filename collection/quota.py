@@ -0,0 +1,230 @@
+"""YouTube Data API quota budget shared by every collector worker"""
+import logging
+import math
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from pydantic_settings import BaseSettings
+
+logger = logging.getLogger(__name__)
+
+# Data API v3 list calls cost a flat amount per request whatever parts are asked for
+ENDPOINT_COSTS = {"videos": 1, "channels": 1, "playlistItems": 1, "search": 100}
+# Extra units per requested part (none for the list endpoints we call today)
+PART_COSTS: Dict[str, int] = {}
+
+
+def unit_cost(endpoint: str, part: Optional[str] = None) -> int:
+    """Quota units a single request to `endpoint` with `part` consumes"""
+    cost = ENDPOINT_COSTS.get(endpoint, 1)
+    if part:
+        cost += sum(PART_COSTS.get(p.strip(), 0) for p in part.split(","))
+    return cost
+
+
+class QuotaExhausted(Exception):
+    """Raised when a request would wait longer than allowed for budget"""
+
+
+class QuotaSettings(BaseSettings):
+    youtube_quota_per_day: int = 10_000
+    youtube_quota_burst: int = 500
+    # Longest a single request may wait for budget before giving up
+    youtube_quota_max_wait: float = 60.0
+    # Optional SQLite file shared by collector processes on this host
+    youtube_quota_store: Optional[str] = None
+
+    class Config:
+        env_file = ".env"
+        extra = "ignore"
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate` units per second.
+
+    `reserve` deducts tokens up front (the balance may go negative) and
+    returns how long the caller must wait, so sync callers can sleep and
+    async callers can await without holding a lock.
+    """
+
+    def __init__(self, capacity: float, rate: float, max_wait: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.rate = rate
+        self.max_wait = max_wait
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = capacity
+        self._updated = clock()
+
+        self.granted_units = 0
+        self.throttled_requests = 0
+        self.throttled_seconds = 0.0
+        self.rejected_requests = 0
+
+    def reserve(self, units: float) -> float:
+        """Take `units` and return the seconds to wait before using them"""
+        with self._lock:
+            tokens, now = self._load()
+            wait = max(0.0, (units - tokens) / self.rate)
+            if wait > self.max_wait:
+                self.rejected_requests += 1
+                raise QuotaExhausted(f"Need {units} units, waiting {wait:.1f}s exceeds {self.max_wait:.1f}s")
+
+            self._store(tokens - units, now)
+            self.granted_units += units
+            if wait > 0:
+                self.throttled_requests += 1
+                self.throttled_seconds += wait
+            return wait
+
+    def acquire(self, units: float) -> float:
+        """Blocking reserve; returns the seconds slept"""
+        wait = self.reserve(units)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. after the API answered 429"""
+        with self._lock:
+            tokens, now = self._load()
+            self._store(min(tokens, 0.0), now)
+
+    @property
+    def remaining(self) -> float:
+        with self._lock:
+            return self._load()[0]
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "remaining": round(self.remaining, 2),
+            "capacity": self.capacity,
+            "granted_units": self.granted_units,
+            "throttled_requests": self.throttled_requests,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+            "rejected_requests": self.rejected_requests,
+        }
+
+    def _load(self) -> Tuple[float, float]:
+        now = self._clock()
+        return min(self.capacity, self._tokens + (now - self._updated) * self.rate), now
+
+    def _store(self, tokens: float, now: float) -> None:
+        self._tokens = tokens
+        self._updated = now
+
+
+class SqliteTokenBucket(TokenBucket):
+    """Token bucket whose balance lives in a SQLite file shared across processes.
+
+    Every update runs in a `BEGIN IMMEDIATE` transaction, so concurrent
+    collector processes serialize on the database write lock. Wall-clock
+    time is used because monotonic clocks are not comparable across
+    processes.
+    """
+
+    def __init__(self, path: str, capacity: float, rate: float, max_wait: float = 60.0,
+                 name: str = "youtube", clock: Callable[[], float] = time.time):
+        self.path = path
+        self.name = name
+        super().__init__(capacity, rate, max_wait, clock)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS token_bucket (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("INSERT OR IGNORE INTO token_bucket (name, tokens, updated_at) VALUES (?, ?, ?)",
+                         (name, capacity, clock()))
+
+    def reserve(self, units: float) -> float:
+        # The in-process lock keeps threads from queuing on SQLite's busy timeout
+        with self._lock, self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            tokens, now = self._load(conn)
+            wait = max(0.0, (units - tokens) / self.rate)
+            if wait > self.max_wait:
+                self.rejected_requests += 1
+                raise QuotaExhausted(f"Need {units} units, waiting {wait:.1f}s exceeds {self.max_wait:.1f}s")
+
+            self._store(conn, tokens - units, now)
+            self.granted_units += units
+            if wait > 0:
+                self.throttled_requests += 1
+                self.throttled_seconds += wait
+            return wait
+
+    def drain(self) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            tokens, now = self._load(conn)
+            self._store(conn, min(tokens, 0.0), now)
+
+    @property
+    def remaining(self) -> float:
+        with self._lock, self._connect() as conn:
+            return self._load(conn)[0]
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # isolation_level=None leaves transaction control to the explicit BEGIN
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _load(self, conn: sqlite3.Connection) -> Tuple[float, float]:
+        tokens, updated = conn.execute("SELECT tokens, updated_at FROM token_bucket WHERE name = ?",
+                                       (self.name,)).fetchone()
+        now = self._clock()
+        return min(self.capacity, tokens + max(0.0, now - updated) * self.rate), now
+
+    def _store(self, conn: sqlite3.Connection, tokens: float, now: float) -> None:
+        conn.execute("UPDATE token_bucket SET tokens = ?, updated_at = ? WHERE name = ?",
+                     (tokens, now, self.name))
+
+
+_budget: Optional[TokenBucket] = None
+_budget_lock = threading.Lock()
+
+
+def get_quota_budget() -> TokenBucket:
+    """Process-wide budget built from QuotaSettings on first use"""
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            settings = QuotaSettings()
+            rate = settings.youtube_quota_per_day / 86_400
+            if settings.youtube_quota_store:
+                _budget = SqliteTokenBucket(settings.youtube_quota_store, settings.youtube_quota_burst,
+                                            rate, settings.youtube_quota_max_wait)
+            else:
+                _budget = TokenBucket(settings.youtube_quota_burst, rate, settings.youtube_quota_max_wait)
+        return _budget
+
+
+def estimate_region_cost(limit: int, fetch_mode: str) -> int:
+    """Units one region's trending fetch needs (one call per 50-video page, two in two-step mode)"""
+    pages = max(1, math.ceil(limit / 50))
+    return pages * unit_cost("videos") * (2 if fetch_mode == "two_step" else 1)
+
+
+def prioritize_regions(regions: List[str], activity: Dict[str, float], available: float,
+                       cost_per_region: float) -> Tuple[List[str], List[str]]:
+    """Order regions by recent activity and split off those the budget cannot cover.
+
+    Returns (selected, deferred); selected keeps descending activity order
+    with ties in the caller's order.
+    """
+    ranked = sorted(regions, key=lambda region: -activity.get(region, 0.0))
+    affordable = max(0, int(available // cost_per_region)) if cost_per_region > 0 else len(ranked)
+    return ranked[:affordable], ranked[affordable:]
@@ -1,5 +1,16 @@
 """Core database models"""
 from .videos import Video
 from .video_metrics_snapshot import VideoMetricsSnapshot
+from .velocity_state import VideoVelocityState, VideoVelocityBucket, VideoVelocityEwma, AnalyzerWatermark
+from .metrics_rollup import VideoMetricsHourly, VideoMetricsDaily
+from .backfill_checkpoint import BackfillCheckpoint
+from .poll_schedule import VideoPollSchedule
+from .leaderboard import TrendingLeaderboard, TrendingLeaderboardCurrent
 
-__all__ = ["Video", "VideoMetricsSnapshot"]
\ No newline at end of file
+__all__ = [
+    "Video", "VideoMetricsSnapshot",
+    "VideoVelocityState", "VideoVelocityBucket", "VideoVelocityEwma", "AnalyzerWatermark",
+    "VideoMetricsHourly", "VideoMetricsDaily",
+    "BackfillCheckpoint", "VideoPollSchedule",
+    "TrendingLeaderboard", "TrendingLeaderboardCurrent",
+]
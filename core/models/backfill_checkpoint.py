@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, BIGINT, TIMESTAMP
+from sqlalchemy.sql import func
+from core.db import Base
+
+class BackfillCheckpoint(Base):
+    """Per-file progress of the historical snapshot backfill"""
+    __tablename__ = "backfill_checkpoint"
+
+    source = Column(String, primary_key=True, comment="Absolute path of the dump file")
+    file_size = Column(BIGINT, nullable=False, comment="File size when the checkpoint was written")
+    rows_done = Column(BIGINT, nullable=False, default=0, comment="Rows read and committed so far")
+    completed_at = Column(TIMESTAMP(timezone=True), comment="Time the whole file was loaded (UTC)")
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now(),
+                        comment="Last checkpoint update time (UTC)")
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, Text, BIGINT, INTEGER, TIMESTAMP, Float, Sequence
+from core.db import Base
+
+# Generations are numbered from one sequence across all leaderboards
+leaderboard_generation_seq = Sequence("trending_leaderboard_generation_seq", metadata=Base.metadata)
+
+class TrendingLeaderboard(Base):
+    """Ranked entries of one published leaderboard generation.
+
+    No foreign key to videos: a generation is a point-in-time ranking and
+    must not block deleting a video.
+    """
+    __tablename__ = "trending_leaderboard"
+
+    generation = Column(BIGINT, primary_key=True, comment="Leaderboard generation the entry belongs to")
+    rank = Column(INTEGER, primary_key=True, comment="1-based rank within the generation")
+    video_id = Column(String, nullable=False, comment="Ranked video")
+    score = Column(Float, nullable=False, comment="Value the ranking is ordered by")
+    views_per_min = Column(Float, comment="Peak views per minute over the window")
+    computed_at = Column(TIMESTAMP(timezone=True), nullable=False, comment="Analysis time (UTC)")
+
+class TrendingLeaderboardCurrent(Base):
+    """Generation readers see for each region, window and ranking score"""
+    __tablename__ = "trending_leaderboard_current"
+
+    region = Column(Text, primary_key=True, comment="Country code, or ALL for every region")
+    window_hours = Column(INTEGER, primary_key=True, comment="Analysis window in hours")
+    ranked_by = Column(Text, primary_key=True, comment="Score the ranking is ordered by")
+    generation = Column(BIGINT, nullable=False, comment="Published generation")
+    entries = Column(INTEGER, nullable=False, comment="Entries in the published generation")
+    computed_at = Column(TIMESTAMP(timezone=True), nullable=False, comment="Analysis time (UTC)")
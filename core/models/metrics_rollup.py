@@ -0,0 +1,41 @@
+from sqlalchemy import Column, String, BIGINT, INTEGER, TIMESTAMP, ForeignKey, Index
+from sqlalchemy.orm import declared_attr
+from core.db import Base
+
+class _MetricsRollupColumns:
+    """Per-video min/max/last counters for one time bucket"""
+
+    @declared_attr
+    def video_id(cls):
+        return Column(String, ForeignKey("videos.video_id"), primary_key=True,
+                      comment="Reference to video")
+
+    bucket_start = Column(TIMESTAMP(timezone=True), primary_key=True, comment="Bucket start time (UTC)")
+    snapshots = Column(INTEGER, nullable=False, comment="Raw snapshots rolled into the bucket")
+    last_captured_at = Column(TIMESTAMP(timezone=True), nullable=False,
+                              comment="Capture time of the last snapshot in the bucket (UTC)")
+    view_min = Column(BIGINT, comment="Minimum view count in the bucket")
+    view_max = Column(BIGINT, comment="Maximum view count in the bucket")
+    view_last = Column(BIGINT, comment="Last view count in the bucket")
+    like_min = Column(BIGINT, comment="Minimum like count in the bucket")
+    like_max = Column(BIGINT, comment="Maximum like count in the bucket")
+    like_last = Column(BIGINT, comment="Last like count in the bucket")
+    comment_min = Column(BIGINT, comment="Minimum comment count in the bucket")
+    comment_max = Column(BIGINT, comment="Maximum comment count in the bucket")
+    comment_last = Column(BIGINT, comment="Last comment count in the bucket")
+
+class VideoMetricsHourly(_MetricsRollupColumns, Base):
+    """Hourly rollup of video_metrics_snapshot"""
+    __tablename__ = "video_metrics_hourly"
+
+    __table_args__ = (
+        Index('idx_video_metrics_hourly_bucket', 'bucket_start'),
+    )
+
+class VideoMetricsDaily(_MetricsRollupColumns, Base):
+    """Daily rollup of video_metrics_hourly"""
+    __tablename__ = "video_metrics_daily"
+
+    __table_args__ = (
+        Index('idx_video_metrics_daily_bucket', 'bucket_start'),
+    )
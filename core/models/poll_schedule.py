@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, INTEGER, TIMESTAMP, Float, ForeignKey, Index
+from sqlalchemy.sql import func
+from core.db import Base
+
+class VideoPollSchedule(Base):
+    """Per-video statistics polling interval derived from recent velocity"""
+    __tablename__ = "video_poll_schedule"
+
+    video_id = Column(String, ForeignKey("videos.video_id"), primary_key=True,
+                      comment="Reference to video")
+    interval_minutes = Column(INTEGER, nullable=False, comment="Minutes between statistics polls")
+    next_due_at = Column(TIMESTAMP(timezone=True), nullable=False, comment="Next poll due time (UTC)")
+    views_per_min = Column(Float, comment="Velocity the interval was derived from")
+    last_polled_at = Column(TIMESTAMP(timezone=True), comment="Last statistics poll time (UTC)")
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now(),
+                        comment="Last interval assignment time (UTC)")
+
+    __table_args__ = (
+        Index('idx_video_poll_schedule_due', 'next_due_at'),
+    )
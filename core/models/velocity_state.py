@@ -0,0 +1,63 @@
+from sqlalchemy import Column, String, BIGINT, INTEGER, TIMESTAMP, Float, ForeignKey, Index, text
+from sqlalchemy.sql import func
+from core.db import Base
+
+class VideoVelocityState(Base):
+    """Last processed snapshot per video for incremental velocity analysis"""
+    __tablename__ = "video_velocity_state"
+
+    video_id = Column(String, ForeignKey("videos.video_id"), primary_key=True,
+                      comment="Reference to video")
+    last_captured_at = Column(TIMESTAMP(timezone=True), nullable=False,
+                              comment="Capture time of last processed snapshot (UTC)")
+    last_view_count = Column(BIGINT, comment="View count of last processed snapshot")
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now(),
+                        comment="Last state update time (UTC)")
+
+class VideoVelocityBucket(Base):
+    """Per-video velocity aggregates for one time bucket"""
+    __tablename__ = "video_velocity_bucket"
+
+    video_id = Column(String, ForeignKey("videos.video_id"), primary_key=True,
+                      comment="Reference to video")
+    bucket_start = Column(TIMESTAMP(timezone=True), primary_key=True,
+                          comment="Bucket start time (UTC)")
+    snapshots = Column(INTEGER, nullable=False, default=0,
+                       comment="Snapshots captured within the bucket")
+    valid_intervals = Column(INTEGER, nullable=False, default=0,
+                             comment="Valid intervals starting within the bucket")
+    max_views_per_min = Column(Float, comment="Max velocity of intervals starting within the bucket")
+
+    __table_args__ = (
+        Index('idx_video_velocity_bucket_start', 'bucket_start'),
+    )
+
+class AnalyzerWatermark(Base):
+    """Processing watermark per analyzer"""
+    __tablename__ = "analyzer_watermark"
+
+    name = Column(String, primary_key=True, comment="Analyzer name")
+    watermark = Column(TIMESTAMP(timezone=True), nullable=False,
+                       comment="Latest snapshot capture time processed (UTC)")
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now(),
+                        comment="Last watermark update time (UTC)")
+
+class VideoVelocityEwma(Base):
+    """Online exponentially weighted velocity estimate per video, updated on every snapshot write"""
+    __tablename__ = "video_velocity_ewma"
+
+    video_id = Column(String, ForeignKey("videos.video_id"), primary_key=True,
+                      comment="Reference to video")
+    last_captured_at = Column(TIMESTAMP(timezone=True), nullable=False,
+                              comment="Capture time of the latest snapshot folded in (UTC)")
+    last_view_count = Column(BIGINT, comment="View count of the latest snapshot folded in")
+    views_per_min = Column(Float, comment="EWMA of interval views per minute (NULL until two snapshots)")
+    variance = Column(Float, comment="Exponentially weighted variance of interval views per minute")
+    samples = Column(INTEGER, nullable=False, default=0, comment="Intervals folded into the estimate")
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now(),
+                        comment="Last estimate update time (UTC)")
+
+    __table_args__ = (
+        # Top-N reads walk this backwards and stop after N rows
+        Index('idx_video_velocity_ewma_rate', 'views_per_min', postgresql_where=text('views_per_min IS NOT NULL')),
+    )
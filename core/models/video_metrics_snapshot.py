@@ -4,13 +4,16 @@ from sqlalchemy.orm import relationship
 from core.db import Base
 
 class VideoMetricsSnapshot(Base):
-    """Video metrics snapshot table for time-series analysis"""
+    """Video metrics snapshot table for time-series analysis.
+
+    Range-partitioned by day on captured_at (see core.partitions).
+    """
     __tablename__ = "video_metrics_snapshot"
 
     id = Column(BIGINT, primary_key=True, autoincrement=True)
     video_id = Column(String, ForeignKey("videos.video_id"), nullable=False,
                      comment="Reference to video")
-    captured_at = Column(TIMESTAMP(timezone=True), nullable=False,
+    captured_at = Column(TIMESTAMP(timezone=True), primary_key=True, nullable=False,
                         default=func.now(), comment="Snapshot capture time (UTC)")
     view_count = Column(BIGINT, comment="View count at capture time")
     like_count = Column(BIGINT, comment="Like count at capture time")
@@ -19,5 +22,6 @@ class VideoMetricsSnapshot(Base):
     video = relationship("Video", back_populates="metrics_snapshots")
 
     __table_args__ = (
-        Index('idx_video_metrics_video_captured', 'video_id', 'captured_at'),
+        Index('idx_video_metrics_video_captured_unique', 'video_id', 'captured_at', unique=True),
+        {"postgresql_partition_by": "RANGE (captured_at)"},
     )
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""Daily range partitions for video_metrics_snapshot"""
+import logging
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Union
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_TABLE = "video_metrics_snapshot"
+# Days of raw snapshots kept; older partitions are dropped once rolled up
+RAW_RETENTION_DAYS = 30
+PARTITION_PATTERN = re.compile(rf"^{SNAPSHOT_TABLE}_p(\d{{8}})$")
+
+
+def partition_name(day: date) -> str:
+    """Partition table name for a UTC day"""
+    return f"{SNAPSHOT_TABLE}_p{day.strftime('%Y%m%d')}"
+
+
+def partition_day(name: str) -> Optional[date]:
+    """UTC day covered by a partition, or None for foreign tables"""
+    match = PARTITION_PATTERN.match(name)
+    if not match:
+        return None
+    return datetime.strptime(match.group(1), "%Y%m%d").date()
+
+
+def expired_partitions(names: List[str], retention_days: int, today: Optional[date] = None) -> List[str]:
+    """Partitions whose whole day lies before the retention horizon"""
+    today = today or datetime.now(timezone.utc).date()
+    horizon = today - timedelta(days=retention_days)
+    expired = []
+    for name in names:
+        day = partition_day(name)
+        if day is not None and day < horizon:
+            expired.append(name)
+    return sorted(expired)
+
+
+def list_snapshot_partitions(db: Union[Session, Connection]) -> List[str]:
+    """Names of partitions currently attached to the snapshot table"""
+    rows = db.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+        JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+        WHERE parent.relname = :table
+        ORDER BY child.relname
+    """), {"table": SNAPSHOT_TABLE}).fetchall()
+    return [row.relname for row in rows]
+
+
+def ensure_snapshot_partitions(db: Union[Session, Connection], start: date, end: date) -> List[str]:
+    """Create missing daily partitions for [start, end]; returns names created"""
+    existing = set(list_snapshot_partitions(db))
+    created = []
+
+    day = start
+    while day <= end:
+        name = partition_name(day)
+        if name not in existing:
+            db.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS {name}
+                PARTITION OF {SNAPSHOT_TABLE}
+                FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')
+            """))
+            created.append(name)
+        day += timedelta(days=1)
+
+    return created
+
+
+def drop_snapshot_partitions(db: Union[Session, Connection], names: List[str]) -> List[str]:
+    """Detach and drop the given partitions; returns names dropped"""
+    for name in names:
+        db.execute(text(f"ALTER TABLE {SNAPSHOT_TABLE} DETACH PARTITION {name}"))
+        db.execute(text(f"DROP TABLE {name}"))
+    return list(names)
+
+
+def drop_expired_snapshot_partitions(db: Union[Session, Connection], retention_days: int,
+                                     today: Optional[date] = None) -> List[str]:
+    """Detach and drop partitions older than the retention horizon; returns names dropped"""
+    return drop_snapshot_partitions(db, expired_partitions(list_snapshot_partitions(db), retention_days, today))
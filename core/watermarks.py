@@ -0,0 +1,47 @@
+"""Named processing watermarks stored in analyzer_watermark"""
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from core.models import AnalyzerWatermark
+
+# Placeholder stored until a job processes its first batch
+_UNSET = datetime.fromtimestamp(0, timezone.utc)
+# How far before its watermark a job re-reads, for snapshots committed after a
+# later one was processed (concurrent collectors, long collector transactions)
+LATE_ARRIVAL_MINUTES = 30
+
+
+def lock_watermark(db: Session, name: str) -> Optional[datetime]:
+    """Read a watermark, locking its row until the transaction ends"""
+    db.execute(
+        insert(AnalyzerWatermark)
+        .values(name=name, watermark=_UNSET)
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
+    watermark = db.execute(text("""
+        SELECT watermark FROM analyzer_watermark WHERE name = :name FOR UPDATE
+    """), {"name": name}).scalar_one()
+
+    return None if watermark == _UNSET else watermark
+
+
+def get_watermark(db: Session, name: str) -> Optional[datetime]:
+    """Read a watermark without locking"""
+    watermark = db.execute(text("""
+        SELECT watermark FROM analyzer_watermark WHERE name = :name
+    """), {"name": name}).scalar()
+
+    return None if watermark is None or watermark == _UNSET else watermark
+
+
+def set_watermark(db: Session, name: str, watermark: datetime) -> None:
+    """Advance a watermark previously locked with lock_watermark()"""
+    db.execute(text("""
+        UPDATE analyzer_watermark
+        SET watermark = :watermark, updated_at = NOW()
+        WHERE name = :name
+    """), {"name": name, "watermark": watermark})
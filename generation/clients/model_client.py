@@ -15,9 +15,14 @@ class IdeaModelClient(ABC):
 class StubModelClient(IdeaModelClient):
     """Stub implementation for testing without real API calls"""
 
+    def __init__(self, latency: float = 0.1):
+        # Seconds each call sleeps to simulate the model API
+        self.latency = latency
+
     def generate_ideas(self, request: IdeaRequest, trace_id: str) -> IdeaResponse:
         """Generate stub ideas for testing"""
-        time.sleep(0.1)  # Simulate API call
+        if self.latency > 0:
+            time.sleep(self.latency)  # Simulate API call
 
         # Generate guardrail-compliant content
         keyword = request.keywords[0] if request.keywords else "트렌드"
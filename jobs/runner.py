@@ -1,50 +1,237 @@
-# APScheduler Orchestrator (skeleton)
+# APScheduler Orchestrator
 from __future__ import annotations
+import sys
+import time
 import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from apscheduler.events import (
+    EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED, JobEvent
+)
+from apscheduler.executors.pool import ProcessPoolExecutor, ThreadPoolExecutor
+from apscheduler.schedulers.base import BaseScheduler
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
+from pydantic_settings import BaseSettings
+from sqlalchemy import text
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+from core.logging import setup_json_logging
 
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger("runner")
 
-def safe(fn):
-    def _wrap():
-        try:
-            fn()
-        except Exception:
-            log.exception("Job failed: %%s", getattr(fn, "__name__", "unknown"))
-    return _wrap
+# First key of the two-key advisory locks taken per job ("jobs")
+JOB_LOCK_NAMESPACE = 0x6A6F6273
+EXECUTOR_KINDS = ("thread", "process")
+
+
+class RunnerSettings(BaseSettings):
+    runner_executor: str = "thread"
+    runner_max_workers: int = 4
+    # Concurrent runs of the same job in this process; a tick that finds
+    # the previous run still going is skipped
+    runner_max_instances: int = 1
+    # Run a backlog of missed ticks once instead of once per tick
+    runner_coalesce: bool = True
+    # How late a tick may still start, e.g. after a busy pool or a restart
+    runner_misfire_grace_seconds: int = 300
+    # Postgres advisory lock per job so runner replicas never double-run
+    runner_job_lock: bool = True
+
+    class Config:
+        env_file = ".env"
+        extra = "ignore"
+
+
+class JobMetrics:
+    """Thread-safe per-job run counts, durations and queueing delays"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, job: str, status: str, duration: Optional[float] = None,
+               queue_delay: Optional[float] = None) -> None:
+        with self._lock:
+            stats = self._jobs.setdefault(job, {
+                "runs": 0, "statuses": {}, "total_seconds": 0.0, "max_seconds": 0.0,
+                "last_seconds": None, "max_queue_delay_seconds": 0.0, "last_queue_delay_seconds": None
+            })
+            stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+            if duration is not None:
+                stats["runs"] += 1
+                stats["total_seconds"] += duration
+                stats["max_seconds"] = max(stats["max_seconds"], duration)
+                stats["last_seconds"] = duration
+            if queue_delay is not None:
+                stats["max_queue_delay_seconds"] = max(stats["max_queue_delay_seconds"], queue_delay)
+                stats["last_queue_delay_seconds"] = queue_delay
 
-# Optional imports; keep tolerant if files are not ready
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                job: {**stats, "statuses": dict(stats["statuses"]),
+                      "avg_seconds": stats["total_seconds"] / stats["runs"] if stats["runs"] else None}
+                for job, stats in self._jobs.items()
+            }
+
+
+job_metrics = JobMetrics()
+
+
+SCHEDULE = (
+    # daily partition roll-forward and expiry
+    ("maintain_partitions", CronTrigger(hour="0", minute="5")),
+    # every 60 minutes at minute 0
+    ("collect_trending", CronTrigger(minute="0")),
+    # every 10 minutes from minute 5, clear of the trending pull at minute 0:
+    # poll videos whose adaptive interval has elapsed (or the hottest ones,
+    # see WorkerSettings.worker_incremental_mode)
+    ("collect_incremental", CronTrigger(minute="5-55/10")),
+    # at minute 45
+    ("analyze_velocity", CronTrigger(minute="45")),
+    # poll intervals from fresh velocity at minute 47
+    ("schedule_polls", CronTrigger(minute="47")),
+    # hourly/daily rollups at minute 50
+    ("rollup_metrics", CronTrigger(minute="50")),
+)
+
+# Optional imports; keep tolerant if job modules are not installed
 def _nop():
     log.info("NOP job — replace with real job when ready.")
 
 try:
-    from collection.jobs.collector_trending import main as collect_trending
-except Exception:
-    collect_trending = _nop
+    from jobs.worker import WORKER_JOBS, get_worker
 
-try:
-    from collection.jobs.collector_incremental import main as collect_incremental
-except Exception:
-    collect_incremental = _nop
+    def _worker_job(job: str) -> Callable[[], None]:
+        # Ticks run on this process's long-lived worker instead of each job's main()
+        def _run():
+            get_worker().run(job)
+        _run.__name__ = job
+        return _run
+
+    # Registered jobs by id; executors get the id so process pools can pickle it
+    JOBS: Dict[str, Callable[[], None]] = {job: _worker_job(job) for job in WORKER_JOBS}
+except ImportError:
+    log.exception("Job modules failed to import; scheduled jobs will do nothing")
+    JOBS = {job: _nop for job, _ in SCHEDULE}
+
+
+@contextmanager
+def job_lock(job: str, enabled: bool = True) -> Iterator[bool]:
+    """Hold a session advisory lock for `job`; yields False when another runner holds it"""
+    if not enabled:
+        yield True
+        return
+
+    from core.db import engine
+
+    # Autocommit so the held connection is not left idle in a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        params = {"namespace": JOB_LOCK_NAMESPACE, "job": job}
+        acquired = conn.execute(text("SELECT pg_try_advisory_lock(:namespace, hashtext(:job))"), params).scalar()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                conn.execute(text("SELECT pg_advisory_unlock(:namespace, hashtext(:job))"), params)
+
+
+def run_job(job: str, lock: bool = True) -> Dict[str, Any]:
+    """Executor entry point: run a registered job under its lock and report timings.
+
+    Failures are logged, not raised, so one bad tick never stops the scheduler.
+    """
+    started_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        with job_lock(job, lock) as acquired:
+            if acquired:
+                JOBS[job]()
+            else:
+                status = "locked"
+                log.info("Job %s skipped - running on another runner", job)
+    except Exception:
+        status = "failed"
+        log.exception("Job failed: %s", job)
+    return {"status": status, "started_at": started_at, "duration": time.perf_counter() - start}
+
+
+def _init_process_worker():
+    # Forked workers must not reuse the parent's pooled DB connections
+    try:
+        from core.db import engine
+        engine.dispose(close=False)
+    except Exception:
+        pass
+
+
+def _on_job_event(event: JobEvent) -> None:
+    if event.code == EVENT_JOB_EXECUTED:
+        result = event.retval
+        queue_delay = (result["started_at"] - event.scheduled_run_time).total_seconds()
+        job_metrics.record(event.job_id, result["status"], result["duration"], queue_delay)
+        log.info("Job %s finished", event.job_id, extra={
+            "job": event.job_id,
+            "status": result["status"],
+            "duration_seconds": round(result["duration"], 3),
+            "queue_delay_seconds": round(queue_delay, 3)
+        })
+    elif event.code == EVENT_JOB_ERROR:
+        # run_job never raises; this is the executor failing to run it at all
+        job_metrics.record(event.job_id, "failed")
+        log.error("Job %s could not run: %s", event.job_id, event.exception)
+    elif event.code == EVENT_JOB_MAX_INSTANCES:
+        job_metrics.record(event.job_id, "overlapped")
+        log.warning("Job %s skipped - previous run still going", event.job_id)
+    elif event.code == EVENT_JOB_MISSED:
+        job_metrics.record(event.job_id, "missed")
+        log.warning("Job %s missed its %s run", event.job_id, event.scheduled_run_time)
+
+
+def build_scheduler(settings: Optional[RunnerSettings] = None,
+                    scheduler_class: type = BlockingScheduler) -> BaseScheduler:
+    """Scheduler with every job on the configured pool and overlap protection"""
+    settings = settings or RunnerSettings()
+    if settings.runner_executor not in EXECUTOR_KINDS:
+        raise ValueError(f"runner_executor must be one of {EXECUTOR_KINDS}, got {settings.runner_executor!r}")
+
+    if settings.runner_executor == "process":
+        executor = ProcessPoolExecutor(settings.runner_max_workers, {"initializer": _init_process_worker})
+    else:
+        executor = ThreadPoolExecutor(settings.runner_max_workers)
+
+    sched = scheduler_class(
+        timezone="UTC",
+        executors={"default": executor},
+        job_defaults={
+            "max_instances": settings.runner_max_instances,
+            "coalesce": settings.runner_coalesce,
+            "misfire_grace_time": settings.runner_misfire_grace_seconds,
+        },
+    )
+    for job, trigger in SCHEDULE:
+        sched.add_job(run_job, trigger, args=[job, settings.runner_job_lock], id=job, name=job)
+    sched.add_listener(_on_job_event,
+                       EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED)
+    return sched
 
-try:
-    from analysis.jobs.analyzer_velocity import main as analyze_velocity
-except Exception:
-    analyze_velocity = _nop
 
 if __name__ == "__main__":
-    sched = BlockingScheduler(timezone="UTC")
-    # every 60 minutes at minute 0
-    sched.add_job(safe(collect_trending), CronTrigger(minute="0"))
-    # at minute 30
-    sched.add_job(safe(collect_incremental), CronTrigger(minute="30"))
-    # at minute 45
-    sched.add_job(safe(analyze_velocity), CronTrigger(minute="45"))
-    log.info("Scheduler starting (UTC)...")
+    setup_json_logging()
+    settings = RunnerSettings()
+    # snapshot inserts need today's partition before the first collection
+    run_job("maintain_partitions", settings.runner_job_lock)
+    sched = build_scheduler(settings)
+    log.info("Scheduler starting (UTC, %s pool of %d)...", settings.runner_executor, settings.runner_max_workers)
     try:
         sched.start()
     except (KeyboardInterrupt, SystemExit):
-        log.info("Scheduler stopped.")
-
+        log.info("Scheduler stopped.", extra={"job_metrics": job_metrics.metrics()})
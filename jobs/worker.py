@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""Long-lived job worker.
+
+Scheduled jobs used to go through each module's main(), which re-parses
+argv, re-initializes logging and builds new job objects and a new HTTP
+client (new TLS handshakes) on every tick. A JobWorker builds the job
+objects once and keeps one keep-alive HTTP client and parsed settings for
+the life of the process; every tick calls the job's method directly. The
+database engine's pool is process-wide already, and each job's session is
+closed after its tick so no connection stays checked out between ticks.
+The YouTube client and collectors are built on the first collector tick, so
+the other jobs run without YouTube settings.
+"""
+import os
+import sys
+import logging
+import argparse
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from pydantic_settings import BaseSettings
+from sqlalchemy.orm import Session
+
+# Add project root to path
+sys.path.insert(0, ".")
+
+from core.logging import setup_json_logging
+from core.partitions import RAW_RETENTION_DAYS
+from collection.clients.youtube import YouTubeSettings, new_http_client
+from collection.jobs.collector_incremental import COLLECT_MODES, IncrementalCollector
+from collection.jobs.collector_trending import TrendingCollector
+from collection.jobs.maintain_partitions import PartitionMaintainer
+from collection.jobs.schedule_polls import PollScheduler
+from analysis.jobs.analyzer_velocity import LEADERBOARD_SIZE, VelocityAnalyzer
+from analysis.jobs.rollup_metrics import MetricsRollup
+
+logger = logging.getLogger(__name__)
+
+WORKER_JOBS = ("maintain_partitions", "collect_trending", "collect_incremental",
+               "analyze_velocity", "schedule_polls", "rollup_metrics")
+
+
+class WorkerSettings(BaseSettings):
+    # What collect_incremental ticks poll: "due" follows the adaptive poll
+    # schedule, "hot" refreshes the fastest recent movers
+    worker_incremental_mode: str = "due"
+    # Days of raw snapshots kept; partition maintenance and compaction both
+    # drop older days, and only once they are rolled up
+    worker_raw_retention_days: int = RAW_RETENTION_DAYS
+
+    class Config:
+        env_file = ".env"
+        extra = "ignore"
+
+
+class JobWorker:
+    """Job objects, HTTP client and settings shared by every tick in this process.
+
+    Ticks of the same job must not overlap (the runner allows one instance
+    per job); different jobs may run on different threads at once.
+    """
+
+    def __init__(self, settings: Optional[WorkerSettings] = None):
+        self.settings = settings or WorkerSettings()
+        if self.settings.worker_incremental_mode not in COLLECT_MODES:
+            raise ValueError(f"worker_incremental_mode must be one of {COLLECT_MODES}, "
+                             f"got {self.settings.worker_incremental_mode!r}")
+        self._youtube_lock = threading.Lock()
+        self._http_client: Optional[httpx.Client] = None
+        self._youtube_settings: Optional[YouTubeSettings] = None
+        self._trending: Optional[TrendingCollector] = None
+        self._incremental: Optional[IncrementalCollector] = None
+        # Hourly ticks only fold new snapshots into persisted velocity state
+        self.analyzer = VelocityAnalyzer(engine="incremental")
+        self.poll_scheduler = PollScheduler()
+        self.partitions = PartitionMaintainer()
+        self.rollup = MetricsRollup()
+        self._jobs: Dict[str, Callable[[], Any]] = {
+            "maintain_partitions": self._maintain_partitions,
+            "collect_trending": self._collect_trending,
+            "collect_incremental": self._collect_incremental,
+            "analyze_velocity": self._analyze_and_publish,
+            "schedule_polls": self.poll_scheduler.schedule,
+            "rollup_metrics": self._rollup_and_compact,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def run(self, job: str) -> Any:
+        """Run one tick of `job` with its scheduled defaults"""
+        if job not in self._jobs:
+            raise ValueError(f"Unknown job: {job}")
+        try:
+            return self._jobs[job]()
+        finally:
+            # Return the connection to the pool; the session is reused next tick
+            session = self._sessions().get(job)
+            if session is not None:
+                session.close()
+
+    def close(self) -> None:
+        for session in self._sessions().values():
+            session.close()
+        if self._http_client is not None:
+            self._http_client.close()
+
+    @property
+    def http_client(self) -> httpx.Client:
+        with self._youtube_lock:
+            return self._youtube()["http_client"]
+
+    @property
+    def trending(self) -> TrendingCollector:
+        with self._youtube_lock:
+            if self._trending is None:
+                self._trending = TrendingCollector(**self._youtube())
+            return self._trending
+
+    @property
+    def incremental(self) -> IncrementalCollector:
+        with self._youtube_lock:
+            if self._incremental is None:
+                self._incremental = IncrementalCollector(**self._youtube())
+            return self._incremental
+
+    def _youtube(self) -> Dict[str, Any]:
+        # Caller holds _youtube_lock; settings first so a missing key builds no client
+        if self._http_client is None:
+            self._youtube_settings = YouTubeSettings()
+            self._http_client = new_http_client()
+        return {"http_client": self._http_client, "youtube_settings": self._youtube_settings}
+
+    def _sessions(self) -> Dict[str, Session]:
+        """Session of each job whose object exists"""
+        sessions = {
+            "maintain_partitions": self.partitions.db,
+            "analyze_velocity": self.analyzer.db,
+            "schedule_polls": self.poll_scheduler.db,
+            "rollup_metrics": self.rollup.db,
+        }
+        if self._trending is not None:
+            sessions["collect_trending"] = self._trending.db
+        if self._incremental is not None:
+            sessions["collect_incremental"] = self._incremental.db
+        return sessions
+
+    def _maintain_partitions(self) -> Any:
+        return self.partitions.maintain(retention_days=self.settings.worker_raw_retention_days)
+
+    def _collect_trending(self) -> Any:
+        return self.trending.collect_trending()
+
+    def _collect_incremental(self) -> Dict[str, Any]:
+        if self.settings.worker_incremental_mode == "hot":
+            return self.incremental.collect_hot()
+        return self.incremental.collect_due()
+
+    def _analyze_and_publish(self) -> None:
+        # Readers get the ranking from the stored leaderboard instead of rerunning the analysis
+        self.analyzer.analyze_velocity(top_n=LEADERBOARD_SIZE, publish=True)
+
+    def _rollup_and_compact(self) -> None:
+        self.rollup.rollup()
+        self.rollup.compact(self.settings.worker_raw_retention_days)
+
+
+_worker: Optional[JobWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_worker() -> JobWorker:
+    """Process-wide worker built on first use"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = JobWorker()
+        return _worker
+
+
+def _forget_worker_in_child() -> None:
+    # A forked pool process must not share the parent's sockets; it builds its own worker
+    global _worker, _worker_lock
+    _worker = None
+    _worker_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_worker_in_child)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run jobs once on a long-lived worker")
+    parser.add_argument("jobs", nargs="+", choices=WORKER_JOBS, help="Jobs to run, in order")
+
+    args = parser.parse_args(argv)
+
+    setup_json_logging()
+
+    with JobWorker() as worker:
+        for job in args.jobs:
+            worker.run(job)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""add incremental velocity state tables
+
+Revision ID: 3c5e8a1f2b7d
+Revises: 91a89dc6ad21
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c5e8a1f2b7d'
+down_revision = '91a89dc6ad21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'video_velocity_state',
+        sa.Column('video_id', sa.String(), sa.ForeignKey('videos.video_id'), primary_key=True,
+                  comment='Reference to video'),
+        sa.Column('last_captured_at', sa.TIMESTAMP(timezone=True), nullable=False,
+                  comment='Capture time of last processed snapshot (UTC)'),
+        sa.Column('last_view_count', sa.BIGINT(), comment='View count of last processed snapshot'),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.func.now(),
+                  comment='Last state update time (UTC)'),
+    )
+
+    op.create_table(
+        'video_velocity_bucket',
+        sa.Column('video_id', sa.String(), sa.ForeignKey('videos.video_id'), primary_key=True,
+                  comment='Reference to video'),
+        sa.Column('bucket_start', sa.TIMESTAMP(timezone=True), primary_key=True,
+                  comment='Bucket start time (UTC)'),
+        sa.Column('snapshots', sa.INTEGER(), nullable=False,
+                  comment='Snapshots captured within the bucket'),
+        sa.Column('valid_intervals', sa.INTEGER(), nullable=False,
+                  comment='Valid intervals starting within the bucket'),
+        sa.Column('max_views_per_min', sa.Float(),
+                  comment='Max velocity of intervals starting within the bucket'),
+    )
+    op.create_index('idx_video_velocity_bucket_start', 'video_velocity_bucket', ['bucket_start'])
+
+    op.create_table(
+        'analyzer_watermark',
+        sa.Column('name', sa.String(), primary_key=True, comment='Analyzer name'),
+        sa.Column('watermark', sa.TIMESTAMP(timezone=True), nullable=False,
+                  comment='Latest snapshot capture time processed (UTC)'),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.func.now(),
+                  comment='Last watermark update time (UTC)'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('analyzer_watermark')
+    op.drop_index('idx_video_velocity_bucket_start', table_name='video_velocity_bucket')
+    op.drop_table('video_velocity_bucket')
+    op.drop_table('video_velocity_state')
@@ -0,0 +1,110 @@
+"""partition video_metrics_snapshot by captured_at
+
+Revision ID: 6d2f4b9a0c81
+Revises: 3c5e8a1f2b7d
+Create Date: 2026-10-17 11:03:27.540918
+
+"""
+from datetime import date, datetime, timedelta, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d2f4b9a0c81'
+down_revision = '3c5e8a1f2b7d'
+branch_labels = None
+depends_on = None
+
+# Partitions created ahead of today; the runner keeps extending this
+DAYS_AHEAD = 7
+
+
+def _create_daily_partitions(start: date, end: date) -> None:
+    day = start
+    while day <= end:
+        op.execute(f"""
+            CREATE TABLE video_metrics_snapshot_p{day.strftime('%Y%m%d')}
+            PARTITION OF video_metrics_snapshot
+            FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')
+        """)
+        day += timedelta(days=1)
+
+
+def upgrade() -> None:
+    # Keep the old table aside while the partitioned one is built
+    op.execute("ALTER TABLE video_metrics_snapshot RENAME TO video_metrics_snapshot_legacy")
+    op.execute("ALTER TABLE video_metrics_snapshot_legacy RENAME CONSTRAINT video_metrics_snapshot_pkey TO video_metrics_snapshot_legacy_pkey")
+    op.execute("ALTER INDEX idx_video_metrics_video_captured_unique RENAME TO idx_video_metrics_video_captured_unique_legacy")
+
+    # Partition key must be part of every unique constraint, so the PK
+    # becomes (id, captured_at); ids keep coming from the existing sequence
+    op.execute("""
+        CREATE TABLE video_metrics_snapshot (
+            id BIGINT NOT NULL DEFAULT nextval('video_metrics_snapshot_id_seq'),
+            video_id VARCHAR NOT NULL REFERENCES videos (video_id),
+            captured_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            view_count BIGINT,
+            like_count BIGINT,
+            comment_count BIGINT,
+            CONSTRAINT video_metrics_snapshot_pkey PRIMARY KEY (id, captured_at)
+        ) PARTITION BY RANGE (captured_at)
+    """)
+    op.execute("ALTER SEQUENCE video_metrics_snapshot_id_seq OWNED BY video_metrics_snapshot.id")
+    op.execute("COMMENT ON COLUMN video_metrics_snapshot.video_id IS 'Reference to video'")
+    op.execute("COMMENT ON COLUMN video_metrics_snapshot.captured_at IS 'Snapshot capture time (UTC)'")
+    op.execute("COMMENT ON COLUMN video_metrics_snapshot.view_count IS 'View count at capture time'")
+    op.execute("COMMENT ON COLUMN video_metrics_snapshot.like_count IS 'Like count at capture time'")
+    op.execute("COMMENT ON COLUMN video_metrics_snapshot.comment_count IS 'Comment count at capture time'")
+
+    op.create_index('idx_video_metrics_video_captured_unique',
+                    'video_metrics_snapshot',
+                    ['video_id', 'captured_at'],
+                    unique=True)
+
+    # One partition per UTC day from the oldest snapshot to a week ahead
+    today = datetime.now(timezone.utc).date()
+    oldest = op.get_bind().execute(sa.text(
+        "SELECT MIN(captured_at) FROM video_metrics_snapshot_legacy"
+    )).scalar()
+    start = oldest.astimezone(timezone.utc).date() if oldest else today
+    _create_daily_partitions(min(start, today), today + timedelta(days=DAYS_AHEAD))
+
+    op.execute("""
+        INSERT INTO video_metrics_snapshot (id, video_id, captured_at, view_count, like_count, comment_count)
+        SELECT id, video_id, captured_at, view_count, like_count, comment_count
+        FROM video_metrics_snapshot_legacy
+    """)
+    op.execute("DROP TABLE video_metrics_snapshot_legacy")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE video_metrics_snapshot RENAME TO video_metrics_snapshot_partitioned")
+    op.execute("ALTER TABLE video_metrics_snapshot_partitioned RENAME CONSTRAINT video_metrics_snapshot_pkey TO video_metrics_snapshot_partitioned_pkey")
+    op.execute("ALTER INDEX idx_video_metrics_video_captured_unique RENAME TO idx_video_metrics_video_captured_unique_partitioned")
+
+    op.execute("""
+        CREATE TABLE video_metrics_snapshot (
+            id BIGINT NOT NULL DEFAULT nextval('video_metrics_snapshot_id_seq'),
+            video_id VARCHAR NOT NULL REFERENCES videos (video_id),
+            captured_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            view_count BIGINT,
+            like_count BIGINT,
+            comment_count BIGINT,
+            CONSTRAINT video_metrics_snapshot_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("ALTER SEQUENCE video_metrics_snapshot_id_seq OWNED BY video_metrics_snapshot.id")
+    op.create_index('idx_video_metrics_video_captured_unique',
+                    'video_metrics_snapshot',
+                    ['video_id', 'captured_at'],
+                    unique=True)
+
+    op.execute("""
+        INSERT INTO video_metrics_snapshot (id, video_id, captured_at, view_count, like_count, comment_count)
+        SELECT id, video_id, captured_at, view_count, like_count, comment_count
+        FROM video_metrics_snapshot_partitioned
+    """)
+    # Dropping the parent drops every partition
+    op.execute("DROP TABLE video_metrics_snapshot_partitioned")
@@ -0,0 +1,50 @@
+"""add hourly and daily metrics rollup tables
+
+Revision ID: 8a4c1e7d3f92
+Revises: 6d2f4b9a0c81
+Create Date: 2026-10-17 13:41:05.307712
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4c1e7d3f92'
+down_revision = '6d2f4b9a0c81'
+branch_labels = None
+depends_on = None
+
+
+def _rollup_columns():
+    columns = [
+        sa.Column('video_id', sa.String(), sa.ForeignKey('videos.video_id'), primary_key=True,
+                  comment='Reference to video'),
+        sa.Column('bucket_start', sa.TIMESTAMP(timezone=True), primary_key=True,
+                  comment='Bucket start time (UTC)'),
+        sa.Column('snapshots', sa.INTEGER(), nullable=False, comment='Raw snapshots rolled into the bucket'),
+        sa.Column('last_captured_at', sa.TIMESTAMP(timezone=True), nullable=False,
+                  comment='Capture time of the last snapshot in the bucket (UTC)'),
+    ]
+    for metric in ('view', 'like', 'comment'):
+        columns += [
+            sa.Column(f'{metric}_min', sa.BIGINT(), comment=f'Minimum {metric} count in the bucket'),
+            sa.Column(f'{metric}_max', sa.BIGINT(), comment=f'Maximum {metric} count in the bucket'),
+            sa.Column(f'{metric}_last', sa.BIGINT(), comment=f'Last {metric} count in the bucket'),
+        ]
+    return columns
+
+
+def upgrade() -> None:
+    op.create_table('video_metrics_hourly', *_rollup_columns())
+    op.create_index('idx_video_metrics_hourly_bucket', 'video_metrics_hourly', ['bucket_start'])
+
+    op.create_table('video_metrics_daily', *_rollup_columns())
+    op.create_index('idx_video_metrics_daily_bucket', 'video_metrics_daily', ['bucket_start'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_video_metrics_daily_bucket', table_name='video_metrics_daily')
+    op.drop_table('video_metrics_daily')
+    op.drop_index('idx_video_metrics_hourly_bucket', table_name='video_metrics_hourly')
+    op.drop_table('video_metrics_hourly')
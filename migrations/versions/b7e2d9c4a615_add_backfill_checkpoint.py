@@ -0,0 +1,33 @@
+"""add backfill checkpoint table
+
+Revision ID: b7e2d9c4a615
+Revises: 8a4c1e7d3f92
+Create Date: 2026-10-17 16:22:48.519204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2d9c4a615'
+down_revision = '8a4c1e7d3f92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'backfill_checkpoint',
+        sa.Column('source', sa.String(), primary_key=True, comment='Absolute path of the dump file'),
+        sa.Column('file_size', sa.BIGINT(), nullable=False, comment='File size when the checkpoint was written'),
+        sa.Column('rows_done', sa.BIGINT(), nullable=False, comment='Rows read and committed so far'),
+        sa.Column('completed_at', sa.TIMESTAMP(timezone=True), nullable=True,
+                  comment='Time the whole file was loaded (UTC)'),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False,
+                  comment='Last checkpoint update time (UTC)'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('backfill_checkpoint')
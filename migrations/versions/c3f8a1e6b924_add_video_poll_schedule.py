@@ -0,0 +1,37 @@
+"""add video poll schedule table
+
+Revision ID: c3f8a1e6b924
+Revises: b7e2d9c4a615
+Create Date: 2026-10-17 18:05:12.730461
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8a1e6b924'
+down_revision = 'b7e2d9c4a615'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'video_poll_schedule',
+        sa.Column('video_id', sa.String(), sa.ForeignKey('videos.video_id'), primary_key=True,
+                  comment='Reference to video'),
+        sa.Column('interval_minutes', sa.INTEGER(), nullable=False, comment='Minutes between statistics polls'),
+        sa.Column('next_due_at', sa.TIMESTAMP(timezone=True), nullable=False, comment='Next poll due time (UTC)'),
+        sa.Column('views_per_min', sa.Float(), nullable=True, comment='Velocity the interval was derived from'),
+        sa.Column('last_polled_at', sa.TIMESTAMP(timezone=True), nullable=True,
+                  comment='Last statistics poll time (UTC)'),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False,
+                  comment='Last interval assignment time (UTC)'),
+    )
+    op.create_index('idx_video_poll_schedule_due', 'video_poll_schedule', ['next_due_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_video_poll_schedule_due', table_name='video_poll_schedule')
+    op.drop_table('video_poll_schedule')
@@ -0,0 +1,43 @@
+"""add video velocity ewma table
+
+Revision ID: d9a4f2b7e160
+Revises: c3f8a1e6b924
+Create Date: 2026-10-17 22:41:36.218904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a4f2b7e160'
+down_revision = 'c3f8a1e6b924'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'video_velocity_ewma',
+        sa.Column('video_id', sa.String(), sa.ForeignKey('videos.video_id'), primary_key=True,
+                  comment='Reference to video'),
+        sa.Column('last_captured_at', sa.TIMESTAMP(timezone=True), nullable=False,
+                  comment='Capture time of the latest snapshot folded in (UTC)'),
+        sa.Column('last_view_count', sa.BIGINT(), nullable=True,
+                  comment='View count of the latest snapshot folded in'),
+        sa.Column('views_per_min', sa.Float(), nullable=True,
+                  comment='EWMA of interval views per minute (NULL until two snapshots)'),
+        sa.Column('variance', sa.Float(), nullable=True,
+                  comment='Exponentially weighted variance of interval views per minute'),
+        sa.Column('samples', sa.INTEGER(), nullable=False,
+                  comment='Intervals folded into the estimate'),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False,
+                  comment='Last estimate update time (UTC)'),
+    )
+    op.create_index('idx_video_velocity_ewma_rate', 'video_velocity_ewma', ['views_per_min'],
+                    postgresql_where=sa.text('views_per_min IS NOT NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_video_velocity_ewma_rate', table_name='video_velocity_ewma')
+    op.drop_table('video_velocity_ewma')
@@ -0,0 +1,47 @@
+"""add trending leaderboard tables
+
+Revision ID: e4b8c2f19a37
+Revises: d9a4f2b7e160
+Create Date: 2026-10-17 23:58:12.604117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b8c2f19a37'
+down_revision = 'd9a4f2b7e160'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('trending_leaderboard_generation_seq')))
+    op.create_table(
+        'trending_leaderboard',
+        sa.Column('generation', sa.BIGINT(), nullable=False,
+                  comment='Leaderboard generation the entry belongs to'),
+        sa.Column('rank', sa.INTEGER(), nullable=False, comment='1-based rank within the generation'),
+        sa.Column('video_id', sa.String(), nullable=False, comment='Ranked video'),
+        sa.Column('score', sa.Float(), nullable=False, comment='Value the ranking is ordered by'),
+        sa.Column('views_per_min', sa.Float(), nullable=True, comment='Peak views per minute over the window'),
+        sa.Column('computed_at', sa.TIMESTAMP(timezone=True), nullable=False, comment='Analysis time (UTC)'),
+        sa.PrimaryKeyConstraint('generation', 'rank'),
+    )
+    op.create_table(
+        'trending_leaderboard_current',
+        sa.Column('region', sa.Text(), nullable=False, comment='Country code, or ALL for every region'),
+        sa.Column('window_hours', sa.INTEGER(), nullable=False, comment='Analysis window in hours'),
+        sa.Column('ranked_by', sa.Text(), nullable=False, comment='Score the ranking is ordered by'),
+        sa.Column('generation', sa.BIGINT(), nullable=False, comment='Published generation'),
+        sa.Column('entries', sa.INTEGER(), nullable=False, comment='Entries in the published generation'),
+        sa.Column('computed_at', sa.TIMESTAMP(timezone=True), nullable=False, comment='Analysis time (UTC)'),
+        sa.PrimaryKeyConstraint('region', 'window_hours', 'ranked_by'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('trending_leaderboard_current')
+    op.drop_table('trending_leaderboard')
+    op.execute(sa.schema.DropSequence(sa.Sequence('trending_leaderboard_generation_seq')))
@@ -68,4 +68,13 @@ def sample_script_beats():
                 # body and cta missing
             }
         }
-    }
\ No newline at end of file
+    }
+
+
+@pytest.fixture
+def fake_youtube_api(monkeypatch):
+    """Local YouTube API stand-in; pass its transports to the clients"""
+    from tests.fixtures.youtube_api import FakeYouTubeAPI
+
+    monkeypatch.setenv("YOUTUBE_API_KEY", "test-key")
+    return FakeYouTubeAPI()
@@ -0,0 +1,119 @@
+"""In-process stand-in for the YouTube Data API videos endpoint"""
+import asyncio
+import hashlib
+import time
+from typing import Dict, List, Set
+
+import httpx
+
+# Largest maxResults / id list the real endpoint accepts
+MAX_PAGE_SIZE = 50
+
+
+class FakeYouTubeAPI:
+    """Serves mostPopular charts and video details through httpx.MockTransport.
+
+    `latency` (seconds) is added to every response to model a remote API.
+    Videos are derived from the region code, so the same region always yields
+    the same ids and statistics. Charts are paged with offset page tokens,
+    oversized pages or id lists are rejected with 400 and responses carry an
+    ETag honoured through If-None-Match, like the real API. Ids passed in
+    `missing_ids` are left out of id lookups, like deleted or private videos.
+    """
+
+    def __init__(self, videos_per_region: int = 200, latency: float = 0.0):
+        self.videos_per_region = videos_per_region
+        self.latency = latency
+        # Regions answered with 403 quotaExceeded
+        self.failing_regions: Set[str] = set()
+        # Status codes answered to the next requests, one per request
+        self.outages: List[int] = []
+        # When False the chart ignores requested parts and returns ids only
+        self.chart_returns_parts = True
+        self.missing_ids: Set[str] = set()
+        self.not_modified = 0
+        self.requests: List[httpx.Request] = []
+
+    def region_ids(self, region_code: str) -> List[str]:
+        return [f"{region_code.lower()}_{i:04d}" for i in range(self.videos_per_region)]
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.outages:
+            return httpx.Response(self.outages.pop(0))
+        response = self._respond(request)
+        if response.status_code != 200:
+            return response
+
+        # Weak validator over the body, like the real API's ETag
+        etag = '"' + hashlib.sha1(response.content).hexdigest()[:16] + '"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, content=response.content,
+                              headers={"ETag": etag, "Content-Type": "application/json"})
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+
+        if params.get("chart") == "mostPopular":
+            if params["regionCode"] in self.failing_regions:
+                return httpx.Response(403, json={"error": {"errors": [{"reason": "quotaExceeded"}]}})
+            page_size = int(params.get("maxResults", 5))
+            if not 1 <= page_size <= MAX_PAGE_SIZE:
+                return httpx.Response(400, json={"error": {"errors": [{"reason": "invalidParameter"}]}})
+
+            offset = int(params.get("pageToken", 0))
+            region_ids = self.region_ids(params["regionCode"])
+            page_ids = region_ids[offset:offset + page_size]
+            if self.chart_returns_parts and "snippet" in params.get("part", ""):
+                body = {"items": [self._video_item(video_id) for video_id in page_ids]}
+            else:
+                body = {"items": [{"id": video_id} for video_id in page_ids]}
+            if offset + page_size < len(region_ids):
+                body["nextPageToken"] = str(offset + page_size)
+            return httpx.Response(200, json=body)
+
+        video_ids = [video_id for video_id in params["id"].split(",") if video_id not in self.missing_ids]
+        if len(video_ids) > MAX_PAGE_SIZE:
+            return httpx.Response(400, json={"error": {"errors": [{"reason": "invalidParameter"}]}})
+        # Id lookups return only the requested parts
+        parts = set(params.get("part", "").split(","))
+        items = [
+            {key: value for key, value in self._video_item(video_id).items() if key == "id" or key in parts}
+            for video_id in video_ids
+        ]
+        return httpx.Response(200, json={"items": items})
+
+    def sync_transport(self) -> httpx.MockTransport:
+        def handler(request: httpx.Request) -> httpx.Response:
+            if self.latency:
+                time.sleep(self.latency)
+            return self.handle(request)
+        return httpx.MockTransport(handler)
+
+    def async_transport(self) -> httpx.MockTransport:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return self.handle(request)
+        return httpx.MockTransport(handler)
+
+    def _video_item(self, video_id: str) -> Dict:
+        rank = int(video_id.rsplit("_", 1)[-1])
+        return {
+            "id": video_id,
+            "snippet": {
+                "title": f"Video {video_id}",
+                "description": "",
+                "channelTitle": f"channel_{rank % 7}",
+                "categoryId": "22",
+                "tags": ["test"],
+                "publishedAt": "2025-01-01T00:00:00Z",
+            },
+            "statistics": {
+                "viewCount": str(1_000_000 - rank * 1000),
+                "likeCount": str(10_000 - rank * 10),
+                "commentCount": str(100 + rank),
+            },
+        }
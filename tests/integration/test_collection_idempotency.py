@@ -47,6 +47,7 @@ class TestCollectionIdempotency:
 
             # Cleanup
             session.rollback()
+            session.execute(text("DELETE FROM video_velocity_ewma WHERE video_id = 'test_video_1'"))
             session.execute(text("DELETE FROM video_metrics_snapshot WHERE video_id = 'test_video_1'"))
             session.execute(text("DELETE FROM videos WHERE video_id = 'test_video_1'"))
             session.commit()
@@ -0,0 +1,262 @@
+"""Tests for the statistics-only hot video refresh"""
+import pytest
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from sqlalchemy import text
+
+from core.db import SessionLocal
+from core.watermarks import lock_watermark, set_watermark
+from collection.clients.youtube import YouTubeClient
+from collection.jobs import collector_incremental
+from collection.jobs.collector_incremental import IncrementalCollector
+from collection.polling import advance_poll_schedule, due_videos, update_poll_schedule
+from collection.quota import TokenBucket
+from analysis.velocity_state import VELOCITY_WATERMARK
+
+TEST_PREFIX = "incr_test_"
+
+
+@pytest.fixture
+def hot_videos(fake_youtube_api, monkeypatch):
+    """Five videos with two snapshots each; video i gains (i + 1) * 1000 views an hour"""
+    monkeypatch.setattr(collector_incremental, "YouTubeClient",
+                        partial(YouTubeClient, transport=fake_youtube_api.sync_transport(),
+                                budget=TokenBucket(100, 1.0)))
+    ids = [f"{TEST_PREFIX}{i:04d}" for i in range(5)]
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+
+    with SessionLocal() as session:
+        for i, video_id in enumerate(ids):
+            session.execute(text("INSERT INTO videos (video_id, title) VALUES (:video_id, 'hot')"),
+                            {"video_id": video_id})
+            for hours_ago, views in ((2, 10_000), (1, 10_000 + (i + 1) * 1000)):
+                session.execute(text("""
+                    INSERT INTO video_metrics_snapshot (video_id, captured_at, view_count)
+                    VALUES (:video_id, :captured_at, :views)
+                """), {"video_id": video_id, "captured_at": now - timedelta(hours=hours_ago), "views": views})
+        session.commit()
+
+    yield ids
+
+    with SessionLocal() as session:
+        session.execute(text("DELETE FROM video_poll_schedule WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.execute(text("DELETE FROM video_velocity_bucket WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.execute(text("DELETE FROM video_velocity_ewma WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.execute(text("DELETE FROM video_metrics_snapshot WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.execute(text("DELETE FROM videos WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.commit()
+
+
+@pytest.fixture
+def analyzer_watermark():
+    """Set the analyzer's bucket watermark through a callable; restored afterwards"""
+    with SessionLocal() as session:
+        previous = session.execute(text("SELECT watermark FROM analyzer_watermark WHERE name = :name"),
+                                   {"name": VELOCITY_WATERMARK}).scalar()
+
+    def set_to(watermark):
+        with SessionLocal() as session:
+            lock_watermark(session, VELOCITY_WATERMARK)
+            set_watermark(session, VELOCITY_WATERMARK, watermark)
+            session.commit()
+
+    yield set_to
+
+    with SessionLocal() as session:
+        if previous is None:
+            session.execute(text("DELETE FROM analyzer_watermark WHERE name = :name"), {"name": VELOCITY_WATERMARK})
+        else:
+            session.execute(text("UPDATE analyzer_watermark SET watermark = :watermark WHERE name = :name"),
+                            {"watermark": previous, "name": VELOCITY_WATERMARK})
+        session.commit()
+
+
+@pytest.fixture
+def velocity_buckets(hot_videos, analyzer_watermark):
+    """Analyzer buckets ranking the videos in reverse order, far above any other video"""
+    bucket_start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(hours=1)
+    analyzer_watermark(datetime.now(timezone.utc))
+    with SessionLocal() as session:
+        for i, video_id in enumerate(hot_videos):
+            session.execute(text("""
+                INSERT INTO video_velocity_bucket (video_id, bucket_start, snapshots, valid_intervals, max_views_per_min)
+                VALUES (:video_id, :bucket_start, 2, 1, :velocity)
+            """), {"video_id": video_id, "bucket_start": bucket_start, "velocity": 1e12 - i})
+        session.commit()
+    return hot_videos
+
+
+def _latest_views() -> dict:
+    with SessionLocal() as session:
+        rows = session.execute(text("""
+            SELECT DISTINCT ON (video_id) video_id, view_count FROM video_metrics_snapshot
+            WHERE video_id LIKE :prefix ORDER BY video_id, captured_at DESC
+        """), {"prefix": f"{TEST_PREFIX}%"}).fetchall()
+    return {row.video_id: row.view_count for row in rows}
+
+
+class TestIncrementalCollection:
+    """Test the hottest videos get a fresh snapshot and nothing else is touched"""
+
+    def test_refreshes_hottest_videos(self, velocity_buckets, fake_youtube_api):
+        """Test only the top movers by analyzer velocity are looked up, with statistics only"""
+        with IncrementalCollector() as collector:
+            summary = collector.collect_hot(limit=2, lookback_hours=3)
+
+        assert summary["velocity_source"] == "velocity_bucket"
+        assert summary["selected"] == 2
+        assert summary["snapshots_inserted"] == 2
+        assert summary["quota_units"] == 1
+        requested = fake_youtube_api.requests[0].url.params
+        assert requested["part"] == "statistics"
+        assert requested["id"].split(",") == velocity_buckets[:2]
+        # Fake API counts derive from the id suffix
+        assert _latest_views()[velocity_buckets[1]] == 1_000_000 - 1000
+
+    def test_stale_buckets_fall_back_to_snapshots(self, velocity_buckets, analyzer_watermark):
+        """Test buckets are ignored when the analyzer is behind the newest snapshots"""
+        analyzer_watermark(datetime.now(timezone.utc) - timedelta(hours=2))
+
+        with IncrementalCollector() as collector:
+            video_ids, source = collector._hot_videos(limit=2, lookback_hours=3)
+
+        assert source == "snapshots"
+        assert video_ids[:2] == [velocity_buckets[4], velocity_buckets[3]]
+
+    def test_snapshot_velocity_without_buckets(self, hot_videos):
+        """Test raw snapshots rank videos when the analyzer kept no buckets"""
+        with IncrementalCollector() as collector:
+            if collector.db.execute(text("""
+                SELECT 1 FROM video_velocity_bucket WHERE bucket_start >= NOW() - INTERVAL '3 hours' LIMIT 1
+            """)).first():
+                pytest.skip("velocity buckets from other data present")
+            video_ids, source = collector._hot_videos(limit=2, lookback_hours=3)
+
+        assert source == "snapshots"
+        assert video_ids[:2] == [hot_videos[4], hot_videos[3]]
+
+    def test_missing_videos_are_skipped(self, hot_videos, fake_youtube_api):
+        """Test videos the API no longer returns get no snapshot"""
+        fake_youtube_api.missing_ids = {hot_videos[4]}
+
+        with IncrementalCollector() as collector:
+            summary = collector.collect_hot(limit=5, lookback_hours=3)
+
+        assert summary["refreshed"] == 4
+        assert summary["missing"] == 1
+        assert _latest_views()[hot_videos[4]] == 15_000
+
+    def test_dry_run_writes_nothing(self, hot_videos):
+        """Test dry runs fetch but do not insert"""
+        with IncrementalCollector() as collector:
+            summary = collector.collect_hot(limit=5, lookback_hours=3, dry_run=True)
+
+        assert summary["refreshed"] == 5
+        assert summary["snapshots_inserted"] == 0
+        assert max(_latest_views().values()) == 15_000
+
+
+def _schedule() -> dict:
+    with SessionLocal() as session:
+        rows = session.execute(text("""
+            SELECT video_id, interval_minutes, next_due_at, last_polled_at FROM video_poll_schedule
+            WHERE video_id LIKE :prefix
+        """), {"prefix": f"{TEST_PREFIX}%"}).fetchall()
+    return {row.video_id: row for row in rows}
+
+
+class TestPollSchedule:
+    """Test interval assignment and due selection"""
+
+    def test_assigns_intervals_by_velocity(self, hot_videos):
+        """Test fast videos get short intervals and stalled or unknown videos are left out"""
+        now = datetime.now(timezone.utc)
+        velocities = {hot_videos[0]: 5_000.0, hot_videos[1]: 2.0, hot_videos[2]: 0.0,
+                      f"{TEST_PREFIX}unknown": 500.0}
+
+        with SessionLocal() as session:
+            counts = update_poll_schedule(session, velocities, now)
+            session.commit()
+
+        schedule = _schedule()
+        assert counts["scheduled"] == 3
+        assert set(schedule) == {hot_videos[0], hot_videos[1]}
+        assert schedule[hot_videos[0]].interval_minutes == 10
+        assert schedule[hot_videos[1]].interval_minutes == 60
+        assert schedule[hot_videos[0]].next_due_at == now + timedelta(minutes=10)
+
+    def test_speedup_pulls_next_poll_forward(self, hot_videos):
+        """Test a faster velocity shortens the wait but a slower one does not postpone the poll"""
+        now = datetime.now(timezone.utc)
+        with SessionLocal() as session:
+            update_poll_schedule(session, {hot_videos[0]: 2.0, hot_videos[1]: 5_000.0}, now)
+            update_poll_schedule(session, {hot_videos[0]: 5_000.0, hot_videos[1]: 2.0}, now)
+            session.commit()
+
+        schedule = _schedule()
+        assert schedule[hot_videos[0]].next_due_at == now + timedelta(minutes=10)
+        assert schedule[hot_videos[1]].next_due_at == now + timedelta(minutes=10)
+        assert schedule[hot_videos[1]].interval_minutes == 60
+
+    def test_due_order_and_advance(self, hot_videos):
+        """Test due videos come most overdue first and move one interval on after a poll"""
+        earlier = datetime.now(timezone.utc) - timedelta(hours=2)
+        with SessionLocal() as session:
+            update_poll_schedule(session, {hot_videos[0]: 2.0}, earlier)
+            update_poll_schedule(session, {hot_videos[1]: 5_000.0}, earlier + timedelta(minutes=30))
+            session.commit()
+
+            now = datetime.now(timezone.utc)
+            due = [video_id for video_id in due_videos(session, now, 100) if video_id.startswith(TEST_PREFIX)]
+            assert due == [hot_videos[1], hot_videos[0]]
+
+            advance_poll_schedule(session, due, now)
+            session.commit()
+            assert not [video_id for video_id in due_videos(session, now, 100)
+                        if video_id.startswith(TEST_PREFIX)]
+
+        assert _schedule()[hot_videos[0]].next_due_at == now + timedelta(minutes=60)
+
+
+class TestDueCollection:
+    """Test the collector polls due videos only and reschedules them"""
+
+    def test_collects_due_videos(self, hot_videos, fake_youtube_api):
+        """Test due videos are snapshotted and rescheduled while videos not yet due are left alone"""
+        now = datetime.now(timezone.utc)
+        with SessionLocal() as session:
+            update_poll_schedule(session, {hot_videos[0]: 5_000.0, hot_videos[1]: 2.0}, now - timedelta(hours=1))
+            update_poll_schedule(session, {hot_videos[2]: 5_000.0}, now)
+            session.commit()
+
+        with IncrementalCollector() as collector:
+            if [video_id for video_id in due_videos(collector.db, now, 100) if not video_id.startswith(TEST_PREFIX)]:
+                pytest.skip("due videos from other data present")
+            summary = collector.collect_due(limit=100)
+
+        assert summary["due"] == 2
+        assert summary["snapshots_inserted"] == 2
+        assert fake_youtube_api.requests[0].url.params["id"].split(",") == hot_videos[:2]
+        schedule = _schedule()
+        assert schedule[hot_videos[0]].last_polled_at is not None
+        assert schedule[hot_videos[0]].next_due_at > now
+        assert schedule[hot_videos[2]].last_polled_at is None
+
+    def test_missing_videos_leave_schedule(self, hot_videos, fake_youtube_api):
+        """Test videos the API no longer returns stop being polled"""
+        fake_youtube_api.missing_ids = {hot_videos[0]}
+        with SessionLocal() as session:
+            update_poll_schedule(session, {hot_videos[0]: 5_000.0},
+                                 datetime.now(timezone.utc) - timedelta(hours=1))
+            session.commit()
+
+        with IncrementalCollector() as collector:
+            summary = collector.collect_due(limit=100)
+
+        assert summary["missing"] >= 1
+        assert hot_videos[0] not in _schedule()
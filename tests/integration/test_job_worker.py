@@ -0,0 +1,118 @@
+"""Tests for the long-lived job worker"""
+import pytest
+from pydantic import ValidationError
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+
+from core.db import SessionLocal
+from collection.clients.youtube import new_http_client
+from collection.polling import update_poll_schedule
+from jobs import worker as worker_module
+from jobs.worker import JobWorker, WorkerSettings
+
+TEST_PREFIX = "worker_test_"
+
+
+@pytest.fixture
+def job_worker(fake_youtube_api, monkeypatch):
+    monkeypatch.setattr(worker_module, "new_http_client",
+                        lambda: new_http_client(fake_youtube_api.sync_transport()))
+    with JobWorker() as job_worker:
+        yield job_worker
+
+
+@pytest.fixture
+def due_videos():
+    """Three scheduled videos whose polls are an hour overdue"""
+    ids = [f"{TEST_PREFIX}{i:04d}" for i in range(3)]
+    with SessionLocal() as session:
+        for video_id in ids:
+            session.execute(text("INSERT INTO videos (video_id, title) VALUES (:video_id, 'due')"),
+                            {"video_id": video_id})
+        update_poll_schedule(session, {video_id: 5_000.0 for video_id in ids},
+                             datetime.now(timezone.utc) - timedelta(hours=1))
+        session.commit()
+
+    yield ids
+
+    with SessionLocal() as session:
+        for table in ("video_poll_schedule", "video_velocity_ewma", "video_metrics_snapshot", "videos"):
+            session.execute(text(f"DELETE FROM {table} WHERE video_id LIKE :prefix"),
+                            {"prefix": f"{TEST_PREFIX}%"})
+        session.commit()
+
+
+def _make_due(ids):
+    with SessionLocal() as session:
+        session.execute(text("""
+            UPDATE video_poll_schedule SET next_due_at = NOW() - INTERVAL '1 minute' WHERE video_id = ANY(:ids)
+        """), {"ids": ids})
+        session.commit()
+
+
+class TestJobWorker:
+    """Test ticks reuse the worker's objects and release their connections"""
+
+    def test_ticks_reuse_client_and_session(self, job_worker, due_videos, fake_youtube_api):
+        """Test two incremental ticks share one HTTP client and leave no transaction open"""
+        with SessionLocal() as session:
+            others = session.execute(text("""
+                SELECT 1 FROM video_poll_schedule WHERE next_due_at <= NOW() AND video_id NOT LIKE :prefix LIMIT 1
+            """), {"prefix": f"{TEST_PREFIX}%"}).first()
+        if others:
+            pytest.skip("due videos from other data present")
+
+        http_client = job_worker.incremental.http_client
+        first = job_worker.run("collect_incremental")
+        _make_due(due_videos)
+        second = job_worker.run("collect_incremental")
+
+        assert first["refreshed"] == second["refreshed"] == 3
+        assert job_worker.incremental.http_client is http_client and not http_client.is_closed
+        assert len(fake_youtube_api.requests) == 2
+        assert not job_worker.incremental.db.in_transaction()
+
+    def test_unknown_job_rejected(self, job_worker):
+        """Test a typo in a job id fails loudly"""
+        with pytest.raises(ValueError):
+            job_worker.run("collect_everything")
+
+    def test_hot_incremental_mode(self, job_worker, monkeypatch):
+        """Test the incremental mode setting switches ticks to the hottest movers"""
+        calls = []
+        monkeypatch.setattr(job_worker.incremental, "collect_hot", lambda: calls.append("hot"))
+        monkeypatch.setattr(job_worker.settings, "worker_incremental_mode", "hot")
+
+        job_worker.run("collect_incremental")
+
+        assert calls == ["hot"]
+
+    def test_unknown_incremental_mode_rejected(self):
+        """Test a typo in the incremental mode fails at startup"""
+        with pytest.raises(ValueError):
+            JobWorker(WorkerSettings(worker_incremental_mode="fastest"))
+
+    def test_one_raw_retention_for_both_drops(self, monkeypatch):
+        """Test partition maintenance and compaction both keep the configured raw retention"""
+        with JobWorker(WorkerSettings(worker_raw_retention_days=45)) as job_worker:
+            calls = []
+            monkeypatch.setattr(job_worker.partitions, "maintain", lambda retention_days: calls.append(retention_days))
+            monkeypatch.setattr(job_worker.rollup, "rollup", lambda: None)
+            monkeypatch.setattr(job_worker.rollup, "compact", lambda retention_days: calls.append(retention_days))
+
+            job_worker.run("maintain_partitions")
+            job_worker.run("rollup_metrics")
+
+        assert calls == [45, 45]
+
+    def test_jobs_without_youtube_key(self, monkeypatch):
+        """Test a missing API key only fails the collector ticks"""
+        monkeypatch.delenv("YOUTUBE_API_KEY", raising=False)
+
+        with JobWorker() as job_worker:
+            monkeypatch.setitem(job_worker._jobs, "schedule_polls", lambda: {"scheduled": 0})
+
+            with pytest.raises(ValidationError):
+                job_worker.run("collect_incremental")
+            assert job_worker._http_client is None
+            assert job_worker.run("schedule_polls") == {"scheduled": 0}
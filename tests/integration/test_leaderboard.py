@@ -0,0 +1,186 @@
+"""Persisted leaderboards published by the velocity analyzer"""
+import threading
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+
+from core.db import SessionLocal
+from analysis.jobs.analyzer_velocity import VelocityAnalyzer
+from analysis.leaderboard import publish_leaderboard, read_leaderboard
+
+TEST_PREFIX = "leaderboard_test_"
+# Country codes no collector uses, so other data never enters these rankings
+TEST_REGION = "ZZ"
+OTHER_REGION = "ZY"
+
+
+def _results(*names):
+    return [{"video_id": f"{TEST_PREFIX}{name}", "views_per_min": float(100 - i)} for i, name in enumerate(names)]
+
+
+def _generations(session):
+    return session.execute(text("""
+        SELECT DISTINCT generation FROM trending_leaderboard WHERE video_id LIKE :prefix
+    """), {"prefix": f"{TEST_PREFIX}%"}).scalars().all()
+
+
+@pytest.fixture
+def seeded_regions():
+    """Snapshot histories for videos in two test regions"""
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    series = {
+        ("fast", TEST_REGION): [1000, 4000, 9000],
+        ("slow", TEST_REGION): [500, 510, 530],
+        ("other", OTHER_REGION): [1000, 90000, 190000],
+    }
+
+    with SessionLocal() as session:
+        for (name, region), views in series.items():
+            video_id = f"{TEST_PREFIX}{name}"
+            session.execute(text("""
+                INSERT INTO videos (video_id, title, channel, country_code)
+                VALUES (:video_id, :title, 'test_channel', :region)
+                ON CONFLICT (video_id) DO NOTHING
+            """), {"video_id": video_id, "title": f"Test {name}", "region": region})
+            for i, view_count in enumerate(views):
+                session.execute(text("""
+                    INSERT INTO video_metrics_snapshot (video_id, captured_at, view_count, like_count, comment_count)
+                    VALUES (:video_id, :captured_at, :view_count, 0, 0)
+                    ON CONFLICT (video_id, captured_at) DO NOTHING
+                """), {
+                    "video_id": video_id,
+                    "captured_at": now - timedelta(minutes=10 * (len(views) - i)),
+                    "view_count": view_count
+                })
+        session.commit()
+
+    yield
+
+    with SessionLocal() as session:
+        session.execute(text("DELETE FROM video_metrics_snapshot WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.execute(text("DELETE FROM videos WHERE video_id LIKE :prefix"), {"prefix": f"{TEST_PREFIX}%"})
+        session.commit()
+
+
+@pytest.fixture(autouse=True)
+def cleanup_leaderboards():
+    yield
+
+    with SessionLocal() as session:
+        session.execute(text("DELETE FROM trending_leaderboard WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.execute(text("DELETE FROM trending_leaderboard_current WHERE region = ANY(:regions)"),
+                        {"regions": [TEST_REGION, OTHER_REGION]})
+        session.commit()
+
+
+class TestPublishLeaderboard:
+    """Test publishing and reading generations"""
+
+    def test_read_returns_ranks_in_order(self):
+        """Test entries come back ranked, limited to top_n and scored by velocity"""
+        with SessionLocal() as session:
+            publish_leaderboard(session, _results("a", "b", "c"), 3, region=TEST_REGION)
+            session.commit()
+            entries = read_leaderboard(session, TEST_REGION, 3, top_n=2)
+
+        assert [(e["rank"], e["video_id"]) for e in entries] == [(1, f"{TEST_PREFIX}a"), (2, f"{TEST_PREFIX}b")]
+        assert entries[0]["score"] == entries[0]["views_per_min"] == 100.0
+
+    def test_republish_replaces_generation(self):
+        """Test a new publish swaps the pointer and deletes the replaced entries"""
+        with SessionLocal() as session:
+            first = publish_leaderboard(session, _results("a", "b"), 3, region=TEST_REGION)
+            session.commit()
+            second = publish_leaderboard(session, _results("c"), 3, region=TEST_REGION)
+            session.commit()
+
+            assert second > first
+            assert _generations(session) == [second]
+            assert [e["video_id"] for e in read_leaderboard(session, TEST_REGION, 3)] == [f"{TEST_PREFIX}c"]
+
+    def test_readers_never_see_uncommitted_generation(self):
+        """Test a reader keeps the old ranking until the publish commits"""
+        with SessionLocal() as writer, SessionLocal() as reader:
+            publish_leaderboard(writer, _results("a", "b"), 3, region=TEST_REGION)
+            writer.commit()
+
+            publish_leaderboard(writer, _results("c", "d", "e"), 3, region=TEST_REGION)
+            assert [e["video_id"] for e in read_leaderboard(reader, TEST_REGION, 3)] == [
+                f"{TEST_PREFIX}a", f"{TEST_PREFIX}b"]
+            reader.commit()
+
+            writer.commit()
+            assert len(read_leaderboard(reader, TEST_REGION, 3)) == 3
+
+    def test_concurrent_first_publishes_queue(self):
+        """Test a first publish waits for another uncommitted first publish and replaces it"""
+        with SessionLocal() as first, SessionLocal() as second:
+            publish_leaderboard(first, _results("a", "b"), 3, region=TEST_REGION)
+
+            generations = []
+            waiting = threading.Thread(target=lambda: generations.append(
+                publish_leaderboard(second, _results("c"), 3, region=TEST_REGION)))
+            waiting.start()
+            waiting.join(timeout=0.5)
+            assert waiting.is_alive()
+
+            first.commit()
+            waiting.join(timeout=10)
+            second.commit()
+
+            assert _generations(first) == generations
+            assert [e["video_id"] for e in read_leaderboard(first, TEST_REGION, 3)] == [f"{TEST_PREFIX}c"]
+
+    def test_leaderboards_are_separate(self):
+        """Test windows and scores of one region keep their own generations"""
+        with SessionLocal() as session:
+            publish_leaderboard(session, _results("a"), 3, region=TEST_REGION)
+            publish_leaderboard(session, _results("b"), 24, region=TEST_REGION)
+            publish_leaderboard(session, [{**_results("c")[0], "score": 7.0}], 3, "anomaly", TEST_REGION)
+            session.commit()
+
+            assert read_leaderboard(session, TEST_REGION, 3)[0]["video_id"] == f"{TEST_PREFIX}a"
+            assert read_leaderboard(session, TEST_REGION, 24)[0]["video_id"] == f"{TEST_PREFIX}b"
+            assert read_leaderboard(session, TEST_REGION, 3, "anomaly")[0]["score"] == 7.0
+            assert read_leaderboard(session, OTHER_REGION, 3) == []
+
+
+class TestAnalyzerPublish:
+    """Test the analyzer ranks per region and publishes its results"""
+
+    @pytest.mark.parametrize("engine", ["vectorized", "sql", "streaming"])
+    def test_region_filter(self, seeded_regions, engine):
+        """Test a region's ranking leaves out other regions' videos"""
+        with VelocityAnalyzer(engine=engine) as analyzer:
+            results = analyzer.analyze_velocity(window_hours=3, top_n=10_000, region=TEST_REGION)
+
+        assert [r["video_id"] for r in results] == [f"{TEST_PREFIX}fast", f"{TEST_PREFIX}slow"]
+
+    @pytest.mark.parametrize("engine", ["vectorized", "sql", "streaming"])
+    def test_empty_window_clears_leaderboard(self, engine):
+        """Test a window without snapshots still publishes, replacing the stale ranking"""
+        with SessionLocal() as session:
+            publish_leaderboard(session, _results("a"), 3, region=TEST_REGION)
+            session.commit()
+
+        with VelocityAnalyzer(engine=engine) as analyzer:
+            assert analyzer.analyze_velocity(window_hours=3, region=TEST_REGION, publish=True) == []
+
+        with SessionLocal() as session:
+            assert read_leaderboard(session, TEST_REGION, 3) == []
+            assert _generations(session) == []
+
+    def test_publish_stores_results(self, seeded_regions):
+        """Test published entries match the returned results"""
+        with VelocityAnalyzer(engine="vectorized") as analyzer:
+            results = analyzer.analyze_velocity(window_hours=3, top_n=10, region=TEST_REGION, publish=True)
+
+        with SessionLocal() as session:
+            entries = read_leaderboard(session, TEST_REGION, 3, top_n=10)
+
+        assert [e["video_id"] for e in entries] == [r["video_id"] for r in results]
+        assert [e["score"] for e in entries] == pytest.approx([r["views_per_min"] for r in results])
+        assert entries[0]["title"] == "Test fast"
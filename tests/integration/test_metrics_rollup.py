@@ -0,0 +1,169 @@
+"""Tests for hourly/daily metrics rollups"""
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+
+from core.db import SessionLocal
+from core.partitions import ensure_snapshot_partitions, list_snapshot_partitions, partition_name
+from analysis.jobs.analyzer_velocity import VelocityAnalyzer
+from analysis.jobs.rollup_metrics import MetricsRollup, WATERMARK_NAME
+
+TEST_PREFIX = "rollup_test_"
+
+
+@pytest.fixture
+def two_hours_of_snapshots():
+    """Four snapshots spread over two whole hours three hours ago"""
+    base = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(hours=3)
+    video_id = f"{TEST_PREFIX}video"
+    rows = [(5, 1000, 10), (35, 1600, 12), (70, 2000, 15), (110, 4000, 20)]
+
+    with SessionLocal() as session:
+        session.execute(text("""
+            INSERT INTO videos (video_id, title, channel, country_code)
+            VALUES (:video_id, 'Rollup test', 'test_channel', 'KR')
+            ON CONFLICT (video_id) DO NOTHING
+        """), {"video_id": video_id})
+        for minutes, views, likes in rows:
+            session.execute(text("""
+                INSERT INTO video_metrics_snapshot (video_id, captured_at, view_count, like_count, comment_count)
+                VALUES (:video_id, :captured_at, :views, :likes, 0)
+                ON CONFLICT (video_id, captured_at) DO NOTHING
+            """), {"video_id": video_id, "captured_at": base + timedelta(minutes=minutes),
+                   "views": views, "likes": likes})
+        session.commit()
+
+    yield video_id, base
+
+    with SessionLocal() as session:
+        for table in ("video_metrics_hourly", "video_metrics_daily", "video_metrics_snapshot"):
+            session.execute(text(f"DELETE FROM {table} WHERE video_id LIKE :prefix"),
+                            {"prefix": f"{TEST_PREFIX}%"})
+        session.execute(text("DELETE FROM videos WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.execute(text("DELETE FROM analyzer_watermark WHERE name = :name"), {"name": WATERMARK_NAME})
+        session.commit()
+
+
+def _insert_snapshot(video_id, captured_at, views):
+    with SessionLocal() as session:
+        session.execute(text("""
+            INSERT INTO video_metrics_snapshot (video_id, captured_at, view_count, like_count, comment_count)
+            VALUES (:video_id, :captured_at, :views, 0, 0)
+        """), {"video_id": video_id, "captured_at": captured_at, "views": views})
+        session.commit()
+
+
+@pytest.fixture
+def expired_day(two_hours_of_snapshots):
+    """A partition past raw retention holding two snapshots of one video"""
+    day = datetime.now(timezone.utc).date() - timedelta(days=40)
+    video_id = f"{TEST_PREFIX}expired"
+    noon = datetime(day.year, day.month, day.day, 12, tzinfo=timezone.utc)
+
+    with SessionLocal() as session:
+        ensure_snapshot_partitions(session, day, day)
+        session.execute(text("""
+            INSERT INTO videos (video_id, title, channel, country_code)
+            VALUES (:video_id, 'Rollup test', 'test_channel', 'KR')
+            ON CONFLICT (video_id) DO NOTHING
+        """), {"video_id": video_id})
+        session.commit()
+    _insert_snapshot(video_id, noon, 100)
+    _insert_snapshot(video_id, noon + timedelta(minutes=30), 400)
+
+    yield video_id, day
+
+    with SessionLocal() as session:
+        session.execute(text(f"DROP TABLE IF EXISTS {partition_name(day)}"))
+        session.commit()
+
+
+class TestMetricsRollup:
+    """Test rollup contents, idempotency and rollup-backed analysis"""
+
+    def _hourly(self, video_id):
+        with SessionLocal() as session:
+            return session.execute(text("""
+                SELECT bucket_start, snapshots, view_min, view_max, view_last, like_last
+                FROM video_metrics_hourly WHERE video_id = :video_id ORDER BY bucket_start
+            """), {"video_id": video_id}).fetchall()
+
+    def test_hourly_and_daily_buckets(self, two_hours_of_snapshots):
+        """Test min/max/last per bucket and daily totals built from hourly rows"""
+        video_id, base = two_hours_of_snapshots
+
+        with MetricsRollup() as rollup:
+            rollup.rollup(since=base)
+
+        hourly = self._hourly(video_id)
+        assert [(r.bucket_start, r.snapshots) for r in hourly] == [(base, 2), (base + timedelta(hours=1), 2)]
+        assert (hourly[0].view_min, hourly[0].view_max, hourly[0].view_last, hourly[0].like_last) == (1000, 1600, 1600, 12)
+        assert (hourly[1].view_min, hourly[1].view_max, hourly[1].view_last, hourly[1].like_last) == (2000, 4000, 4000, 20)
+
+        with SessionLocal() as session:
+            daily = session.execute(text("""
+                SELECT SUM(snapshots) AS snapshots, MIN(view_min) AS view_min, MAX(view_max) AS view_max
+                FROM video_metrics_daily WHERE video_id = :video_id
+            """), {"video_id": video_id}).one()
+        assert (daily.snapshots, daily.view_min, daily.view_max) == (4, 1000, 4000)
+
+    def test_rerun_is_idempotent(self, two_hours_of_snapshots):
+        """Test rolling up the same range twice does not double-count"""
+        video_id, base = two_hours_of_snapshots
+
+        with MetricsRollup() as rollup:
+            rollup.rollup(since=base)
+            rollup.rollup(since=base)
+
+        assert [r.snapshots for r in self._hourly(video_id)] == [2, 2]
+
+    def test_analyzer_reads_hourly_source(self, two_hours_of_snapshots):
+        """Test the analyzer computes velocity from each bucket's last snapshot"""
+        video_id, base = two_hours_of_snapshots
+
+        with MetricsRollup() as rollup:
+            rollup.rollup(since=base)
+        with VelocityAnalyzer(engine="vectorized") as analyzer:
+            results = analyzer.analyze_velocity(window_hours=6, top_n=10_000, source="hourly")
+
+        row = next(r for r in results if r["video_id"] == video_id)
+        # 1600 @ +35m -> 4000 @ +110m
+        assert row["views_per_min"] == pytest.approx(2400 / 75)
+        assert row["data_points"] == 2
+
+    def test_late_snapshots_behind_watermark_are_rolled_up(self, two_hours_of_snapshots):
+        """Test a snapshot committed after a later one was rolled up still reaches its bucket"""
+        video_id, base = two_hours_of_snapshots
+
+        with MetricsRollup() as rollup:
+            rollup.rollup(since=base)
+            _insert_snapshot(video_id, base + timedelta(minutes=125), 4500)
+            rollup.rollup()
+            _insert_snapshot(video_id, base + timedelta(minutes=115), 4200)
+            rollup.rollup()
+
+        assert [r.snapshots for r in self._hourly(video_id)] == [2, 3, 1]
+
+
+class TestCompaction:
+    """Test raw partitions are only dropped once every hour of them is rolled up"""
+
+    def test_keeps_day_below_watermark_until_rolled_up(self, expired_day):
+        """Test an old day the watermark has passed is kept until a rollup covers it"""
+        video_id, day = expired_day
+        base = datetime.now(timezone.utc) - timedelta(hours=3)
+
+        with MetricsRollup() as rollup:
+            rollup.rollup(since=base)
+            assert partition_name(day) not in rollup.compact(30)
+
+            rollup.rollup(since=datetime(day.year, day.month, day.day, tzinfo=timezone.utc))
+            assert partition_name(day) in rollup.compact(30)
+
+        with SessionLocal() as session:
+            assert partition_name(day) not in list_snapshot_partitions(session)
+            daily = session.execute(text("""
+                SELECT snapshots, view_min, view_last FROM video_metrics_daily WHERE video_id = :video_id
+            """), {"video_id": video_id}).one()
+        assert tuple(daily) == (2, 100, 400)
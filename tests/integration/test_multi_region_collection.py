@@ -0,0 +1,97 @@
+"""Tests for concurrent multi-region collection"""
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy import text
+
+from core.db import SessionLocal
+from collection.clients.youtube import YouTubeVideo
+from collection.jobs import collector_trending
+from collection.jobs.collector_trending import TrendingCollector
+from collection.quota import TokenBucket
+
+TEST_PREFIX = "multi_region_test_"
+
+REGION_VIDEOS = {
+    "KR": ["kr1", "shared"],
+    "US": ["us1", "shared"],
+    "JP": None,  # region failure
+}
+
+
+def _fake_fetch(self, country_code, limit, quota):
+    ids = REGION_VIDEOS[country_code]
+    quota[country_code] = 1
+    if ids is None:
+        raise RuntimeError("quota exceeded")
+    return [
+        YouTubeVideo(
+            video_id=f"{TEST_PREFIX}{video_id}", title=video_id, description="", channel="test_channel",
+            category="1", tags=[], country_code=country_code,
+            published_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+            view_count=100, like_count=1, comment_count=0
+        )
+        for video_id in ids
+    ]
+
+
+@pytest.fixture
+def fake_regions(monkeypatch):
+    monkeypatch.setattr(TrendingCollector, "_fetch_region", _fake_fetch)
+    yield
+    with SessionLocal() as session:
+        session.execute(text("DELETE FROM video_velocity_ewma WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.execute(text("DELETE FROM video_metrics_snapshot WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.execute(text("DELETE FROM videos WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.commit()
+
+
+class TestMultiRegionCollection:
+    """Test merged writes and per-region accounting"""
+
+    def test_partial_failure_still_stores_merged_batch(self, fake_regions):
+        """Test one failing region leaves the others stored once per video"""
+        with TrendingCollector() as collector:
+            summary = collector.collect_regions(["KR", "US", "JP"], limit=10, max_workers=3)
+
+        assert summary["regions"]["KR"] == {"status": "ok", "fetched": 2, "quota_units": 1}
+        assert summary["quota_units"] == 3
+        assert summary["regions"]["JP"]["status"] == "failed"
+        assert summary["regions_failed"] == ["JP"]
+        assert summary["fetched"] == 4
+        assert summary["unique_videos"] == 3
+        assert summary["snapshots"] == 3
+
+        with SessionLocal() as session:
+            rows = session.execute(text("""
+                SELECT v.video_id, v.country_code, COUNT(s.id) AS snapshots
+                FROM videos v LEFT JOIN video_metrics_snapshot s ON s.video_id = v.video_id
+                WHERE v.video_id LIKE :prefix
+                GROUP BY v.video_id, v.country_code
+            """), {"prefix": f"{TEST_PREFIX}%"}).fetchall()
+
+        by_id = {row.video_id: row for row in rows}
+        assert len(by_id) == 3
+        assert by_id[f"{TEST_PREFIX}shared"].country_code == "KR"
+        assert all(row.snapshots == 1 for row in rows)
+
+    def test_all_regions_failing_raises(self, fake_regions):
+        """Test the job fails loudly when nothing could be fetched"""
+        with TrendingCollector() as collector:
+            with pytest.raises(RuntimeError):
+                collector.collect_regions(["JP"], limit=10)
+
+    def test_short_budget_defers_regions(self, fake_regions, monkeypatch):
+        """Test regions beyond the remaining budget are deferred, not failed"""
+        monkeypatch.setattr(collector_trending, "get_quota_budget", lambda: TokenBucket(capacity=1, rate=0.001))
+        monkeypatch.setattr(TrendingCollector, "_region_activity", lambda self, regions, trace_id: {})
+
+        with TrendingCollector() as collector:
+            summary = collector.collect_regions(["KR", "US"], limit=10)
+
+        assert summary["regions_deferred"] == ["US"]
+        assert summary["regions"]["US"]["status"] == "deferred"
+        assert summary["regions_failed"] == []
+        assert summary["unique_videos"] == 2
@@ -0,0 +1,34 @@
+"""Tests for the runner's per-job advisory locks"""
+from sqlalchemy import text
+
+from core.db import engine
+from jobs import runner
+from jobs.runner import JOB_LOCK_NAMESPACE, job_lock, run_job
+
+
+class TestJobLock:
+    """Test a job runs on only one runner at a time"""
+
+    def test_locked_job_is_skipped(self, monkeypatch):
+        """Test a job another runner holds the lock for is skipped, then runs once released"""
+        calls = []
+        monkeypatch.setitem(runner.JOBS, "lock_test_probe", lambda: calls.append(1))
+        params = {"namespace": JOB_LOCK_NAMESPACE, "job": "lock_test_probe"}
+
+        with engine.connect() as other_runner:
+            other_runner.execute(text("SELECT pg_advisory_lock(:namespace, hashtext(:job))"), params)
+            assert run_job("lock_test_probe")["status"] == "locked"
+            other_runner.execute(text("SELECT pg_advisory_unlock(:namespace, hashtext(:job))"), params)
+
+        assert run_job("lock_test_probe")["status"] == "ok"
+        assert calls == [1]
+
+    def test_lock_released_after_failure(self, monkeypatch):
+        """Test a failing job does not keep its lock"""
+        def boom():
+            raise RuntimeError("boom")
+        monkeypatch.setitem(runner.JOBS, "lock_test_probe", boom)
+
+        assert run_job("lock_test_probe")["status"] == "failed"
+        with job_lock("lock_test_probe") as acquired:
+            assert acquired
@@ -0,0 +1,139 @@
+"""Tests for the historical snapshot backfill"""
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+
+from core.db import SessionLocal
+from core.partitions import list_snapshot_partitions, partition_name
+from collection.jobs import backfill_snapshots
+from collection.jobs.backfill_snapshots import backfill
+from analysis.jobs.rollup_metrics import MetricsRollup
+
+TEST_PREFIX = "backfill_test_"
+
+
+def _records(file_index: int, videos: int = 3, minutes: int = 10, base: datetime = None) -> list:
+    base = base or datetime.now(timezone.utc).replace(second=0, microsecond=0) - timedelta(days=2)
+    return [
+        {"video_id": f"{TEST_PREFIX}{file_index}_{v}", "captured_at": (base + timedelta(minutes=m)).isoformat(),
+         "view_count": m * 100, "like_count": m, "comment_count": None, "title": f"Backfill {v}",
+         "country_code": "KR"}
+        for m in range(minutes) for v in range(videos)
+    ]
+
+
+def _write_jsonl(path, records) -> str:
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    return str(path)
+
+
+def _write_csv(path, records) -> str:
+    columns = list(records[0])
+    lines = [",".join(columns)] + [",".join("" if r[c] is None else str(r[c]) for c in columns) for r in records]
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+@pytest.fixture
+def cleanup(tmp_path):
+    yield
+    with SessionLocal() as session:
+        for table in ("video_metrics_snapshot", "video_metrics_hourly", "video_metrics_daily"):
+            session.execute(text(f"DELETE FROM {table} WHERE video_id LIKE :prefix"),
+                            {"prefix": f"{TEST_PREFIX}%"})
+        session.execute(text("DELETE FROM videos WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.execute(text("DELETE FROM backfill_checkpoint WHERE source LIKE :prefix"),
+                        {"prefix": f"{tmp_path}%"})
+        session.commit()
+
+
+def _snapshot_count() -> int:
+    with SessionLocal() as session:
+        return session.execute(text("SELECT COUNT(*) FROM video_metrics_snapshot WHERE video_id LIKE :prefix"),
+                               {"prefix": f"{TEST_PREFIX}%"}).scalar()
+
+
+class TestSnapshotBackfill:
+    """Test dumps load once, resume after failures and scale out over processes"""
+
+    def test_loads_jsonl_and_csv_then_skips_on_rerun(self, tmp_path, cleanup):
+        """Test both formats load and a second run skips completed files"""
+        _write_jsonl(tmp_path / "a.jsonl", _records(0))
+        _write_csv(tmp_path / "b.csv", _records(1))
+
+        first = backfill([str(tmp_path)], workers=1, chunk_rows=7)
+        second = backfill([str(tmp_path)], workers=1, chunk_rows=7)
+
+        assert first["rows_read"] == 60
+        assert first["snapshots_inserted"] == 60
+        assert first["videos_inserted"] == 6
+        assert second["files_skipped"] == 2
+        assert second["rows_read"] == 0
+        assert _snapshot_count() == 60
+
+    def test_resumes_from_checkpoint(self, tmp_path, cleanup, monkeypatch):
+        """Test an interrupted file continues after its last committed chunk"""
+        _write_jsonl(tmp_path / "a.jsonl", _records(0))
+        insert_snapshots = backfill_snapshots.insert_snapshots
+        calls = []
+
+        def failing_insert(db, rows, method="auto"):
+            calls.append(len(rows))
+            if len(calls) == 3:
+                raise RuntimeError("connection lost")
+            return insert_snapshots(db, rows, method)
+
+        monkeypatch.setattr(backfill_snapshots, "insert_snapshots", failing_insert)
+        with pytest.raises(RuntimeError):
+            backfill([str(tmp_path)], workers=1, chunk_rows=10)
+        assert _snapshot_count() == 20
+
+        monkeypatch.setattr(backfill_snapshots, "insert_snapshots", insert_snapshots)
+        with backfill_snapshots.SnapshotBackfill(chunk_rows=10) as loader:
+            result = loader.load_file(str(tmp_path / "a.jsonl"))
+
+        assert result["resumed_at"] == 20
+        assert result["rows_read"] == 10
+        assert result["snapshots_inserted"] == 10
+        assert _snapshot_count() == 30
+
+    def test_parallel_workers(self, tmp_path, cleanup):
+        """Test files spread over worker processes load completely"""
+        for i in range(3):
+            _write_jsonl(tmp_path / f"{i}.jsonl", _records(i, videos=5, minutes=20))
+
+        summary = backfill([str(tmp_path)], workers=2, method="copy")
+
+        assert summary["files_loaded"] == 3
+        assert summary["snapshots_inserted"] == 300
+        assert summary["files_failed"] == {}
+        assert _snapshot_count() == 300
+
+    def test_backfilled_days_survive_compaction(self, tmp_path, cleanup):
+        """Test days past raw retention are rolled up by the backfill before compaction drops them"""
+        day = datetime.now(timezone.utc).date() - timedelta(days=40)
+        records = _records(0, base=datetime(day.year, day.month, day.day, 12, tzinfo=timezone.utc))
+        _write_jsonl(tmp_path / "old.jsonl", records)
+
+        try:
+            summary = backfill([str(tmp_path)], workers=1)
+            with MetricsRollup() as rollup:
+                rollup.rollup()
+                rollup.compact(30)
+
+            with SessionLocal() as session:
+                partitions = list_snapshot_partitions(session)
+                daily = session.execute(text("""
+                    SELECT video_id, snapshots, view_max FROM video_metrics_daily
+                    WHERE video_id LIKE :prefix ORDER BY video_id
+                """), {"prefix": f"{TEST_PREFIX}%"}).fetchall()
+        finally:
+            with SessionLocal() as session:
+                session.execute(text(f"DROP TABLE IF EXISTS {partition_name(day)}"))
+                session.commit()
+
+        assert summary["rolled_up_since"] == records[0]["captured_at"]
+        assert partition_name(day) not in partitions
+        assert [tuple(row) for row in daily] == [(f"{TEST_PREFIX}0_{v}", 10, 900) for v in range(3)]
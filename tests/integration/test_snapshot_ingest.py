@@ -0,0 +1,91 @@
+"""Tests for the INSERT and COPY snapshot ingest paths"""
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+
+from core.db import SessionLocal
+from collection import ingest
+from collection.ingest import insert_snapshots
+
+TEST_PREFIX = "ingest_test_"
+
+
+@pytest.fixture
+def ingest_videos():
+    """Two videos to hang snapshot rows off"""
+    with SessionLocal() as session:
+        for i in range(2):
+            session.execute(text("""
+                INSERT INTO videos (video_id, title, country_code) VALUES (:video_id, 'Ingest test', 'KR')
+                ON CONFLICT (video_id) DO NOTHING
+            """), {"video_id": f"{TEST_PREFIX}{i}"})
+        session.commit()
+
+    yield [f"{TEST_PREFIX}{i}" for i in range(2)]
+
+    with SessionLocal() as session:
+        session.execute(text("DELETE FROM video_metrics_snapshot WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.execute(text("DELETE FROM videos WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.commit()
+
+
+def _rows(video_ids, minutes: int) -> list:
+    base = datetime.now(timezone.utc).replace(second=0, microsecond=0) - timedelta(hours=1)
+    return [
+        {"video_id": video_id, "captured_at": base + timedelta(minutes=m),
+         "view_count": m * 10, "like_count": m, "comment_count": None}
+        for video_id in video_ids for m in range(minutes)
+    ]
+
+
+def _stored(video_ids) -> list:
+    with SessionLocal() as session:
+        return session.execute(text("""
+            SELECT video_id, captured_at, view_count, like_count, comment_count
+            FROM video_metrics_snapshot WHERE video_id = ANY(:ids) ORDER BY video_id, captured_at
+        """), {"ids": video_ids}).fetchall()
+
+
+class TestSnapshotIngest:
+    """Test both paths store identical rows and stay idempotent"""
+
+    def test_copy_matches_values(self, ingest_videos):
+        """Test COPY + merge stores exactly what INSERT ... VALUES stores"""
+        rows = _rows(ingest_videos[:1], 30)
+        copy_rows = [dict(row, video_id=ingest_videos[1]) for row in rows]
+
+        with SessionLocal() as session:
+            assert insert_snapshots(session, rows, method="values") == 30
+            assert insert_snapshots(session, copy_rows, method="copy") == 30
+            session.commit()
+
+        values_stored, copy_stored = _stored(ingest_videos[:1]), _stored(ingest_videos[1:])
+        assert [tuple(r)[1:] for r in values_stored] == [tuple(r)[1:] for r in copy_stored]
+
+    def test_copy_skips_existing_and_duplicate_rows(self, ingest_videos):
+        """Test re-ingesting overlapping rows inserts only the new ones"""
+        rows = _rows(ingest_videos, 10)
+
+        with SessionLocal() as session:
+            insert_snapshots(session, rows[:5], method="copy")
+            session.commit()
+            inserted = insert_snapshots(session, rows + rows[:3], method="copy")
+            session.commit()
+
+        assert inserted == len(rows) - 5
+        assert len(_stored(ingest_videos)) == len(rows)
+
+    def test_auto_switches_above_threshold(self, ingest_videos, monkeypatch):
+        """Test auto mode picks COPY only for large batches"""
+        calls = []
+        monkeypatch.setattr(ingest, "COPY_THRESHOLD", 10)
+        monkeypatch.setattr(ingest, "copy_snapshots", lambda db, rows: calls.append("copy") or 0)
+        monkeypatch.setattr(ingest, "insert_snapshots_values", lambda db, rows: calls.append("values") or 0)
+
+        with SessionLocal() as session:
+            insert_snapshots(session, _rows(ingest_videos[:1], 10))
+            insert_snapshots(session, _rows(ingest_videos[:1], 11))
+
+        assert calls == ["values", "copy"]
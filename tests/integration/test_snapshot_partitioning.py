@@ -0,0 +1,74 @@
+"""Tests for daily range partitioning of video_metrics_snapshot"""
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+
+from core.db import SessionLocal
+from core.partitions import ensure_snapshot_partitions, list_snapshot_partitions, partition_name, partition_day
+
+
+def _scanned_relations(plan: dict) -> set:
+    """Collect relation names from every node of a JSON plan"""
+    relations = set()
+    if "Relation Name" in plan:
+        relations.add(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        relations |= _scanned_relations(child)
+    return relations
+
+
+class TestSnapshotPartitioning:
+    """Test partitioned table layout and partition pruning"""
+
+    @pytest.fixture
+    def week_of_partitions(self):
+        """Make sure the last week and tomorrow have partitions"""
+        today = datetime.now(timezone.utc).date()
+        with SessionLocal() as session:
+            ensure_snapshot_partitions(session, today - timedelta(days=7), today + timedelta(days=1))
+            session.commit()
+        return today
+
+    def test_table_is_range_partitioned(self):
+        """Test parent table is declared PARTITION BY RANGE (captured_at)"""
+        with SessionLocal() as session:
+            partition_key = session.execute(text("""
+                SELECT pg_get_partkeydef('video_metrics_snapshot'::regclass)
+            """)).scalar_one()
+
+        assert partition_key == "RANGE (captured_at)"
+
+    def test_ensure_partitions_is_idempotent(self, week_of_partitions):
+        """Test re-running partition creation creates nothing new"""
+        today = week_of_partitions
+        with SessionLocal() as session:
+            created = ensure_snapshot_partitions(session, today - timedelta(days=7), today + timedelta(days=1))
+            session.commit()
+            partitions = list_snapshot_partitions(session)
+
+        assert created == []
+        assert partition_name(today) in partitions
+
+    def test_window_query_prunes_partitions(self, week_of_partitions):
+        """Test the analyzer time-window scan only touches recent partitions"""
+        with SessionLocal() as session:
+            plan = session.execute(text("""
+                EXPLAIN (FORMAT JSON)
+                SELECT video_id, captured_at, view_count
+                FROM video_metrics_snapshot
+                WHERE captured_at >= NOW() - INTERVAL '3 hours'
+                ORDER BY video_id, captured_at
+            """)).scalar_one()
+            partitions = set(list_snapshot_partitions(session))
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        scanned = _scanned_relations(plan[0]["Plan"]) & partitions
+        window_start_day = (datetime.now(timezone.utc) - timedelta(hours=3)).date()
+
+        # Partitions ending before the window are pruned at executor startup
+        assert scanned
+        assert len(scanned) < len(partitions)
+        assert all(partition_day(name) >= window_start_day for name in scanned)
+        assert partition_name(week_of_partitions - timedelta(days=7)) not in scanned
@@ -0,0 +1,197 @@
+"""Cross-check the in-database velocity engine against the pandas engines"""
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+
+from core.db import SessionLocal
+from analysis.jobs.analyzer_velocity import VelocityAnalyzer
+from analysis.velocity_state import VelocityStateStore
+
+TEST_PREFIX = "velocity_engine_test_"
+
+
+@pytest.fixture
+def seeded_snapshots():
+    """Insert a small snapshot history within the last hour"""
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    series = {
+        "fast": [1000, 4000, 9000],
+        "slow": [500, 510, 530],
+        "drop": [800, 700],
+        "single": [100],
+    }
+
+    with SessionLocal() as session:
+        for name, views in series.items():
+            video_id = f"{TEST_PREFIX}{name}"
+            session.execute(text("""
+                INSERT INTO videos (video_id, title, channel, country_code)
+                VALUES (:video_id, :title, 'test_channel', 'KR')
+                ON CONFLICT (video_id) DO NOTHING
+            """), {"video_id": video_id, "title": f"Test {name}"})
+            for i, view_count in enumerate(views):
+                session.execute(text("""
+                    INSERT INTO video_metrics_snapshot (video_id, captured_at, view_count, like_count, comment_count)
+                    VALUES (:video_id, :captured_at, :view_count, 0, 0)
+                    ON CONFLICT (video_id, captured_at) DO NOTHING
+                """), {
+                    "video_id": video_id,
+                    "captured_at": now - timedelta(minutes=10 * (len(views) - i)),
+                    "view_count": view_count
+                })
+        session.commit()
+
+    yield
+
+    with SessionLocal() as session:
+        for table in ("video_velocity_bucket", "video_velocity_state", "video_metrics_snapshot"):
+            session.execute(text(f"DELETE FROM {table} WHERE video_id LIKE :prefix"),
+                            {"prefix": f"{TEST_PREFIX}%"})
+        session.execute(text("DELETE FROM videos WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.commit()
+
+
+class TestVelocityEngineParity:
+    """SQL window-function engine must match the DataFrame engines"""
+
+    @pytest.mark.parametrize("engine", ["loop", "vectorized", "streaming"])
+    def test_sql_engine_matches_dataframe_engine(self, seeded_snapshots, engine):
+        """Test both paths return the same ranking and values"""
+        with VelocityAnalyzer(engine="sql") as analyzer:
+            sql_results = analyzer.analyze_velocity(window_hours=3, top_n=10_000)
+        with VelocityAnalyzer(engine=engine) as analyzer:
+            df_results = analyzer.analyze_velocity(window_hours=3, top_n=10_000)
+
+        assert [r["video_id"] for r in sql_results] == [r["video_id"] for r in df_results]
+        for sql_row, df_row in zip(sql_results, df_results):
+            assert sql_row["views_per_min"] == pytest.approx(float(df_row["views_per_min"]))
+            assert sql_row["data_points"] == df_row["data_points"]
+            assert sql_row["valid_intervals"] == df_row["valid_intervals"]
+
+    @pytest.mark.parametrize("top_n", [1, 2])
+    @pytest.mark.parametrize("engine", ["streaming", "incremental"])
+    def test_chunked_ranking_matches_sql_engine(self, seeded_snapshots, engine, top_n):
+        """Test ranking chunk by chunk keeps the same top N as ranking every video at once"""
+        with VelocityAnalyzer(engine="sql") as analyzer:
+            sql_results = analyzer.analyze_velocity(window_hours=3, top_n=top_n)
+        with VelocityAnalyzer(engine=engine, chunk_size=2) as analyzer:
+            chunked_results = analyzer.analyze_velocity(window_hours=3, top_n=top_n)
+
+        assert [r["video_id"] for r in chunked_results] == [r["video_id"] for r in sql_results]
+        for sql_row, chunked_row in zip(sql_results, chunked_results):
+            assert chunked_row["views_per_min"] == pytest.approx(sql_row["views_per_min"])
+
+    def test_sql_engine_excludes_invalid_series(self, seeded_snapshots):
+        """Test single-snapshot and decreasing series are not ranked"""
+        with VelocityAnalyzer(engine="sql") as analyzer:
+            results = analyzer.analyze_velocity(window_hours=3, top_n=10_000)
+
+        ranked = {r["video_id"] for r in results}
+        assert f"{TEST_PREFIX}fast" in ranked
+        assert f"{TEST_PREFIX}drop" not in ranked
+        assert f"{TEST_PREFIX}single" not in ranked
+
+
+class TestIncrementalVelocityState:
+    """Incremental engine persists state and matches a full recompute"""
+
+    @pytest.fixture
+    def fresh_watermark(self):
+        """Reset the analyzer watermark and the test videos' state so the test batch is picked up"""
+        with SessionLocal() as session:
+            session.execute(text("DELETE FROM analyzer_watermark WHERE name = 'analyzer_velocity'"))
+            for table in ("video_velocity_bucket", "video_velocity_state"):
+                session.execute(text(f"DELETE FROM {table} WHERE video_id LIKE :prefix"),
+                                {"prefix": f"{TEST_PREFIX}%"})
+            session.commit()
+
+    def test_incremental_matches_full_recompute(self, fresh_watermark, seeded_snapshots):
+        """Test incremental results equal the vectorized engine for in-window data"""
+        with VelocityAnalyzer(engine="incremental") as analyzer:
+            incremental = analyzer.analyze_velocity(window_hours=3, top_n=10_000)
+        with VelocityAnalyzer(engine="vectorized") as analyzer:
+            full = analyzer.analyze_velocity(window_hours=3, top_n=10_000)
+
+        incremental_by_id = {r["video_id"]: r for r in incremental if r["video_id"].startswith(TEST_PREFIX)}
+        full_by_id = {r["video_id"]: r for r in full if r["video_id"].startswith(TEST_PREFIX)}
+
+        assert incremental_by_id.keys() == full_by_id.keys()
+        for video_id, row in full_by_id.items():
+            assert incremental_by_id[video_id]["data_points"] == row["data_points"]
+            assert incremental_by_id[video_id]["valid_intervals"] == row["valid_intervals"]
+            assert incremental_by_id[video_id]["views_per_min"] == pytest.approx(float(row["views_per_min"]))
+
+    def test_watermark_survives_new_session(self, fresh_watermark, seeded_snapshots):
+        """Test a second store instance resumes from the persisted watermark"""
+        with SessionLocal() as session:
+            processed = VelocityStateStore(session).refresh("test_trace")
+        assert processed > 0
+
+        with SessionLocal() as session:
+            assert VelocityStateStore(session).refresh("test_trace") == 0
+            watermark = session.execute(text(
+                "SELECT watermark FROM analyzer_watermark WHERE name = 'analyzer_velocity'"
+            )).scalar_one()
+            seeded_latest = session.execute(text(
+                "SELECT MAX(captured_at) FROM video_metrics_snapshot WHERE video_id LIKE :prefix"
+            ), {"prefix": f"{TEST_PREFIX}%"}).scalar_one()
+            state_latest = session.execute(text(
+                "SELECT MAX(last_captured_at) FROM video_velocity_state WHERE video_id LIKE :prefix"
+            ), {"prefix": f"{TEST_PREFIX}%"}).scalar_one()
+
+        assert watermark >= seeded_latest
+        assert state_latest == seeded_latest
+
+    def test_late_snapshots_below_watermark_are_folded_in(self, fresh_watermark, seeded_snapshots):
+        """Test rows committed after the watermark passed their capture time still reach the buckets"""
+        with SessionLocal() as session:
+            VelocityStateStore(session).refresh("test_trace")
+            watermark = session.execute(text(
+                "SELECT watermark FROM analyzer_watermark WHERE name = 'analyzer_velocity'"
+            )).scalar_one()
+
+            video_id = f"{TEST_PREFIX}late"
+            session.execute(text("""
+                INSERT INTO videos (video_id, title, channel, country_code)
+                VALUES (:video_id, 'Test late', 'test_channel', 'KR')
+            """), {"video_id": video_id})
+            for minutes, view_count in ((15, 100), (5, 300)):
+                session.execute(text("""
+                    INSERT INTO video_metrics_snapshot (video_id, captured_at, view_count, like_count, comment_count)
+                    VALUES (:video_id, :captured_at, :view_count, 0, 0)
+                """), {"video_id": video_id, "captured_at": watermark - timedelta(minutes=minutes),
+                       "view_count": view_count})
+            session.commit()
+
+            assert VelocityStateStore(session).refresh("test_trace") == 2
+            buckets = session.execute(text("""
+                SELECT SUM(snapshots), SUM(valid_intervals), MAX(max_views_per_min)
+                FROM video_velocity_bucket WHERE video_id = :video_id
+            """), {"video_id": video_id}).one()
+            assert VelocityStateStore(session).refresh("test_trace") == 0
+
+        assert tuple(buckets) == (2, 1, pytest.approx(20.0))
+
+
+class TestAnalyzerScores:
+    """Test ranking by a score other than velocity"""
+
+    def test_acceleration_ranking(self, seeded_snapshots):
+        """Test results carry the score and only videos with two intervals are ranked"""
+        with VelocityAnalyzer(engine="vectorized") as analyzer:
+            results = analyzer.analyze_velocity(window_hours=3, top_n=10_000, score="acceleration")
+
+        ours = [r for r in results if r["video_id"].startswith(TEST_PREFIX)]
+        assert {r["video_id"] for r in ours} == {f"{TEST_PREFIX}fast", f"{TEST_PREFIX}slow"}
+        # fast: 300 -> 500 views/min over 10 minutes
+        fast = next(r for r in ours if r["video_id"] == f"{TEST_PREFIX}fast")
+        assert fast["score"] == pytest.approx(20.0)
+        assert [r["score"] for r in results] == sorted((r["score"] for r in results), reverse=True)
+
+    @pytest.mark.parametrize("engine", ["sql", "incremental", "streaming"])
+    def test_score_needs_dataframe_engine(self, engine):
+        """Test series scores are rejected on engines that never see the whole series"""
+        with VelocityAnalyzer(engine=engine) as analyzer:
+            with pytest.raises(ValueError):
+                analyzer.analyze_velocity(window_hours=3, score="anomaly")
@@ -0,0 +1,129 @@
+"""Online EWMA velocity estimates folded in by the collectors"""
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+
+from core.db import SessionLocal
+from analysis.jobs.analyzer_velocity import VelocityAnalyzer
+from analysis.velocity_ewma import top_ewma_velocity, update_velocity_ewma
+
+TEST_PREFIX = "velocity_ewma_test_"
+
+
+def _rows(series, now):
+    """Snapshot rows from {name: [view counts]} taken every 10 minutes up to `now`"""
+    return [
+        {"video_id": f"{TEST_PREFIX}{name}", "captured_at": now - timedelta(minutes=10 * (len(views) - 1 - i)),
+         "view_count": views_at}
+        for name, views in series.items() for i, views_at in enumerate(views)
+    ]
+
+
+def _estimates(session):
+    rows = session.execute(text("""
+        SELECT video_id, views_per_min, samples, last_view_count FROM video_velocity_ewma
+        WHERE video_id LIKE :prefix
+    """), {"prefix": f"{TEST_PREFIX}%"}).fetchall()
+    return {row.video_id[len(TEST_PREFIX):]: row for row in rows}
+
+
+@pytest.fixture
+def test_videos():
+    """Video rows for the estimates to reference"""
+    names = ("fast", "slow", "single")
+    with SessionLocal() as session:
+        for name in names:
+            session.execute(text("""
+                INSERT INTO videos (video_id, title, channel, country_code)
+                VALUES (:video_id, :title, 'test_channel', 'KR')
+                ON CONFLICT (video_id) DO NOTHING
+            """), {"video_id": f"{TEST_PREFIX}{name}", "title": f"Test {name}"})
+        session.commit()
+
+    yield
+
+    with SessionLocal() as session:
+        for table in ("video_velocity_ewma", "videos"):
+            session.execute(text(f"DELETE FROM {table} WHERE video_id LIKE :prefix"),
+                            {"prefix": f"{TEST_PREFIX}%"})
+        session.commit()
+
+
+class TestUpdateVelocityEwma:
+    """Test folding snapshot rows into persisted estimates"""
+
+    def test_batch_matches_one_row_at_a_time(self, test_videos):
+        """Test a multi-snapshot batch gives the same estimate as separate writes"""
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        rows = _rows({"fast": [1000, 4000, 9000]}, now)
+
+        with SessionLocal() as session:
+            update_velocity_ewma(session, rows)
+            session.commit()
+            batched = _estimates(session)["fast"]
+            session.execute(text("DELETE FROM video_velocity_ewma WHERE video_id LIKE :prefix"),
+                            {"prefix": f"{TEST_PREFIX}%"})
+            for row in rows:
+                update_velocity_ewma(session, [row])
+            session.commit()
+            separate = _estimates(session)["fast"]
+
+        assert batched.samples == separate.samples == 2
+        assert batched.last_view_count == 9000
+        assert batched.views_per_min == pytest.approx(separate.views_per_min)
+        # 300 then 500 views/min, the second weighted by 1 - 2^(-10/60)
+        assert 300 < batched.views_per_min < 500
+
+    def test_replay_is_idempotent(self, test_videos):
+        """Test writing the same snapshots twice leaves the estimates unchanged"""
+        rows = _rows({"fast": [1000, 4000], "slow": [500, 510]}, datetime.now(timezone.utc))
+
+        with SessionLocal() as session:
+            assert update_velocity_ewma(session, rows) == 4
+            session.commit()
+            before = _estimates(session)
+            assert update_velocity_ewma(session, rows) == 0
+            session.commit()
+            assert _estimates(session) == before
+
+
+class TestTopEwmaVelocity:
+    """Test the top-N read of current estimates"""
+
+    def test_ranks_by_estimate(self, test_videos):
+        """Test videos are ranked by estimate and ones without an interval are left out"""
+        now = datetime.now(timezone.utc)
+        with SessionLocal() as session:
+            update_velocity_ewma(session, _rows({"fast": [1000, 4000], "slow": [500, 510], "single": [100]}, now))
+            session.commit()
+            results = [r for r in top_ewma_velocity(session, top_n=10_000) if r["video_id"].startswith(TEST_PREFIX)]
+
+        assert [r["video_id"] for r in results] == [f"{TEST_PREFIX}fast", f"{TEST_PREFIX}slow"]
+        assert results[0]["views_per_min"] == pytest.approx(300.0)
+        assert results[0]["data_points"] == 2
+        assert results[0]["valid_intervals"] == 1
+
+    def test_stale_estimates_left_out(self, test_videos):
+        """Test estimates not refreshed within max_age_hours are not ranked"""
+        old = datetime.now(timezone.utc) - timedelta(hours=5)
+        with SessionLocal() as session:
+            update_velocity_ewma(session, _rows({"fast": [1000, 4000]}, old))
+            session.commit()
+            recent = top_ewma_velocity(session, top_n=10_000, max_age_hours=3)
+            wide = top_ewma_velocity(session, top_n=10_000, max_age_hours=6)
+
+        assert f"{TEST_PREFIX}fast" not in {r["video_id"] for r in recent}
+        assert f"{TEST_PREFIX}fast" in {r["video_id"] for r in wide}
+
+    def test_analyzer_ewma_engine(self, test_videos):
+        """Test the analyzer serves the estimates with the other engines' result keys"""
+        with SessionLocal() as session:
+            update_velocity_ewma(session, _rows({"fast": [1000, 4000]}, datetime.now(timezone.utc)))
+            session.commit()
+
+        with VelocityAnalyzer(engine="ewma") as analyzer:
+            results = analyzer.analyze_velocity(window_hours=3, top_n=10_000)
+
+        fast = next(r for r in results if r["video_id"] == f"{TEST_PREFIX}fast")
+        assert fast["views_per_min"] == pytest.approx(300.0)
+        assert fast["title"] == "Test fast"
@@ -0,0 +1,125 @@
+"""Tests for change-detecting video upserts and the combined write path"""
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy import text
+
+from core.db import SessionLocal
+from collection.clients.youtube import YouTubeVideo
+from collection.jobs import collector_trending
+from collection.jobs.collector_trending import TrendingCollector
+
+TEST_PREFIX = "upsert_change_test_"
+
+
+def _videos(title_suffix: str = "", count: int = 3) -> list:
+    return [
+        YouTubeVideo(
+            video_id=f"{TEST_PREFIX}{i}", title=f"Video {i}{title_suffix if i == 0 else ''}",
+            description="long description " * 20, channel="test_channel", category="22",
+            tags=["a", "b"], country_code="KR", published_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+            view_count=100 * i, like_count=i, comment_count=0
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def cleanup():
+    yield
+    with SessionLocal() as session:
+        session.execute(text("DELETE FROM video_velocity_ewma WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.execute(text("DELETE FROM video_metrics_snapshot WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.execute(text("DELETE FROM videos WHERE video_id LIKE :prefix"),
+                        {"prefix": f"{TEST_PREFIX}%"})
+        session.commit()
+
+
+def _row_versions() -> dict:
+    with SessionLocal() as session:
+        rows = session.execute(text("SELECT video_id, xmin::text AS xmin FROM videos WHERE video_id LIKE :prefix"),
+                               {"prefix": f"{TEST_PREFIX}%"}).fetchall()
+    return {row.video_id: row.xmin for row in rows}
+
+
+def _stored_ids(table: str) -> set:
+    with SessionLocal() as session:
+        rows = session.execute(text(f"SELECT DISTINCT video_id FROM {table} WHERE video_id LIKE :prefix"),
+                               {"prefix": f"{TEST_PREFIX}%"}).fetchall()
+    return {row.video_id for row in rows}
+
+
+def _changes(summary: dict) -> dict:
+    return {key: summary[key] for key in ("videos_inserted", "videos_updated", "videos_unchanged")}
+
+
+class TestVideoUpsertChanges:
+    """Test unchanged videos are not rewritten and counts are reported"""
+
+    def test_insert_then_unchanged_then_updated(self, cleanup):
+        """Test counters across a fresh, a repeated and a changed upsert"""
+        with TrendingCollector() as collector:
+            first = _changes(collector._store_batch(_videos(), "test"))
+            versions = _row_versions()
+            second = _changes(collector._store_batch(_videos(), "test"))
+            unchanged_versions = _row_versions()
+            third = _changes(collector._store_batch(_videos(" (edited)"), "test"))
+
+        assert first == {"videos_inserted": 3, "videos_updated": 0, "videos_unchanged": 0}
+        assert second == {"videos_inserted": 0, "videos_updated": 0, "videos_unchanged": 3}
+        assert third == {"videos_inserted": 0, "videos_updated": 1, "videos_unchanged": 2}
+        # No new tuple versions were written for the no-op run
+        assert unchanged_versions == versions
+
+    def test_videos_and_snapshots_commit_together(self, cleanup):
+        """Test one call stores both tables and reports both counts"""
+        with TrendingCollector() as collector:
+            summary = collector._store_batch(_videos(), "test")
+
+        assert summary["upserts"] == 3
+        assert summary["snapshots"] == 3
+        assert summary["failed_batches"] == 0
+        assert _stored_ids("videos") == _stored_ids("video_metrics_snapshot")
+
+    def test_failed_batch_falls_back_to_savepoints(self, cleanup, monkeypatch):
+        """Test a failing write only loses its own savepoint batch, videos and snapshots alike"""
+        bad_id = f"{TEST_PREFIX}3"
+        insert_snapshots = collector_trending.insert_snapshots
+
+        def failing_insert(db, rows, method="auto"):
+            if any(row["video_id"] == bad_id for row in rows):
+                raise RuntimeError("snapshot insert failed")
+            return insert_snapshots(db, rows, method)
+
+        monkeypatch.setattr(collector_trending, "FALLBACK_BATCH_SIZE", 2)
+        monkeypatch.setattr(collector_trending, "insert_snapshots", failing_insert)
+
+        with TrendingCollector() as collector:
+            summary = collector._store_batch(_videos(count=5), "test")
+
+        expected = {f"{TEST_PREFIX}{i}" for i in (0, 1, 4)}
+        assert summary["failed_batches"] == 1
+        assert summary["errors"] == 2
+        assert summary["upserts"] == 3
+        assert summary["snapshots_inserted"] == 3
+        assert _stored_ids("videos") == expected
+        assert _stored_ids("video_metrics_snapshot") == expected
+
+    def test_duplicate_videos_in_batch(self, cleanup):
+        """Test a video listed twice is written once"""
+        videos = _videos()
+        with TrendingCollector() as collector:
+            summary = collector._store_batch(videos + videos[:1], "test")
+
+        assert summary["upserts"] == 3
+        assert summary["failed_batches"] == 0
+
+    def test_store_batch_reports_changes(self, cleanup):
+        """Test the multi-region write path reports the same counters"""
+        with TrendingCollector() as collector:
+            collector._store_batch(_videos(), "test")
+            summary = collector._store_batch(_videos(" (edited)"), "test")
+
+        assert summary["videos_updated"] == 1
+        assert summary["videos_unchanged"] == 2
@@ -151,4 +151,212 @@ class TestVelocityCalculation:
         # Should handle extreme but valid values
         assert len(valid_df) == 2
         assert all(np.isfinite(valid_df['views_per_min']))
-        assert all(valid_df['views_per_min'] >= 0)
\ No newline at end of file
+        assert all(valid_df['views_per_min'] >= 0)
+
+class TestVectorizedVelocityEngine:
+    """Parity between the vectorized engine and the per-video loop"""
+
+    @staticmethod
+    def _with_metadata(df):
+        df = df.copy()
+        df['title'] = "title_" + df['video_id']
+        df['channel'] = "channel_" + df['video_id']
+        return df
+
+    @staticmethod
+    def _assert_parity(df):
+        from analysis.velocity import calculate_velocity_loop, calculate_velocity_vectorized
+
+        expected = calculate_velocity_loop(df).reset_index(drop=True)
+        actual = calculate_velocity_vectorized(df).reset_index(drop=True)
+
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+    def test_parity_on_edge_cases(self, sample_velocity_data):
+        """Test both engines agree on Δt=0, negative delta and outlier cases"""
+        self._assert_parity(self._with_metadata(sample_velocity_data))
+
+    def test_parity_on_random_unsorted_data(self):
+        """Test both engines agree on shuffled data with gaps and NULL views"""
+        rng = np.random.default_rng(42)
+        rows = []
+        for i in range(200):
+            points = rng.integers(1, 8)
+            minutes = np.sort(rng.choice(600, size=points, replace=False))
+            views = np.cumsum(rng.integers(-50, 500, size=points)) + 10_000
+            for minute, view_count in zip(minutes, views):
+                rows.append({
+                    "video_id": f"v{i:03d}",
+                    "captured_at": pd.Timestamp("2025-01-01", tz="UTC") + pd.Timedelta(minutes=int(minute)),
+                    "view_count": float(view_count) if rng.random() > 0.05 else np.nan,
+                })
+
+        df = pd.DataFrame(rows).sample(frac=1.0, random_state=7)
+        self._assert_parity(self._with_metadata(df))
+
+    def test_expected_values(self, sample_velocity_data):
+        """Test vectorized engine output for the shared fixture"""
+        from analysis.velocity import calculate_velocity_vectorized
+
+        result = calculate_velocity_vectorized(self._with_metadata(sample_velocity_data))
+        by_video = result.set_index('video_id')
+
+        assert list(by_video.index) == ['v1', 'v4']
+        assert by_video.loc['v1', 'views_per_min'] == 150.0
+        assert by_video.loc['v1', 'data_points'] == 3
+        assert by_video.loc['v1', 'valid_intervals'] == 2
+        assert by_video.loc['v4', 'views_per_min'] == 99900.0
+
+    def test_empty_input(self):
+        """Test vectorized engine on an empty frame"""
+        from analysis.velocity import calculate_velocity_vectorized
+
+        empty_df = pd.DataFrame(columns=['video_id', 'captured_at', 'view_count', 'title', 'channel'])
+        assert calculate_velocity_vectorized(empty_df).empty
+
+    def test_unknown_engine_rejected(self, sample_velocity_data):
+        """Test dispatcher rejects unknown engine names"""
+        from analysis.velocity import calculate_velocity
+
+        with pytest.raises(ValueError):
+            calculate_velocity(sample_velocity_data, engine="gpu")
+
+
+class TestIncrementalVelocityState:
+    """Incremental bucket state must match a full recompute"""
+
+    @staticmethod
+    def _random_snapshots(seed=3, videos=60, hours=10):
+        rng = np.random.default_rng(seed)
+        rows = []
+        for i in range(videos):
+            minutes = np.sort(rng.choice(hours * 60, size=rng.integers(1, 12), replace=False))
+            views = np.cumsum(rng.integers(-20, 900, size=len(minutes))) + 5_000
+            for minute, view_count in zip(minutes, views):
+                rows.append({
+                    "video_id": f"v{i:02d}",
+                    "captured_at": pd.Timestamp("2025-01-01", tz="UTC") + pd.Timedelta(minutes=int(minute)),
+                    "view_count": int(view_count),
+                })
+        df = pd.DataFrame(rows)
+        df['title'] = "t"
+        df['channel'] = "c"
+        return df
+
+    @staticmethod
+    def _merge_buckets(existing, new):
+        """Mirror the ON CONFLICT merge applied in the database"""
+        if existing is None:
+            return new
+        merged = pd.concat([existing, new], ignore_index=True)
+        return merged.groupby(['video_id', 'bucket_start'], as_index=False).agg(
+            snapshots=('snapshots', 'sum'),
+            valid_intervals=('valid_intervals', 'sum'),
+            max_views_per_min=('max_views_per_min', 'max'),
+        )
+
+    def test_batches_match_full_recompute(self):
+        """Test three incremental batches aggregate to the full result for aligned windows"""
+        from analysis.velocity import bucket_velocity, aggregate_buckets, calculate_velocity_vectorized
+
+        df = self._random_snapshots()
+        start = pd.Timestamp("2025-01-01", tz="UTC")
+        watermarks = [start + pd.Timedelta(minutes=m) for m in (0, 185, 421, 600)]
+
+        buckets = None
+        state = pd.DataFrame(columns=['video_id', 'last_captured_at', 'last_view_count'])
+        for low, high in zip(watermarks[:-1], watermarks[1:]):
+            batch = df[(df['captured_at'] >= low) & (df['captured_at'] < high)]
+            new_buckets, new_state = bucket_velocity(batch, state)
+            buckets = self._merge_buckets(buckets, new_buckets)
+            kept = state[~state['video_id'].isin(new_state['video_id'])]
+            state = pd.concat([kept, new_state]) if not kept.empty else new_state
+
+        for window_start_hour in (0, 2, 5, 8):
+            cutoff = start + pd.Timedelta(hours=window_start_hour)
+            expected = calculate_velocity_vectorized(df[df['captured_at'] >= cutoff])
+            actual = aggregate_buckets(buckets[buckets['bucket_start'] >= cutoff])
+
+            pd.testing.assert_frame_equal(
+                actual[['video_id', 'views_per_min', 'data_points', 'valid_intervals']],
+                expected[['video_id', 'views_per_min', 'data_points', 'valid_intervals']].reset_index(drop=True),
+                check_dtype=False
+            )
+
+    def test_state_carries_interval_across_batches(self):
+        """Test first interval of a batch uses the stored last snapshot"""
+        from analysis.velocity import bucket_velocity
+
+        state = pd.DataFrame([{
+            "video_id": "v1",
+            "last_captured_at": datetime(2025, 1, 1, 10, 0, tzinfo=timezone.utc),
+            "last_view_count": 1000,
+        }])
+        batch = pd.DataFrame([
+            {"video_id": "v1", "captured_at": datetime(2025, 1, 1, 11, 0, tzinfo=timezone.utc), "view_count": 7000},
+        ])
+
+        buckets, new_state = bucket_velocity(batch, state)
+        by_bucket = buckets.set_index('bucket_start')
+
+        assert by_bucket.loc[pd.Timestamp("2025-01-01 10:00", tz="UTC"), 'max_views_per_min'] == 100.0
+        assert by_bucket.loc[pd.Timestamp("2025-01-01 10:00", tz="UTC"), 'snapshots'] == 0
+        assert by_bucket.loc[pd.Timestamp("2025-01-01 11:00", tz="UTC"), 'snapshots'] == 1
+        assert new_state.iloc[0]['last_view_count'] == 7000
+
+    def test_empty_batch(self):
+        """Test empty batch produces no buckets and no state"""
+        from analysis.velocity import bucket_velocity
+
+        buckets, new_state = bucket_velocity(
+            pd.DataFrame(columns=['video_id', 'captured_at', 'view_count']),
+            pd.DataFrame(columns=['video_id', 'last_captured_at', 'last_view_count'])
+        )
+        assert buckets.empty and new_state.empty
+
+
+class TestStreamingVelocityAccumulator:
+    """Chunked accumulation must match the single-pass vectorized engine"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 7, 1000])
+    def test_chunked_matches_vectorized(self, chunk_size):
+        """Test any chunk size reproduces the full result, including split videos"""
+        from analysis.velocity import VelocityAccumulator, calculate_velocity_vectorized
+
+        df = TestIncrementalVelocityState._random_snapshots(seed=11, videos=40)
+        df = df.sort_values(['video_id', 'captured_at']).reset_index(drop=True)
+
+        accumulator = VelocityAccumulator()
+        for start in range(0, len(df), chunk_size):
+            accumulator.add_chunk(df.iloc[start:start + chunk_size])
+
+        pd.testing.assert_frame_equal(
+            accumulator.result(),
+            calculate_velocity_vectorized(df).reset_index(drop=True),
+            check_dtype=False
+        )
+        assert accumulator.rows == len(df)
+
+    def test_no_chunks(self):
+        """Test accumulator without input returns an empty frame"""
+        from analysis.velocity import VelocityAccumulator
+
+        assert VelocityAccumulator().result().empty
+
+    def test_handed_back_without_keeping(self):
+        """Test keep=False hands back each batch of completed videos and holds none of them"""
+        from analysis.velocity import VelocityAccumulator, calculate_velocity_vectorized
+
+        df = TestIncrementalVelocityState._random_snapshots(seed=12, videos=20)
+        df = df.sort_values(['video_id', 'captured_at']).reset_index(drop=True)
+
+        accumulator = VelocityAccumulator(keep=False)
+        batches = [accumulator.add_chunk(df.iloc[start:start + 9]) for start in range(0, len(df), 9)]
+        batches.append(accumulator.flush())
+
+        pd.testing.assert_frame_equal(
+            pd.concat(batches, ignore_index=True),
+            calculate_velocity_vectorized(df).reset_index(drop=True),
+            check_dtype=False
+        )
+        assert accumulator.result().empty
@@ -0,0 +1,71 @@
+"""Unit tests for backfill dump discovery and row parsing"""
+import pytest
+import pandas as pd
+from datetime import datetime, timezone
+
+from collection.jobs.backfill_snapshots import discover_files, file_format, frame_rows, read_chunks
+
+
+class TestDumpFiles:
+    """Test dump formats are recognized and read in chunks"""
+
+    @pytest.mark.parametrize("name,expected", [
+        ("day.jsonl", "jsonl"),
+        ("day.ndjson.gz", "jsonl"),
+        ("day.CSV", "csv"),
+        ("day.csv.gz", "csv"),
+        ("day.parquet", "parquet"),
+        ("day.parquet.gz", None),
+        ("notes.txt", None),
+    ])
+    def test_file_format(self, name, expected):
+        """Test formats come from the extension, gzip allowed for text dumps"""
+        assert file_format(name) == expected
+
+    def test_discover_expands_directories(self, tmp_path):
+        """Test directories are walked in order and unknown files ignored"""
+        for name in ("b.csv", "a.jsonl", "readme.md"):
+            (tmp_path / name).write_text("")
+
+        assert discover_files([str(tmp_path)]) == [str(tmp_path / "a.jsonl"), str(tmp_path / "b.csv")]
+        with pytest.raises(ValueError):
+            discover_files([str(tmp_path / "readme.md")])
+
+    def test_read_chunks_keeps_ids_as_strings(self, tmp_path):
+        """Test numeric-looking video ids survive CSV and JSONL parsing"""
+        (tmp_path / "d.csv").write_text("video_id,captured_at,view_count\n007,2025-01-01T00:00:00Z,1\n"
+                                        "008,2025-01-01T00:01:00Z,2\n009,2025-01-01T00:02:00Z,3\n")
+        (tmp_path / "d.jsonl").write_text('{"video_id": "007", "captured_at": "2025-01-01T00:00:00Z"}\n')
+
+        chunks = list(read_chunks(str(tmp_path / "d.csv"), chunk_rows=2))
+        assert [len(chunk) for chunk in chunks] == [2, 1]
+        assert list(chunks[0]["video_id"]) == ["007", "008"]
+        assert list(next(read_chunks(str(tmp_path / "d.jsonl"), 10))["video_id"]) == ["007"]
+
+
+class TestFrameRows:
+    """Test dump rows are split into video and snapshot rows"""
+
+    def test_rows_and_invalid_counts(self):
+        """Test invalid rows are dropped and the first row's metadata wins"""
+        frame = pd.DataFrame({
+            "video_id": ["b", "a", "b", None, "c"],
+            "captured_at": ["2025-01-01T00:00:00", "2025-01-01T00:00:00+09:00", "2025-01-01T01:00:00Z",
+                            "2025-01-01T00:00:00Z", "not a time"],
+            "view_count": [1, 2, None, 4, 5],
+            "title": ["B", "A", "B2", "X", "C"],
+            "tags": ['["x", "y"]', None, None, None, None],
+        })
+
+        video_rows, snapshot_rows, errors = frame_rows(frame)
+
+        assert errors == 2
+        assert [row["video_id"] for row in video_rows] == ["a", "b"]
+        assert video_rows[1] == {"video_id": "b", "title": "B", "tags": ["x", "y"]}
+        assert snapshot_rows[0] == {
+            "video_id": "b", "captured_at": datetime(2025, 1, 1, tzinfo=timezone.utc),
+            "view_count": 1, "like_count": None, "comment_count": None
+        }
+        # Offsets are normalized to UTC, missing counts become NULL
+        assert snapshot_rows[1]["captured_at"] == datetime(2024, 12, 31, 15, tzinfo=timezone.utc)
+        assert snapshot_rows[2]["view_count"] is None
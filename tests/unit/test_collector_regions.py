@@ -0,0 +1,35 @@
+"""Unit tests for merging multi-region trending results"""
+from datetime import datetime, timezone
+
+from collection.clients.youtube import YouTubeVideo
+from collection.jobs.collector_trending import merge_region_videos
+
+
+def _video(video_id: str, region: str) -> YouTubeVideo:
+    return YouTubeVideo(
+        video_id=video_id, title=video_id, description="", channel="c", category="1", tags=[],
+        country_code=region, published_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        view_count=1, like_count=0, comment_count=0
+    )
+
+
+class TestMergeRegionVideos:
+    """Test videos trending in several regions are stored once"""
+
+    def test_first_region_wins(self):
+        """Test duplicates keep the copy from the earliest listed region"""
+        region_videos = {
+            "US": [_video("shared", "US"), _video("us_only", "US")],
+            "KR": [_video("kr_only", "KR"), _video("shared", "KR")],
+        }
+
+        merged = merge_region_videos(region_videos, ["KR", "US"])
+
+        assert [v.video_id for v in merged] == ["kr_only", "shared", "us_only"]
+        assert next(v for v in merged if v.video_id == "shared").country_code == "KR"
+
+    def test_missing_regions_skipped(self):
+        """Test failed regions (no entry) contribute nothing"""
+        merged = merge_region_videos({"JP": [_video("jp", "JP")]}, ["KR", "JP"])
+
+        assert [v.video_id for v in merged] == ["jp"]
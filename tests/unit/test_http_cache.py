@@ -0,0 +1,115 @@
+"""Unit tests for the ETag response cache"""
+import sqlite3
+
+import pytest
+
+from collection.clients.youtube import YouTubeClient
+from collection.http_cache import EVICTION_INTERVAL_SECONDS, ResponseCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestResponseCache:
+    """Test storage, TTL and hit accounting"""
+
+    def test_store_and_hit(self, tmp_path):
+        """Test a stored body is served on 304 and counted as bytes saved"""
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+        key = cache.key("videos", {"id": "a,b", "part": "snippet", "key": "secret"})
+
+        cache.store(key, '"v1"', b'{"items": [1]}', {"items": [1]})
+
+        assert "secret" not in key
+        assert cache.lookup(key) == '"v1"'
+        assert cache.hit(key) == {"items": [1]}
+        assert cache.metrics() == {"hits": 1, "misses": 1, "hit_ratio": 0.5, "bytes_saved": 14}
+
+    def test_survives_restart(self, tmp_path):
+        """Test a new process reads the compressed body back from disk"""
+        path = str(tmp_path / "cache.sqlite")
+        ResponseCache(path).store("k", '"v1"', b'{"a": 1}', {"a": 1})
+
+        assert ResponseCache(path).hit("k") == {"a": 1}
+
+    def test_ttl_eviction(self, tmp_path):
+        """Test expired entries are neither revalidated nor kept on disk"""
+        clock = FakeClock()
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl_seconds=60, clock=clock)
+        cache.store("k", '"v1"', b"{}", {})
+
+        clock.now += 61
+
+        assert cache.evict_expired() == 1
+        assert cache.lookup("k") is None
+
+    def test_expired_entries_evicted_while_running(self, tmp_path):
+        """Test a long-lived cache drops expired entries from disk and memory without a restart"""
+        clock = FakeClock()
+        path = str(tmp_path / "cache.sqlite")
+        cache = ResponseCache(path, ttl_seconds=60, clock=clock)
+        cache.store("old", '"v1"', b"{}", {})
+
+        clock.now += max(61, EVICTION_INTERVAL_SECONDS)
+        cache.store("new", '"v2"', b"{}", {})
+
+        with sqlite3.connect(path) as conn:
+            keys = [row[0] for row in conn.execute("SELECT key FROM http_cache")]
+        assert keys == ["new"]
+        assert list(cache._memo) == ["new"]
+
+    def test_memo_bounded_by_bytes(self, tmp_path):
+        """Test least recently used bodies leave memory but are still served from disk"""
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"), memo_bytes=20)
+        cache.store("a", '"a"', b'{"a": 1}', {"a": 1})
+        cache.store("b", '"b"', b'{"b": 1}', {"b": 1})
+        cache.lookup("a")
+        cache.store("c", '"c"', b'{"c": 1}', {"c": 1})
+
+        assert list(cache._memo) == ["a", "c"]
+        assert cache.hit("b") == {"b": 1}
+        assert list(cache._memo) == ["c", "b"]
+
+    def test_responses_without_etag_not_stored(self, tmp_path):
+        """Test only validatable responses are cached"""
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+        cache.store("k", None, b"{}", {})
+
+        assert cache.lookup("k") is None
+
+
+class TestConditionalRequests:
+    """Test the client revalidates with If-None-Match"""
+
+    @pytest.mark.parametrize("fetch_mode", ["single", "two_step"])
+    def test_second_fetch_served_from_304s(self, fake_youtube_api, tmp_path, fetch_mode):
+        """Test an unchanged chart costs 304s and returns identical videos"""
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+
+        with YouTubeClient(transport=fake_youtube_api.sync_transport(), fetch_mode=fetch_mode,
+                           cache=cache) as client:
+            first = client.get_trending_videos("KR", 60)
+            second = client.get_trending_videos("KR", 60)
+
+        requests = len(fake_youtube_api.requests) // 2
+        assert [v.model_dump() for v in second] == [v.model_dump() for v in first]
+        assert fake_youtube_api.not_modified == requests
+        assert cache.metrics()["hit_ratio"] == 0.5
+        assert cache.metrics()["bytes_saved"] > 0
+
+    def test_statistics_requests_not_cached(self, fake_youtube_api, tmp_path):
+        """Test counter-only polls neither revalidate nor fill the cache"""
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+
+        with YouTubeClient(transport=fake_youtube_api.sync_transport(), cache=cache) as client:
+            video_ids = [video.video_id for video in client.get_trending_videos("KR", 10)]
+            client.get_video_statistics(video_ids)
+            client.get_video_statistics(video_ids)
+
+        assert fake_youtube_api.not_modified == 0
+        assert cache.metrics()["misses"] == len(fake_youtube_api.requests) - 2
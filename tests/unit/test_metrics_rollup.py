@@ -0,0 +1,30 @@
+"""Unit tests for rollup source selection"""
+import pytest
+
+from analysis.jobs.rollup_metrics import select_rollup_source
+from analysis.jobs.analyzer_velocity import VelocityAnalyzer
+
+
+class TestRollupSourceSelection:
+    """Test the analyzer picks the coarsest source that still resolves the window"""
+
+    @pytest.mark.parametrize("window_hours,expected", [
+        (1, "raw"),
+        (6, "raw"),
+        (7, "hourly"),
+        (72, "hourly"),
+        (168, "daily"),
+        (720, "daily"),
+    ])
+    def test_select_rollup_source(self, window_hours, expected):
+        """Test thresholds keep at least seven buckets per window"""
+        assert select_rollup_source(window_hours) == expected
+
+    def test_auto_falls_back_to_raw_for_state_engines(self):
+        """Test engines that never read rollups resolve 'auto' to raw"""
+        analyzer = VelocityAnalyzer.__new__(VelocityAnalyzer)
+        analyzer.engine = "sql"
+
+        assert analyzer._resolve_source("auto", 720) == "raw"
+        with pytest.raises(ValueError):
+            analyzer._resolve_source("daily", 720)
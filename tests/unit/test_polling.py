@@ -0,0 +1,33 @@
+"""Unit tests for adaptive poll intervals"""
+import pytest
+
+from collection.polling import IDLE_INTERVAL_MINUTES, POLL_TICK_MINUTES, POLL_TIERS, poll_interval
+
+
+class TestPollInterval:
+    """Test velocity maps onto the interval tiers"""
+
+    @pytest.mark.parametrize("views_per_min,minutes", [
+        (50_000.0, 10),
+        (1_000.0, 10),
+        (999.9, 20),
+        (100.0, 20),
+        (10.0, 30),
+        (1.0, 60),
+        (0.5, IDLE_INTERVAL_MINUTES),
+    ])
+    def test_tiers(self, views_per_min, minutes):
+        """Test each tier boundary belongs to the faster tier"""
+        assert poll_interval(views_per_min) == minutes
+
+    @pytest.mark.parametrize("views_per_min", [0.0, 0.05, -3.0, None, float("nan")])
+    def test_untracked(self, views_per_min):
+        """Test stalled, negative and unknown velocities are not scheduled"""
+        assert poll_interval(views_per_min) is None
+
+    def test_intervals_are_whole_ticks(self):
+        """Test every interval lands on a collector tick"""
+        intervals = [minutes for _, minutes in POLL_TIERS] + [IDLE_INTERVAL_MINUTES]
+
+        assert all(minutes % POLL_TICK_MINUTES == 0 for minutes in intervals)
+        assert intervals == sorted(intervals)
@@ -0,0 +1,86 @@
+"""Unit tests for the YouTube quota budget"""
+import pytest
+
+from collection.quota import (
+    QuotaExhausted, SqliteTokenBucket, TokenBucket, estimate_region_cost, prioritize_regions, unit_cost
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucket:
+    """Test reservation, refill and rejection"""
+
+    def test_reserve_within_capacity_does_not_wait(self):
+        """Test a full bucket grants requests immediately"""
+        bucket = TokenBucket(capacity=10, rate=1.0, clock=FakeClock())
+
+        assert [bucket.reserve(3) for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert bucket.remaining == pytest.approx(1.0)
+
+    def test_overdraft_waits_for_refill(self):
+        """Test an overdraft returns the refill time and is recorded as throttling"""
+        clock = FakeClock()
+        bucket = TokenBucket(capacity=4, rate=2.0, clock=clock)
+
+        bucket.reserve(4)
+        assert bucket.reserve(3) == pytest.approx(1.5)
+        assert bucket.metrics()["throttled_requests"] == 1
+
+        clock.now += 10
+        assert bucket.remaining == pytest.approx(4)  # refill is capped at capacity
+
+    def test_wait_beyond_limit_rejected_without_spending(self):
+        """Test a request that would wait too long raises and leaves the balance untouched"""
+        bucket = TokenBucket(capacity=2, rate=0.1, max_wait=5, clock=FakeClock())
+        bucket.reserve(2)
+
+        with pytest.raises(QuotaExhausted):
+            bucket.reserve(1)
+        assert bucket.remaining == pytest.approx(0)
+        assert bucket.metrics()["rejected_requests"] == 1
+
+    def test_drain_empties_bucket(self):
+        """Test a 429 drain leaves no tokens for other workers"""
+        bucket = TokenBucket(capacity=5, rate=1.0, clock=FakeClock())
+        bucket.drain()
+
+        assert bucket.reserve(1) == pytest.approx(1.0)
+
+    def test_sqlite_bucket_shared_between_instances(self, tmp_path):
+        """Test two buckets on one file (two processes) draw from the same balance"""
+        clock = FakeClock()
+        path = str(tmp_path / "quota.sqlite")
+        first = SqliteTokenBucket(path, capacity=5, rate=1.0, clock=clock)
+        second = SqliteTokenBucket(path, capacity=5, rate=1.0, clock=clock)
+
+        first.reserve(4)
+
+        assert second.remaining == pytest.approx(1)
+        assert second.reserve(3) == pytest.approx(2.0)
+
+
+class TestRegionPriority:
+    """Test cost estimates and region ordering under a short budget"""
+
+    def test_costs(self):
+        """Test list calls cost one unit and two-step doubles the per-page calls"""
+        assert unit_cost("videos", "snippet,statistics") == 1
+        assert unit_cost("search", "snippet") == 100
+        assert estimate_region_cost(200, "single") == 4
+        assert estimate_region_cost(50, "two_step") == 2
+
+    def test_most_active_regions_selected(self):
+        """Test regions are ranked by activity and the remainder deferred"""
+        selected, deferred = prioritize_regions(
+            ["KR", "US", "JP", "GB"], {"US": 50.0, "JP": 80.0}, available=5, cost_per_region=2
+        )
+
+        assert selected == ["JP", "US"]
+        assert deferred == ["KR", "GB"]
@@ -0,0 +1,135 @@
+"""Unit tests for top-K selection and ranked result records"""
+import pytest
+import numpy as np
+import pandas as pd
+
+from analysis.ranking import ClippedTopK, RankedVideo, TopK, rank_top_k, top_k_positions
+
+
+def _velocity_frame(views_per_min, score=None):
+    frame = pd.DataFrame({
+        "video_id": [f"v{i:03d}" for i in range(len(views_per_min))],
+        "title": [f"title {i}" for i in range(len(views_per_min))],
+        "channel": ["channel"] * len(views_per_min),
+        "views_per_min": np.asarray(views_per_min, dtype=np.float64),
+        "data_points": np.arange(len(views_per_min), dtype=np.int64) + 2,
+        "valid_intervals": np.arange(len(views_per_min), dtype=np.int64) + 1,
+    })
+    if score is not None:
+        frame["score"] = np.asarray(score, dtype=np.float64)
+    return frame
+
+
+class TestTopKPositions:
+    """Test selection matches a stable descending sort"""
+
+    @pytest.mark.parametrize("k", [0, 1, 5, 50, 1_000])
+    @pytest.mark.parametrize("chunk_size", [7, 64, 10_000])
+    def test_matches_nlargest_with_ties(self, k, chunk_size):
+        """Test order and earliest-first tie-breaks hold across chunk boundaries"""
+        values = np.random.default_rng(0).integers(0, 20, size=500).astype(np.float64)
+
+        expected = np.argsort(-values, kind="stable")[:k]
+
+        np.testing.assert_array_equal(top_k_positions(values, k, chunk_size), expected)
+
+    def test_matches_nlargest_below_size(self):
+        """Test the analyzer's previous nlargest(keep='first') ranking is kept"""
+        values = np.random.default_rng(1).integers(0, 5, size=200).astype(np.float64)
+
+        expected = pd.Series(values).nlargest(50, keep="first").index.to_numpy()
+
+        np.testing.assert_array_equal(top_k_positions(values, 50, 16), expected)
+
+    def test_nan_never_ranked(self):
+        """Test NaN values are skipped even when fewer than k remain"""
+        values = np.array([np.nan, 3.0, np.nan, 1.0, 2.0])
+
+        assert top_k_positions(values, 10).tolist() == [1, 4, 3]
+
+    def test_chunks_continue_positions(self):
+        """Test positions count across chunks added one by one"""
+        selector = TopK(2)
+        selector.add_chunk(np.array([5.0, 1.0]))
+        selector.add_chunk(np.array([9.0, 5.0]))
+
+        assert selector.result().tolist() == [2, 0]
+        assert selector.rows == 4
+
+
+class TestClippedTopK:
+    """Test chunk-fed candidates rank like the whole frame after clipping"""
+
+    @staticmethod
+    def _ranked(frame, k):
+        return [record.video_id for record in rank_top_k(frame, k)]
+
+    @pytest.mark.parametrize("k", [0, 1, 10, 100])
+    @pytest.mark.parametrize("chunk_size", [1, 37, 5_000])
+    def test_matches_whole_frame(self, k, chunk_size):
+        """Test ties at the cap still rank earliest first, across chunk boundaries"""
+        values = np.random.default_rng(2).pareto(1.5, size=2_000)
+        values[::50] = np.nan
+        frame = _velocity_frame(values)
+        cap = np.nanquantile(values, 0.99)
+
+        ranker = ClippedTopK(k)
+        for start in range(0, len(frame), chunk_size):
+            ranker.add_chunk(frame.iloc[start:start + chunk_size])
+        candidates = ranker.candidates()
+        if k:
+            candidates["views_per_min"] = np.minimum(candidates["views_per_min"], cap)
+        whole = frame.assign(views_per_min=np.minimum(values, cap))
+
+        assert self._ranked(candidates, k) == self._ranked(whole, k)
+        np.testing.assert_array_equal(ranker.values(), values)
+        assert ranker.rows == len(frame)
+
+    def test_keeps_only_rows_that_can_rank(self):
+        """Test rows that k earlier rows match or beat are dropped"""
+        ranker = ClippedTopK(2)
+        ranker.add_chunk(_velocity_frame([5.0, 1.0, 9.0, 5.0, 6.0, 2.0]))
+
+        assert ranker.candidates()["video_id"].tolist() == ["v000", "v001", "v002", "v004"]
+
+    def test_no_rows(self):
+        """Test a ranker without input has no candidates or values"""
+        ranker = ClippedTopK(10)
+        ranker.add_chunk(pd.DataFrame())
+
+        assert ranker.candidates().empty
+        assert len(ranker.values()) == 0
+
+
+class TestRankTopK:
+    """Test records built from the selected rows"""
+
+    def test_records_by_velocity(self):
+        """Test records carry the selected rows' columns as Python scalars"""
+        records = rank_top_k(_velocity_frame([1.0, 30.0, 20.0]), 2)
+
+        assert [record.video_id for record in records] == ["v001", "v002"]
+        assert records[0].to_dict() == {
+            "video_id": "v001", "title": "title 1", "channel": "channel",
+            "views_per_min": 30.0, "data_points": 3, "valid_intervals": 2,
+        }
+        assert type(records[0].data_points) is int
+
+    def test_records_by_score(self):
+        """Test ranking by score keeps the score in each record"""
+        records = rank_top_k(_velocity_frame([1.0, 30.0, 20.0], score=[3.0, 1.0, 2.0]), 2, by="score")
+
+        assert [record.to_dict()["score"] for record in records] == [3.0, 2.0]
+        assert [record.video_id for record in records] == ["v000", "v002"]
+
+    def test_records_have_no_instance_dict(self):
+        """Test records are slotted"""
+        record = RankedVideo("v", "t", "c", 1.0, 2, 1)
+
+        assert not hasattr(record, "__dict__")
+        with pytest.raises(AttributeError):
+            record.extra = 1
+
+    def test_empty_frame(self):
+        """Test an empty frame ranks nothing"""
+        assert rank_top_k(pd.DataFrame(), 10) == []
@@ -0,0 +1,103 @@
+"""Unit tests for the scheduler runner's job wrapper and metrics"""
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_MAX_INSTANCES, JobExecutionEvent, JobSubmissionEvent
+from apscheduler.executors.pool import ProcessPoolExecutor
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from jobs import runner
+from jobs.runner import JobMetrics, RunnerSettings, build_scheduler, run_job
+
+
+class TestRunJob:
+    """Test the executor entry point"""
+
+    def test_reports_status_and_duration(self, monkeypatch):
+        """Test a successful job reports ok with its start time"""
+        calls = []
+        monkeypatch.setitem(runner.JOBS, "probe", lambda: calls.append(1))
+        before = datetime.now(timezone.utc)
+
+        result = run_job("probe", lock=False)
+
+        assert calls == [1]
+        assert result["status"] == "ok"
+        assert result["started_at"] >= before
+        assert result["duration"] >= 0
+
+    def test_failure_is_contained(self, monkeypatch):
+        """Test an exception is logged and reported, not raised into the scheduler"""
+        def boom():
+            raise RuntimeError("boom")
+        monkeypatch.setitem(runner.JOBS, "probe", boom)
+
+        assert run_job("probe", lock=False)["status"] == "failed"
+
+
+class TestJobEvents:
+    """Test executor events become per-job metrics"""
+
+    def test_queue_delay_from_scheduled_time(self, monkeypatch):
+        """Test queueing delay is the start time minus the scheduled run time"""
+        metrics = JobMetrics()
+        monkeypatch.setattr(runner, "job_metrics", metrics)
+        scheduled = datetime(2025, 1, 1, 10, 0, tzinfo=timezone.utc)
+        result = {"status": "ok", "started_at": scheduled + timedelta(seconds=4), "duration": 2.5}
+
+        runner._on_job_event(JobExecutionEvent(EVENT_JOB_EXECUTED, "collect_trending", "default",
+                                               scheduled, retval=result))
+        runner._on_job_event(JobSubmissionEvent(EVENT_JOB_MAX_INSTANCES, "collect_trending", "default",
+                                                [scheduled]))
+
+        stats = metrics.metrics()["collect_trending"]
+        assert stats["runs"] == 1
+        assert stats["statuses"] == {"ok": 1, "overlapped": 1}
+        assert stats["last_queue_delay_seconds"] == pytest.approx(4.0)
+        assert stats["avg_seconds"] == pytest.approx(2.5)
+
+
+class TestBuildScheduler:
+    """Test executor and overlap settings"""
+
+    def test_job_defaults(self):
+        """Test every job gets the configured overlap, coalescing and misfire policy"""
+        settings = RunnerSettings(runner_max_instances=1, runner_coalesce=True, runner_misfire_grace_seconds=120)
+
+        sched = build_scheduler(settings, BackgroundScheduler)
+        # Defaults are applied when the scheduler starts
+        sched.start(paused=True)
+        jobs = sched.get_jobs()
+        sched.shutdown(wait=False)
+
+        assert {job.id for job in jobs} == set(runner.JOBS)
+        assert all(job.max_instances == 1 and job.coalesce and job.misfire_grace_time == 120 for job in jobs)
+        assert all(job.func is run_job and job.args == (job.id, True) for job in jobs)
+
+    def test_process_pool(self):
+        """Test the process executor can be selected"""
+        sched = build_scheduler(RunnerSettings(runner_executor="process", runner_max_workers=2),
+                                BackgroundScheduler)
+
+        assert isinstance(sched._executors["default"], ProcessPoolExecutor)
+        sched._executors["default"].shutdown()
+
+    def test_unknown_executor_rejected(self):
+        """Test a typo in the executor kind fails at startup"""
+        with pytest.raises(ValueError):
+            build_scheduler(RunnerSettings(runner_executor="fiber"), BackgroundScheduler)
+
+    def test_collectors_never_share_a_minute(self):
+        """Test incremental ticks are staggered from the hourly trending pull"""
+        schedule = dict(runner.SCHEDULE)
+        start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+        def minutes(trigger):
+            fired, now = set(), start
+            for _ in range(12):
+                fire_time = trigger.get_next_fire_time(None, now)
+                fired.add(fire_time.minute)
+                now = fire_time + timedelta(minutes=1)
+            return fired
+
+        assert minutes(schedule["collect_incremental"]).isdisjoint(minutes(schedule["collect_trending"]))
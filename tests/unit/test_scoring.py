@@ -0,0 +1,139 @@
+"""Unit tests for acceleration, channel-relative and anomaly scores"""
+import pytest
+import numpy as np
+import pandas as pd
+
+from analysis.scoring import ANOMALY_MIN_PERIODS, SCORES, rolling_zscores, score_snapshots
+from analysis.velocity import calculate_velocity_vectorized
+
+
+def _frame(series, channel=None, minutes=10):
+    """Snapshot frame from {video_id: [view counts]} taken every `minutes`"""
+    start = pd.Timestamp("2025-01-01", tz="UTC")
+    rows = [
+        {"video_id": video_id, "captured_at": start + pd.Timedelta(minutes=minutes * i), "view_count": views,
+         "title": f"title {video_id}", "channel": (channel or {}).get(video_id, f"channel_{video_id}")}
+        for video_id, counts in series.items() for i, views in enumerate(counts)
+    ]
+    # Shuffle so scoring has to sort
+    return pd.DataFrame(rows).sample(frac=1.0, random_state=0)
+
+
+def _scores(df, score):
+    return score_snapshots(df, score).set_index("video_id")["score"].to_dict()
+
+
+class TestVelocityScore:
+    """Test the velocity score matches the vectorized engine"""
+
+    def test_matches_engine(self):
+        """Test ranking by velocity keeps the engine's per-video columns"""
+        df = _frame({"a": [0, 100, 300], "b": [0, 50, 60, 60]})
+
+        scored = score_snapshots(df, "velocity").sort_values("video_id").reset_index(drop=True)
+        engine = calculate_velocity_vectorized(df).sort_values("video_id").reset_index(drop=True)
+
+        pd.testing.assert_frame_equal(scored.drop(columns="score"), engine)
+        assert scored["score"].tolist() == scored["views_per_min"].tolist()
+
+
+class TestAcceleration:
+    """Test the second difference of views"""
+
+    def test_speeding_up_beats_fast_and_steady(self):
+        """Test a video gaining speed outranks a faster one at constant speed"""
+        df = _frame({"steady": [0, 1000, 2000, 3000], "rising": [0, 100, 400, 900]})
+
+        scores = _scores(df, "acceleration")
+
+        # rising: 10 -> 30 -> 50 views/min per 10 minutes = 2 views/min per minute
+        assert scores["rising"] == pytest.approx(2.0)
+        assert scores["steady"] == pytest.approx(0.0)
+
+    def test_needs_two_intervals(self):
+        """Test videos with a single interval get no acceleration"""
+        df = _frame({"short": [0, 100], "long": [0, 100, 300]})
+
+        assert set(_scores(df, "acceleration")) == {"long"}
+
+    def test_invalid_interval_breaks_the_pair(self):
+        """Test a view-count drop is not differenced against its neighbours"""
+        df = _frame({"glitch": [0, 100, 50, 150]})
+
+        assert "glitch" not in _scores(df, "acceleration")
+
+
+class TestChannelRelative:
+    """Test velocity against the channel's own baseline"""
+
+    def test_small_channel_breakout_outranks_big_channel(self):
+        """Test a breakout on a slow channel beats a big channel's routine video"""
+        series = {
+            "big_1": [0, 1000, 2000], "big_2": [0, 1000, 2000], "big_3": [0, 1100, 2200],
+            "small_1": [0, 10, 20], "small_2": [0, 10, 20], "small_break": [0, 10, 500],
+        }
+        channel = {video_id: video_id.rsplit("_", 1)[0] for video_id in series}
+
+        scores = _scores(_frame(series, channel), "channel_relative")
+
+        assert scores["small_break"] > scores["big_3"]
+        assert scores["big_3"] > scores["big_1"]
+
+
+class TestAnomaly:
+    """Test the rolling z-score"""
+
+    def test_spike_scores_high(self):
+        """Test a jump after a steady stretch stands out and a steady series does not"""
+        df = _frame({"flat": [0, 100, 200, 300, 400, 500], "spike": [0, 100, 200, 300, 400, 2000]})
+
+        scores = _scores(df, "anomaly")
+
+        assert scores["spike"] > 10
+        assert scores["flat"] == pytest.approx(0.0)
+
+    def test_needs_history(self):
+        """Test intervals with fewer than the minimum preceding intervals are not scored"""
+        df = _frame({"young": [0, 100, 200, 5000]})
+
+        assert "young" not in _scores(df, "anomaly")
+
+    def test_window_stays_within_video(self):
+        """Test one video's intervals never feed the next video's baseline"""
+        velocities = np.array([np.nan, 1, 2, 3, 4, np.nan, 100, 100, 100, 100])
+        valid = ~np.isnan(velocities)
+        codes = np.array([0] * 5 + [1] * 5)
+
+        zscores, scored = rolling_zscores(velocities, valid, codes)
+
+        assert scored.sum() == 2 * (4 - ANOMALY_MIN_PERIODS)
+        assert zscores[9] == pytest.approx(0.0)
+
+    def test_large_video_does_not_swamp_small_one(self):
+        """Test a small video scores the same after a long large-magnitude video as alone"""
+        rng = np.random.default_rng(0)
+        large = 1e9 + rng.normal(0, 1e6, 20_000)
+        small = np.array([10, 12, 9, 11, 10, 13, 9, 11, 10, 30], dtype=float)
+        velocities = np.concatenate([large, small])
+        codes = np.array([0] * len(large) + [1] * len(small))
+
+        zscores, scored = rolling_zscores(velocities, np.ones(len(velocities), dtype=bool), codes)
+        alone, alone_scored = rolling_zscores(small, np.ones(len(small), dtype=bool), np.zeros(len(small)))
+
+        np.testing.assert_array_equal(scored[len(large):], alone_scored)
+        np.testing.assert_allclose(zscores[len(large):][alone_scored], alone[alone_scored], rtol=1e-9)
+        assert zscores[-1] > 5
+
+
+class TestScoreSnapshots:
+    """Test input handling shared by every score"""
+
+    @pytest.mark.parametrize("score", SCORES)
+    def test_empty_frame(self, score):
+        """Test an empty window scores nothing"""
+        assert score_snapshots(pd.DataFrame(), score).empty
+
+    def test_unknown_score(self):
+        """Test an unknown score is rejected"""
+        with pytest.raises(ValueError):
+            score_snapshots(_frame({"a": [0, 1]}), "virality")
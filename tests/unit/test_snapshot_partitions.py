@@ -0,0 +1,36 @@
+"""Unit tests for daily snapshot partition naming and expiry"""
+from datetime import date
+
+from core.partitions import partition_name, partition_day, expired_partitions
+
+
+class TestSnapshotPartitions:
+    """Test partition helpers used by the maintenance job"""
+
+    def test_partition_name_round_trip(self):
+        """Test names encode the UTC day and parse back"""
+        name = partition_name(date(2025, 1, 9))
+
+        assert name == "video_metrics_snapshot_p20250109"
+        assert partition_day(name) == date(2025, 1, 9)
+
+    def test_foreign_tables_ignored(self):
+        """Test names outside the partition scheme are never parsed"""
+        assert partition_day("video_metrics_snapshot") is None
+        assert partition_day("video_metrics_snapshot_legacy") is None
+        assert partition_day("videos_p20250101") is None
+
+    def test_expired_partitions_respect_horizon(self):
+        """Test only days strictly before today - retention expire"""
+        names = [partition_name(date(2025, 1, day)) for day in range(1, 11)]
+        names.append("video_metrics_snapshot_default")
+
+        expired = expired_partitions(names, retention_days=5, today=date(2025, 1, 10))
+
+        assert expired == [partition_name(date(2025, 1, day)) for day in range(1, 5)]
+
+    def test_nothing_expires_within_retention(self):
+        """Test a long retention keeps everything"""
+        names = [partition_name(date(2025, 1, day)) for day in range(1, 4)]
+
+        assert expired_partitions(names, retention_days=30, today=date(2025, 1, 4)) == []
@@ -0,0 +1,33 @@
+"""Unit tests for the benchmark data generator"""
+from datetime import datetime, timezone
+
+from benchmarks.synthetic import DROPOUT_RATE, generate_snapshots, generate_videos
+
+
+class TestSyntheticData:
+    """Test generated trajectories look like collector output"""
+
+    def test_views_never_decrease(self):
+        """Test counters are monotonic per video and rows ordered like the analyzer query"""
+        snapshots = generate_snapshots(generate_videos(200), hours=48)
+
+        assert snapshots.groupby("video_id")["view_count"].diff().dropna().min() >= 0
+        assert (snapshots["like_count"] <= snapshots["view_count"]).all()
+        assert snapshots.equals(snapshots.sort_values(["video_id", "captured_at"]).reset_index(drop=True))
+
+    def test_shape_and_end_time(self):
+        """Test one row per video per interval, minus dropouts, ending at `end`"""
+        end = datetime(2025, 3, 1, 12, tzinfo=timezone.utc)
+        snapshots = generate_snapshots(generate_videos(100), hours=24, interval_minutes=30, end=end)
+
+        expected = 100 * 48
+        assert expected * (1 - 3 * DROPOUT_RATE) <= len(snapshots) <= expected
+        assert snapshots["captured_at"].max() == end
+
+    def test_deterministic_per_seed(self):
+        """Test the same seed reproduces the same dataset"""
+        first = generate_snapshots(generate_videos(50, seed=7), hours=6, seed=7,
+                                   end=datetime(2025, 1, 1, tzinfo=timezone.utc))
+        second = generate_snapshots(generate_videos(50, seed=7), hours=6, seed=7,
+                                    end=datetime(2025, 1, 1, tzinfo=timezone.utc))
+        assert first.equals(second)
@@ -0,0 +1,83 @@
+"""Unit tests for the time-decayed EWMA velocity step"""
+import pytest
+import numpy as np
+
+from analysis.velocity_ewma import ewma_step
+
+
+def _step(state, seconds, views, half_life_minutes=60.0):
+    """Fold one snapshot into a single video's (last_seconds, last_views, mean, variance, samples)"""
+    last_seconds, last_views, mean, variance, samples = state
+    step = ewma_step(np.array([last_seconds * 1e6], dtype=float), np.array([last_views], dtype=float),
+                     np.array([mean], dtype=float), np.array([variance], dtype=float),
+                     np.array([samples]), np.array([seconds * 1e6], dtype=float),
+                     np.array([views], dtype=float), half_life_minutes)
+    return (step["last_micros"][0] / 1e6, step["last_views"][0], step["mean"][0], step["variance"][0],
+            step["samples"][0]), bool(step["changed"][0])
+
+
+EMPTY = (np.nan, np.nan, np.nan, np.nan, 0)
+
+
+class TestEwmaStep:
+    """Test folding snapshots into the estimate"""
+
+    def test_first_snapshot_sets_reference_only(self):
+        """Test a video's first snapshot stores the reference point without an estimate"""
+        state, changed = _step(EMPTY, 0, 1000)
+
+        assert changed
+        assert state[:2] == (0, 1000)
+        assert np.isnan(state[2])
+        assert state[4] == 0
+
+    def test_first_interval_sets_mean(self):
+        """Test the first interval's velocity becomes the estimate with zero variance"""
+        state, _ = _step(EMPTY, 0, 1000)
+        state, _ = _step(state, 600, 2000)
+
+        assert state[2] == pytest.approx(100.0)
+        assert state[3] == 0.0
+        assert state[4] == 1
+
+    def test_decay_follows_elapsed_time(self):
+        """Test an interval one half-life long moves the estimate half way"""
+        state = (0, 0, 100.0, 0.0, 1)
+
+        after_half_life, _ = _step(state, 3600, 3600 * 300 / 60)
+        after_ten_minutes, _ = _step(state, 600, 600 * 300 / 60)
+
+        assert after_half_life[2] == pytest.approx(200.0)
+        # diff² * alpha * (1 - alpha) with alpha = 0.5
+        assert after_half_life[3] == pytest.approx(200.0 ** 2 * 0.25)
+        alpha = 1 - 2 ** (-10 / 60)
+        assert after_ten_minutes[2] == pytest.approx(100.0 + alpha * 200.0)
+
+    def test_stale_snapshot_ignored(self):
+        """Test replays and out-of-order snapshots leave the state untouched"""
+        state = (600, 2000, 100.0, 4.0, 1)
+
+        for seconds in (600, 300):
+            new_state, changed = _step(state, seconds, 5000)
+            assert not changed
+            assert new_state == state
+
+    def test_view_drop_moves_reference_only(self):
+        """Test a lower view count resets the reference point without touching the estimate"""
+        state = (600, 2000, 100.0, 4.0, 1)
+
+        new_state, changed = _step(state, 1200, 1500)
+
+        assert changed
+        assert new_state == (1200, 1500, 100.0, 4.0, 1)
+
+    def test_vectorized_over_videos(self):
+        """Test each video is folded independently"""
+        step = ewma_step(np.array([np.nan, 0.0]), np.array([np.nan, 0.0]), np.array([np.nan, np.nan]),
+                         np.array([np.nan, np.nan]), np.array([0, 0]), np.array([60e6, 60e6]),
+                         np.array([10.0, 50.0]))
+
+        assert step["changed"].tolist() == [True, True]
+        assert np.isnan(step["mean"][0])
+        assert step["mean"][1] == pytest.approx(50.0)
+        assert step["samples"].tolist() == [0, 1]
@@ -0,0 +1,183 @@
+"""Unit tests for AsyncYouTubeClient against the local API stand-in"""
+import asyncio
+
+import httpx
+import pytest
+from tenacity import wait_none
+
+from collection.clients.youtube import AsyncYouTubeClient, YouTubeClient, new_http_client
+
+
+class TestAsyncYouTubeClient:
+    """Test the async client matches the sync client's contract"""
+
+    def test_matches_sync_client(self, fake_youtube_api):
+        """Test both clients return identical videos for a region"""
+        with YouTubeClient(transport=fake_youtube_api.sync_transport()) as client:
+            expected = client.get_trending_videos("KR", 20)
+
+        async def fetch():
+            async with AsyncYouTubeClient(transport=fake_youtube_api.async_transport()) as client:
+                return await client.get_trending_videos("KR", 20)
+
+        videos = asyncio.run(fetch())
+
+        assert len(videos) == 20
+        assert [v.model_dump() for v in videos] == [v.model_dump() for v in expected]
+
+    def test_fan_out_reports_failed_regions(self, fake_youtube_api, monkeypatch):
+        """Test concurrent regions succeed independently"""
+        fake_youtube_api.failing_regions.add("JP")
+
+        async def fetch():
+            async with AsyncYouTubeClient(transport=fake_youtube_api.async_transport()) as client:
+                return await client.get_trending_videos_many(["KR", "US", "JP"], 5)
+
+        results = asyncio.run(fetch())
+
+        assert [v.country_code for v in results["KR"]] == ["KR"] * 5
+        assert {v.video_id for v in results["US"]} == set(fake_youtube_api.region_ids("US")[:5])
+        assert isinstance(results["JP"], httpx.HTTPStatusError)
+        assert results["JP"].response.status_code == 403
+
+    def test_http2_falls_back_without_h2(self, fake_youtube_api, monkeypatch):
+        """Test requesting HTTP/2 without the h2 package degrades to HTTP/1.1"""
+        monkeypatch.setattr("collection.clients.youtube._http2_available", lambda: False)
+
+        client = AsyncYouTubeClient(http2=True, transport=fake_youtube_api.async_transport())
+        asyncio.run(client.client.aclose())
+
+        assert client.http2 is False
+
+
+class TestRequestRetry:
+    """Test only transient failures are retried and the last error reaches the caller"""
+
+    @pytest.fixture(autouse=True)
+    def no_backoff(self, monkeypatch):
+        monkeypatch.setattr(YouTubeClient._make_request.retry, "wait", wait_none())
+        monkeypatch.setattr(AsyncYouTubeClient._make_request.retry, "wait", wait_none())
+
+    def test_transient_errors_retried(self, fake_youtube_api):
+        """Test 5xx and 429 answers are retried until the request succeeds"""
+        fake_youtube_api.outages += [503, 429]
+
+        with YouTubeClient(transport=fake_youtube_api.sync_transport()) as client:
+            videos = client.get_trending_videos("KR", 5)
+
+        assert len(videos) == 5
+        assert len(fake_youtube_api.requests) == 3
+
+    def test_client_errors_not_retried(self, fake_youtube_api):
+        """Test a 403 fails on its first attempt with the HTTP error"""
+        fake_youtube_api.failing_regions.add("KR")
+
+        with YouTubeClient(transport=fake_youtube_api.sync_transport(), fetch_mode="two_step") as client:
+            with pytest.raises(httpx.HTTPStatusError) as error:
+                client.get_trending_videos("KR", 5)
+
+        assert error.value.response.status_code == 403
+        assert len(fake_youtube_api.requests) == 1
+
+    def test_retries_exhausted_raise_last_error(self, fake_youtube_api):
+        """Test a request still failing after every attempt raises its error, not None"""
+        fake_youtube_api.outages += [503] * 5
+
+        async def fetch():
+            async with AsyncYouTubeClient(transport=fake_youtube_api.async_transport(),
+                                          fetch_mode="two_step") as client:
+                return await client.get_trending_videos("KR", 5)
+
+        with pytest.raises(httpx.HTTPStatusError) as error:
+            asyncio.run(fetch())
+
+        assert error.value.response.status_code == 503
+        assert len(fake_youtube_api.requests) == 5
+
+
+class TestTrendingPagination:
+    """Test chart pagination and 50-id detail batches"""
+
+    def test_sync_client_pages_past_fifty(self, fake_youtube_api):
+        """Test a limit of 120 walks three chart pages in chart order"""
+        with YouTubeClient(transport=fake_youtube_api.sync_transport(), fetch_mode="two_step") as client:
+            videos = client.get_trending_videos("KR", 120)
+
+        assert [v.video_id for v in videos] == fake_youtube_api.region_ids("KR")[:120]
+        list_calls = [r for r in fake_youtube_api.requests if r.url.params.get("chart")]
+        assert [r.url.params.get("pageToken") for r in list_calls] == [None, "50", "100"]
+        assert [r.url.params["maxResults"] for r in list_calls] == ["50", "50", "20"]
+
+    def test_async_client_pages_past_fifty(self, fake_youtube_api):
+        """Test the async client returns the same top-200 as the sync client"""
+        async def fetch():
+            async with AsyncYouTubeClient(transport=fake_youtube_api.async_transport(),
+                                          fetch_mode="two_step") as client:
+                return await client.get_trending_videos("US", 250)
+
+        videos = asyncio.run(fetch())
+
+        assert [v.video_id for v in videos] == fake_youtube_api.region_ids("US")
+        detail_calls = [r for r in fake_youtube_api.requests if not r.url.params.get("chart")]
+        assert len(detail_calls) == 4
+
+
+class TestSinglePassFetch:
+    """Test the chart-only fetch mode and its two-step fallback"""
+
+    def test_single_pass_halves_requests_and_quota(self, fake_youtube_api):
+        """Test one chart call per page replaces the list + details pair"""
+        with YouTubeClient(transport=fake_youtube_api.sync_transport(), fetch_mode="two_step") as client:
+            two_step = client.get_trending_videos("KR", 100)
+            two_step_units = client.quota_units
+        with YouTubeClient(transport=fake_youtube_api.sync_transport()) as client:
+            single = client.get_trending_videos("KR", 100)
+            single_units = client.quota_units
+
+        assert [v.model_dump() for v in single] == [v.model_dump() for v in two_step]
+        assert (two_step_units, single_units) == (4, 2)
+        assert len(fake_youtube_api.requests) == 6
+
+    def test_missing_parts_fall_back_to_detail_lookup(self, fake_youtube_api):
+        """Test a chart answer without snippet/statistics is completed via details"""
+        fake_youtube_api.chart_returns_parts = False
+
+        async def fetch():
+            async with AsyncYouTubeClient(transport=fake_youtube_api.async_transport()) as client:
+                return await client.get_trending_videos("JP", 30), client.quota_units
+
+        videos, quota_units = asyncio.run(fetch())
+
+        assert [v.video_id for v in videos] == fake_youtube_api.region_ids("JP")[:30]
+        assert videos[0].view_count == 1_000_000
+        assert quota_units == 2
+
+
+class TestStatisticsRefresh:
+    """Test the statistics-only lookup used by the incremental collector"""
+
+    def test_statistics_in_batches_of_fifty(self, fake_youtube_api):
+        """Test ids are split into 50-id calls asking for statistics only"""
+        ids = fake_youtube_api.region_ids("KR")[:120]
+        fake_youtube_api.missing_ids = {ids[5]}
+
+        with YouTubeClient(transport=fake_youtube_api.sync_transport()) as client:
+            statistics = client.get_video_statistics(ids)
+            quota_units = client.quota_units
+
+        assert quota_units == 3
+        assert {request.url.params["part"] for request in fake_youtube_api.requests} == {"statistics"}
+        assert len(statistics) == 119 and ids[5] not in statistics
+        assert statistics[ids[1]] == {"view_count": 999_000, "like_count": 9_990, "comment_count": 101}
+
+    def test_shared_http_client_stays_open(self, fake_youtube_api):
+        """Test clients built on a shared HTTP client leave it open for the next one"""
+        shared = new_http_client(fake_youtube_api.sync_transport())
+
+        for _ in range(2):
+            with YouTubeClient(http_client=shared) as client:
+                client.get_video_statistics(fake_youtube_api.region_ids("KR")[:3])
+
+        assert not shared.is_closed
+        assert len(fake_youtube_api.requests) == 2
+        shared.close()